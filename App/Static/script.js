@@ -84,15 +84,16 @@ class DocumentScanner {
     }
 
     handleFile(file) {
-        const validTypes = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp'];
+        const validTypes = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp', 'application/pdf'];
         
         if (!validTypes.includes(file.type)) {
-            this.showToast('Invalid file type', 'Please select a JPEG, PNG, or WebP image file.', 'error');
+            this.showToast('Invalid file type', 'Please select a JPEG, PNG, or WebP image or a PDF file.', 'error');
             return;
         }
 
-        if (file.size > 10 * 1024 * 1024) { // 10MB limit
-            this.showToast('File too large', 'Please select an image smaller than 10MB.', 'error');
+        const isPdf = file.type === 'application/pdf';
+        if (file.size > (isPdf ? 50 : 10) * 1024 * 1024) { // 10MB limit for images, 50MB for PDFs
+            this.showToast('File too large', isPdf ? 'Please select a PDF smaller than 50MB.' : 'Please select an image smaller than 10MB.', 'error');
             return;
         }
 
@@ -111,12 +112,17 @@ class DocumentScanner {
         // Hide upload zone
         uploadZone.style.display = 'none';
 
-        // Create and show preview
-        const reader = new FileReader();
-        reader.onload = (e) => {
-            previewImg.src = e.target.result;
-        };
-        reader.readAsDataURL(file);
+        // Create and show preview (PDF pages are only rendered server-side)
+        if (file.type === 'application/pdf') {
+            previewImg.removeAttribute('src');
+            previewImg.alt = `PDF document: ${file.name}`;
+        } else {
+            const reader = new FileReader();
+            reader.onload = (e) => {
+                previewImg.src = e.target.result;
+            };
+            reader.readAsDataURL(file);
+        }
 
         fileName.textContent = file.name;
         fileSize.textContent = `(${(file.size / 1024 / 1024).toFixed(2)} MB)`;
@@ -134,6 +140,7 @@ class DocumentScanner {
         document.getElementById('image-preview').style.display = 'none';
         document.getElementById('process-section').style.display = 'none';
         document.getElementById('file-input').value = '';
+        this.clearPageResults();
 
         // Hide results if visible
         document.getElementById('results-section').style.display = 'none';
@@ -150,6 +157,11 @@ class DocumentScanner {
             // Create FormData to send to Flask backend
             const formData = new FormData();
             formData.append('file', this.selectedFile);
+            // PDFs stream per-page results as NDJSON
+            const isPdf = this.selectedFile.type === 'application/pdf';
+            if (isPdf) {
+                formData.append('stream', '1');
+            }
 
             // Start processing animation
             this.startProcessingAnimation();
@@ -164,12 +176,14 @@ class DocumentScanner {
                 throw new Error('Processing failed');
             }
 
-            const data = await response.json();
+            const data = isPdf ? await this.readPdfStream(response) : await response.json();
             
             // Show results
             this.showResults({
                 classification: data.classification,
                 processedImageUrl: data.processed_image_url,
+                processedPdfUrl: data.processed_pdf_url,
+                pages: data.pages,
                 confidence: data.confidence,
                 originalFileName: this.selectedFile.name
             });
@@ -196,6 +210,68 @@ class DocumentScanner {
         this.isProcessing = false;
     }
 
+    async readPdfStream(response) {
+        // NDJSON: one JSON event per line; pages are rendered as they arrive
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let result = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            for (const line of lines) {
+                if (!line.trim()) continue;
+                const event = JSON.parse(line);
+                if (event.type === 'error') {
+                    throw new Error(event.error);
+                } else if (event.type === 'page') {
+                    this.addPageResult(event);
+                } else if (event.type === 'done') {
+                    result = event;
+                }
+            }
+        }
+
+        if (!result) {
+            throw new Error('The server stopped before the document was complete');
+        }
+        return result;
+    }
+
+    addPageResult(page) {
+        // The first finished page replaces the processing screen
+        if (document.getElementById('results-section').style.display !== 'block') {
+            this.showResults({
+                classification: page.classification,
+                processedImageUrl: page.processed_image_url,
+                confidence: page.confidence,
+                originalFileName: this.selectedFile.name
+            });
+        }
+
+        const container = document.getElementById('page-results');
+        const thumb = document.createElement('img');
+        thumb.src = page.processed_image_url;
+        thumb.alt = `Page ${page.page}: ${page.classification}`;
+        thumb.title = thumb.alt;
+        thumb.className = `page-thumb ${page.classification === 'Sensitive' ? 'sensitive' : 'non-sensitive'}`;
+        thumb.addEventListener('click', () => {
+            document.getElementById('processed-img').src = page.processed_image_url;
+        });
+        container.appendChild(thumb);
+        container.style.display = 'flex';
+    }
+
+    clearPageResults() {
+        const container = document.getElementById('page-results');
+        container.innerHTML = '';
+        container.style.display = 'none';
+    }
+
     showProcessingStatus() {
         document.getElementById('upload-section').style.display = 'none';
         document.getElementById('processing-section').style.display = 'block';
@@ -274,6 +350,10 @@ class DocumentScanner {
         description.textContent = isSensitive ?
             'This document contains sensitive information and has been automatically blurred for privacy protection.' :
             'This document does not contain sensitive information and is safe to share.';
+        if (result.pages && result.pages.length > 1) {
+            const sensitivePages = result.pages.filter((page) => page.classification === 'Sensitive').length;
+            description.textContent += ` (${sensitivePages} of ${result.pages.length} pages sensitive)`;
+        }
 
         // Update confidence
         if (result.confidence) {
@@ -298,8 +378,8 @@ class DocumentScanner {
         sensitiveOverlay.style.display = isSensitive ? 'block' : 'none';
         processedStatus.textContent = isSensitive ? 'Privacy protected' : 'Original quality maintained';
 
-        // Store for download
-        this.processedImageUrl = result.processedImageUrl;
+        // Store for download (PDFs download as the redacted PDF)
+        this.processedImageUrl = result.processedPdfUrl || result.processedImageUrl;
         this.originalFileName = result.originalFileName;
     }
 
@@ -1,20 +1,38 @@
 import os
+import re
 import sys
+import time
+import secrets
 import tempfile
 import base64
-from flask import Flask, request, jsonify, render_template_string
+import json
+from functools import partial
+from flask import Flask, Response, request, jsonify, render_template_string, send_file, stream_with_context, url_for
+import cv2
+import numpy as np
 
 # Adjust this import based on where you save ml_core.py (or testing.py)
 # If you rename 'ml_core.py' to 'testing.py' and place it in a subdirectory 
-# like the user's original path, you would use: from testing import predict_image, redact_sensitive_info
+# like the user's original path, you would use: from testing import predict_image_with_saliency, redact_sensitive_info
 # For simplicity, we assume ml_core.py is in the current directory.
 try:
-    from ml_core import predict_image, redact_sensitive_info
+    from ml_core import predict_image_with_saliency, redact_image, detect_sensitive_info
 except ImportError:
     # Fallback/Error handling if ml_core.py is not found.
     print("ERROR: Could not import ml_core.py. Ensure it is in the same directory.")
     sys.exit(1)
 
+from image_encoding import encode_image, negotiate_format, resolve_quality
+from pdf_io import JpegPdfWriter, encode_jpeg, map_pdf_pages, PDF_DPI, PDF_PAGE_WORKERS, PDF_JPEG_QUALITY
+from pdf_text import extract_text_lines, image_regions
+
+# Digital PDFs: use the embedded text layer instead of OCR where a page has one
+PDF_TEXT_LAYER = True
+# Redacted PDFs are kept on disk and served from /download/<token> for this long
+PDF_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "redacted_pdfs")
+PDF_DOWNLOAD_TTL_S = 3600
+DOWNLOAD_TOKEN = re.compile(r"[A-Za-z0-9_-]{22}")
+
 
 app = Flask(__name__)
 
@@ -581,6 +599,32 @@ HTML_CONTENT = """
             justify-content: space-between;
         }
 
+        /* Per-page results (multi-page PDFs) */
+        .page-results {
+            display: flex;
+            gap: 0.5rem;
+            overflow-x: auto;
+            padding: 0.75rem 1rem;
+            border-top: 1px solid var(--border);
+        }
+
+        .page-thumb {
+            height: 5rem;
+            width: auto;
+            border-radius: calc(var(--radius) / 2);
+            border: 2px solid var(--border);
+            cursor: pointer;
+            flex-shrink: 0;
+        }
+
+        .page-thumb.sensitive {
+            border-color: var(--destructive);
+        }
+
+        .page-thumb.non-sensitive {
+            border-color: var(--success);
+        }
+
         .processed-image-info h4 {
             font-weight: 600;
             margin-bottom: 0.25rem;
@@ -881,7 +925,7 @@ HTML_CONTENT = """
                         </button>
                     </div>
 
-                    <input type="file" id="file-input" accept="image/jpeg,image/jpg,image/png,image/webp" style="display: none;">
+                    <input type="file" id="file-input" accept="image/jpeg,image/jpg,image/png,image/webp,application/pdf" style="display: none;">
                 </div>
 
                 <!-- Image Preview -->
@@ -1002,6 +1046,8 @@ HTML_CONTENT = """
                         </span>
                     </div>
                 </div>
+
+                <div id="page-results" class="page-results" style="display: none;"></div>
                 
                 <div class="processed-image-footer">
                     <div class="processed-image-info">
@@ -1133,15 +1179,16 @@ HTML_CONTENT = """
             }
 
             handleFile(file) {
-                const validTypes = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp'];
+                const validTypes = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp', 'application/pdf'];
                 
                 if (!validTypes.includes(file.type)) {
-                    this.showToast('Invalid file type', 'Please select a JPEG, PNG, or WebP image file.', 'error');
+                    this.showToast('Invalid file type', 'Please select a JPEG, PNG, or WebP image or a PDF file.', 'error');
                     return;
                 }
 
-                if (file.size > 10 * 1024 * 1024) { // 10MB limit
-                    this.showToast('File too large', 'Please select an image smaller than 10MB.', 'error');
+                const isPdf = file.type === 'application/pdf';
+                if (file.size > (isPdf ? 50 : 10) * 1024 * 1024) { // 10MB limit for images, 50MB for PDFs
+                    this.showToast('File too large', isPdf ? 'Please select a PDF smaller than 50MB.' : 'Please select an image smaller than 10MB.', 'error');
                     return;
                 }
 
@@ -1160,12 +1207,17 @@ HTML_CONTENT = """
                 // Hide upload zone
                 uploadZone.style.display = 'none';
 
-                // Create and show preview
-                const reader = new FileReader();
-                reader.onload = (e) => {
-                    previewImg.src = e.target.result;
-                };
-                reader.readAsDataURL(file);
+                // Create and show preview (PDF pages are only rendered server-side)
+                if (file.type === 'application/pdf') {
+                    previewImg.removeAttribute('src');
+                    previewImg.alt = `PDF document: ${file.name}`;
+                } else {
+                    const reader = new FileReader();
+                    reader.onload = (e) => {
+                        previewImg.src = e.target.result;
+                    };
+                    reader.readAsDataURL(file);
+                }
 
                 fileName.textContent = file.name;
                 fileSize.textContent = `(${(file.size / 1024 / 1024).toFixed(2)} MB)`;
@@ -1183,6 +1235,7 @@ HTML_CONTENT = """
                 document.getElementById('image-preview').style.display = 'none';
                 document.getElementById('process-section').style.display = 'none';
                 document.getElementById('file-input').value = '';
+                this.clearPageResults();
                 this.processedImageUrl = '';
                 this.originalFileName = '';
 
@@ -1201,6 +1254,11 @@ HTML_CONTENT = """
                     // Create FormData to send to Flask backend
                     const formData = new FormData();
                     formData.append('file', this.selectedFile);
+                    // PDFs stream per-page results as NDJSON
+                    const isPdf = this.selectedFile.type === 'application/pdf';
+                    if (isPdf) {
+                        formData.append('stream', '1');
+                    }
 
                     // Start processing animation
                     this.startProcessingAnimation();
@@ -1228,12 +1286,14 @@ HTML_CONTENT = """
                         }
                     }
 
-                    const data = await response.json();
+                    const data = isPdf ? await this.readPdfStream(response) : await response.json();
                     
                     // Show results
                     this.showResults({
                         classification: data.classification,
                         processedImageUrl: data.processed_image_url, // Base64 Data URL
+                        processedPdfUrl: data.processed_pdf_url, // PDFs only: /download URL
+                        pages: data.pages,
                         confidence: data.confidence,
                         originalFileName: this.selectedFile.name
                     });
@@ -1259,6 +1319,68 @@ HTML_CONTENT = """
                 this.isProcessing = false;
             }
 
+            async readPdfStream(response) {
+                // NDJSON: one JSON event per line; pages are rendered as they arrive
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                let result = null;
+
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split('\\n');
+                    buffer = lines.pop();
+                    for (const line of lines) {
+                        if (!line.trim()) continue;
+                        const event = JSON.parse(line);
+                        if (event.type === 'error') {
+                            throw new Error(event.error);
+                        } else if (event.type === 'page') {
+                            this.addPageResult(event);
+                        } else if (event.type === 'done') {
+                            result = event;
+                        }
+                    }
+                }
+
+                if (!result) {
+                    throw new Error('The server stopped before the document was complete');
+                }
+                return result;
+            }
+
+            addPageResult(page) {
+                // The first finished page replaces the processing screen
+                if (document.getElementById('results-section').style.display !== 'block') {
+                    this.showResults({
+                        classification: page.classification,
+                        processedImageUrl: page.processed_image_url,
+                        confidence: page.confidence,
+                        originalFileName: this.selectedFile.name
+                    });
+                }
+
+                const container = document.getElementById('page-results');
+                const thumb = document.createElement('img');
+                thumb.src = page.processed_image_url;
+                thumb.alt = `Page ${page.page}: ${page.classification}`;
+                thumb.title = thumb.alt;
+                thumb.className = `page-thumb ${page.classification === 'Sensitive' ? 'sensitive' : 'non-sensitive'}`;
+                thumb.addEventListener('click', () => {
+                    document.getElementById('processed-img').src = page.processed_image_url;
+                });
+                container.appendChild(thumb);
+                container.style.display = 'flex';
+            }
+
+            clearPageResults() {
+                const container = document.getElementById('page-results');
+                container.innerHTML = '';
+                container.style.display = 'none';
+            }
+
             showProcessingStatus() {
                 document.getElementById('upload-section').style.display = 'none';
                 document.getElementById('processing-section').style.display = 'block';
@@ -1343,6 +1465,10 @@ HTML_CONTENT = """
                 description.textContent = isSensitive ?
                     'This document contains sensitive information and has been automatically blurred for privacy protection.' :
                     'This document does not contain sensitive information and is safe to share.';
+                if (result.pages && result.pages.length > 1) {
+                    const sensitivePages = result.pages.filter((page) => page.classification === 'Sensitive').length;
+                    description.textContent += ` (${sensitivePages} of ${result.pages.length} pages sensitive)`;
+                }
 
                 // Update confidence
                 if (result.confidence) {
@@ -1369,8 +1495,8 @@ HTML_CONTENT = """
                 sensitiveOverlay.style.display = isSensitive ? 'block' : 'none';
                 processedStatus.textContent = isSensitive ? 'Privacy protected' : 'Original quality maintained';
 
-                // Store for download
-                this.processedImageUrl = result.processedImageUrl;
+                // Store for download (PDFs download as the redacted PDF)
+                this.processedImageUrl = result.processedPdfUrl || result.processedImageUrl;
                 this.originalFileName = result.originalFileName;
             }
 
@@ -1462,11 +1588,157 @@ def home():
     # to keep the solution contained, matching the previous FastAPI structure.
     return render_template_string(HTML_CONTENT)
 
+def _text_layer(pdf_path: str, page_no: int):
+    """
+    (text_lines, image_regions) for one page: its text layer plus the embedded
+    images that text does not cover, or (None, None) if the page must take the
+    image path as a whole (no text layer, or its images cannot be listed).
+    """
+    if not PDF_TEXT_LAYER:
+        return None, None
+    text_lines = extract_text_lines(pdf_path, page_no, PDF_DPI)
+    if text_lines is None:
+        return None, None
+    regions = image_regions(pdf_path, page_no, text_lines, PDF_DPI)
+    if regions is None:
+        return None, None
+    return text_lines, regions
+
+
+def _process_pdf_page(pdf_path: str, page_no: int, image) -> dict:
+    """
+    Classifies one rasterised PDF page and redacts it if Sensitive; returns JPEG bytes.
+    Pages with a text layer are redacted from that text; image-only pages, and the
+    images embedded in text pages, are OCR'd.
+    The output PDF is image-only, so redacted text cannot be recovered from it.
+    """
+    temp_page_file = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f"_page{page_no}.jpg") as tmp:
+            temp_page_file = tmp.name
+        image.save(temp_page_file, "JPEG", quality=95)
+
+        classification_label, confidence_score, saliency = predict_image_with_saliency(temp_page_file)
+        text_lines = None
+        if classification_label == "Sensitive":
+            text_lines, regions = _text_layer(pdf_path, page_no)
+            img = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+            redacted = redact_image(img, saliency=saliency, text_lines=text_lines, image_regions=regions)
+            jpeg_bytes, _ = encode_image(redacted, "jpeg", PDF_JPEG_QUALITY)
+        else:
+            jpeg_bytes = encode_jpeg(image)
+
+        return {
+            "page": page_no,
+            "classification": classification_label,
+            "confidence": confidence_score,
+            "text_layer": text_lines is not None,
+            "jpeg": jpeg_bytes,
+            "size": image.size,
+        }
+    finally:
+        if temp_page_file and os.path.exists(temp_page_file):
+            os.remove(temp_page_file)
+
+
+def _remove_expired_pdfs() -> None:
+    """Deletes redacted PDFs older than PDF_DOWNLOAD_TTL_S."""
+    cutoff = time.time() - PDF_DOWNLOAD_TTL_S
+    for entry in os.scandir(PDF_OUTPUT_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass  # already removed by another worker
+
+
+def _iter_pdf(pdf_path: str, page_images: bool = True):
+    """
+    Runs every page of a PDF through classification and redaction (bounded
+    parallelism, see pdf_io.py) and writes the pages into a redacted PDF on
+    disk. Yields a "page" event as each page finishes (in page order), then a
+    "done" event for the whole document, which is Sensitive if any page is.
+    The PDF is returned as a /download URL rather than inline, and only the
+    first page is encoded as a data URL unless `page_images` is set, so memory
+    does not grow with the length of the document.
+    """
+    os.makedirs(PDF_OUTPUT_DIR, exist_ok=True)
+    _remove_expired_pdfs()
+    token = secrets.token_urlsafe(16)
+    output_pdf_file = os.path.join(PDF_OUTPUT_DIR, f"{token}.pdf")
+
+    pages = []
+    preview_url = None
+    try:
+        with open(output_pdf_file, "wb") as out:
+            writer = JpegPdfWriter(out)
+            for page in map_pdf_pages(pdf_path, partial(_process_pdf_page, pdf_path), PDF_DPI, PDF_PAGE_WORKERS):
+                writer.add_page(page["jpeg"], page["size"][0], page["size"][1], PDF_DPI)
+                result = {key: page[key] for key in ("page", "classification", "confidence", "text_layer")}
+                pages.append(result)
+                event = {"type": "page", **result}
+                if page_images or preview_url is None:
+                    page_url = f"data:image/jpeg;base64,{base64.b64encode(page['jpeg']).decode()}"
+                    preview_url = preview_url or page_url
+                    if page_images:
+                        event["processed_image_url"] = page_url
+                yield event
+            writer.close()
+    except BaseException:
+        os.remove(output_pdf_file)
+        raise
+
+    sensitive = any(page["classification"] == "Sensitive" for page in pages)
+    yield {
+        "type": "done",
+        "classification": "Sensitive" if sensitive else "Non-Sensitive",
+        "confidence": max((page["confidence"] for page in pages), default=0.0),
+        "processed_image_url": preview_url,  # first page, for the preview
+        "processed_pdf_url": url_for("download_pdf", token=token),
+        "pages": pages,
+    }
+
+
+def _process_pdf(pdf_path: str) -> dict:
+    """Whole-document result of _iter_pdf (the "done" event), without per-page images."""
+    for event in _iter_pdf(pdf_path, page_images=False):
+        if event["type"] == "done":
+            return {key: value for key, value in event.items() if key != "type"}
+
+
+def _stream_pdf(pdf_path: str):
+    """
+    NDJSON body for streaming mode: one JSON event per line. Owns the uploaded
+    file, since the response outlives the request handler.
+    """
+    try:
+        for event in _iter_pdf(pdf_path):
+            yield json.dumps(event) + "\n"
+    except Exception as e:
+        print(f"Server-side error during processing: {e}")
+        yield json.dumps({"type": "error", "error": f"An internal error occurred: {str(e)}"}) + "\n"
+    finally:
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+
+
+@app.route('/download/<token>')
+def download_pdf(token):
+    """Serves a redacted PDF written by _iter_pdf until it expires (PDF_DOWNLOAD_TTL_S)."""
+    path = os.path.join(PDF_OUTPUT_DIR, f"{token}.pdf")
+    if not DOWNLOAD_TOKEN.fullmatch(token) or not os.path.exists(path):
+        return jsonify({"error": "Unknown or expired download"}), 404
+    return send_file(path, mimetype="application/pdf", as_attachment=True, download_name="redacted.pdf")
+
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """
     Handles file upload, runs ML processing, and returns JSON response 
-    expected by the frontend JavaScript.
+    expected by the frontend JavaScript. PDFs uploaded with stream=1 get an
+    NDJSON response instead, with one event per page as soon as it is done.
+    Redacted images are encoded in memory; `format` (png / jpeg / webp) and
+    `quality` pick the encoding, else the Accept header, else PNG.
     """
     if 'file' not in request.files:
         return jsonify({"error": "No file part in request"}), 400
@@ -1475,42 +1747,52 @@ def upload_file():
     if file.filename == '':
         return jsonify({"error": "No file selected"}), 400
 
+    try:
+        output_format = negotiate_format(request.values.get("format"), request.accept_mimetypes)
+        output_quality = resolve_quality(output_format, request.values.get("quality", type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     # 1. Save uploaded file to a temporary location
     temp_input_file = None
-    temp_output_file = None
     
     try:
         # Use NamedTemporaryFile to safely handle file storage
         with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{file.filename}") as tmp:
             file.save(tmp.name)
             temp_input_file = tmp.name
+
+        # PDFs: every page is classified (and redacted); returns a redacted PDF
+        if file.filename.lower().endswith(".pdf"):
+            if request.form.get("stream") == "1":
+                pdf_path, temp_input_file = temp_input_file, None  # cleaned up by the stream
+                return Response(
+                    stream_with_context(_stream_pdf(pdf_path)),
+                    mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                )
+            return jsonify(_process_pdf(temp_input_file))
         
-        # 2. Run Prediction (Classification)
-        classification_label, confidence_score = predict_image(temp_input_file)
+        # 2. Run Prediction (Classification); the saliency map can steer OCR
+        classification_label, confidence_score, saliency = predict_image_with_saliency(temp_input_file)
         
-        # 3. Determine the final image path
+        # 3. Determine the final image bytes
         if classification_label == "Sensitive":
-            # If Sensitive, run Redaction (OCR + Blurring)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp_out:
-                temp_output_file = tmp_out.name
-            
-            # The redact function saves the processed image to temp_output_file
-            redact_sensitive_info(temp_input_file, temp_output_file)
-            final_image_path = temp_output_file
-            # Force output to PNG for consistency after CV processing
-            output_format = "PNG" 
+            # If Sensitive, run Redaction (OCR + Blurring) and encode in memory
+            img = cv2.imread(temp_input_file)
+            if img is None:
+                raise ValueError(f"OpenCV failed to read image at: {temp_input_file}")
+            image_bytes, mime_type = encode_image(redact_image(img, saliency=saliency), output_format, output_quality)
         else:
             # If Non-sensitive, use the original image
-            final_image_path = temp_input_file
+            with open(temp_input_file, "rb") as f:
+                image_bytes = f.read()
             # Determine format from original file extension
-            output_format = file.filename.split('.')[-1].upper()
+            mime_type = f"image/{file.filename.split('.')[-1].lower()}"
         
-        # 4. Read the final image bytes and encode to Base64 (Data URL format)
-        with open(final_image_path, "rb") as f:
-            image_bytes = f.read()
-            
+        # 4. Encode to Base64 (Data URL format)
         img_str = base64.b64encode(image_bytes).decode()
-        processed_data_url = f"data:image/{output_format.lower()};base64,{img_str}"
+        processed_data_url = f"data:{mime_type};base64,{img_str}"
 
         # 5. Return Results to Front-end as JSON
         return jsonify({
@@ -1527,12 +1809,90 @@ def upload_file():
         # 6. CRITICAL: Cleanup temporary files
         if temp_input_file and os.path.exists(temp_input_file):
             os.remove(temp_input_file)
-        if temp_output_file and os.path.exists(temp_output_file):
-            os.remove(temp_output_file)
+
+
+def _detect_pdf_page(pdf_path: str, page_no: int, image) -> dict:
+    """Detect-only counterpart of _process_pdf_page: classification and PII regions, no output image."""
+    temp_page_file = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f"_page{page_no}.jpg") as tmp:
+            temp_page_file = tmp.name
+        image.save(temp_page_file, "JPEG", quality=95)
+
+        classification_label, confidence_score, saliency = predict_image_with_saliency(temp_page_file)
+        text_lines = None
+        matches = []
+        if classification_label == "Sensitive":
+            text_lines, regions = _text_layer(pdf_path, page_no)
+            matches = detect_sensitive_info(temp_page_file, saliency=saliency, text_lines=text_lines,
+                                            image_regions=regions)
+
+        return {
+            "page": page_no,
+            "classification": classification_label,
+            "confidence": confidence_score,
+            "text_layer": text_lines is not None,
+            "matches": matches,
+        }
+    finally:
+        if temp_page_file and os.path.exists(temp_page_file):
+            os.remove(temp_page_file)
+
+
+@app.route('/detect', methods=['POST'])
+def detect_file():
+    """
+    Detect-only API for callers that apply masking themselves: returns the
+    classification and, for Sensitive documents, every PII region found by the
+    redaction logic (type, keyed text hash, confidence, polygon in image
+    pixels). No image is written, encoded or returned. PDFs report per page
+    (polygons in pixels of the page rasterised at PDF_DPI).
+    """
+    if 'file' not in request.files:
+        return jsonify({"error": "No file part in request"}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No file selected"}), 400
+
+    temp_input_file = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{file.filename}") as tmp:
+            file.save(tmp.name)
+            temp_input_file = tmp.name
+
+        if file.filename.lower().endswith(".pdf"):
+            pages = list(map_pdf_pages(temp_input_file, partial(_detect_pdf_page, temp_input_file), PDF_DPI, PDF_PAGE_WORKERS))
+            sensitive = any(page["classification"] == "Sensitive" for page in pages)
+            return jsonify({
+                "classification": "Sensitive" if sensitive else "Non-Sensitive",
+                "confidence": max((page["confidence"] for page in pages), default=0.0),
+                "dpi": PDF_DPI,
+                "pages": pages,
+            })
+
+        classification_label, confidence_score, saliency = predict_image_with_saliency(temp_input_file)
+        matches = []
+        if classification_label == "Sensitive":
+            matches = detect_sensitive_info(temp_input_file, saliency=saliency)
+
+        return jsonify({
+            "classification": classification_label,
+            "confidence": confidence_score,
+            "matches": matches,
+        })
+
+    except Exception as e:
+        print(f"Server-side error during detection: {e}")
+        return jsonify({"error": f"An internal error occurred: {str(e)}"}), 500
+
+    finally:
+        if temp_input_file and os.path.exists(temp_input_file):
+            os.remove(temp_input_file)
 
 # The /uploads and /outputs routes are no longer needed since we return Base64 Data URLs.
 
 # -------------------------------
 if __name__ == "__main__":
-    # Ensure you have Flask, torch, torchvision, opencv-python, and paddleocr installed
+    # Ensure you have Flask, torch, torchvision, opencv-python, and paddleocr<3 installed
     app.run(debug=True)
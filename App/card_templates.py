@@ -0,0 +1,157 @@
+"""
+Template-registered redaction for fixed card layouts (Aadhaar, PAN, ...).
+
+Each template is a folder under Card_Templates/ holding a reference image and
+a template.json listing the field rectangles to redact, in reference-image
+pixels. Uploads are aligned to the templates with ORB keypoints + a RANSAC
+homography; when alignment is confident, the mapped field regions can be
+redacted directly and the (seconds-long) OCR pass skipped.
+
+Register a template:
+    python card_templates.py aadhaar_front ref.png aadhaar_number:60,410,520,60 photo:20,120,170,210
+"""
+import json
+import os
+import shutil
+import sys
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Card_Templates")
+
+# Images are matched at this longer-side resolution (both reference and upload)
+MATCH_SIZE = 800
+ORB_FEATURES = 1500
+RATIO_TEST = 0.75
+MIN_GOOD_MATCHES = 20
+MIN_INLIERS = 25
+MIN_CONFIDENCE = 0.45  # inliers / good matches
+
+
+@dataclass
+class CardTemplate:
+    name: str
+    fields: list          # [(field_type, (x, y, w, h))] in reference pixels
+    scale: float          # reference pixels -> matching resolution
+    keypoints: list
+    descriptors: np.ndarray
+
+
+@dataclass
+class TemplateAlignment:
+    template: str
+    confidence: float
+    inliers: int
+    fields: list          # [(field_type, 4x2 polygon in upload pixels)]
+
+
+def _prepare(img: np.ndarray):
+    """Grayscale + resize to MATCH_SIZE on the longer side; returns (gray, scale)."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    scale = MATCH_SIZE / max(gray.shape[:2])
+    gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray, scale
+
+
+class TemplateRegistry:
+    """Loads card templates once and aligns uploads against all of them."""
+
+    def __init__(self, root: str = TEMPLATES_DIR):
+        self.root = root
+        self.orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        self.templates = []
+        self.load()
+
+    def load(self) -> None:
+        self.templates = []
+        if not os.path.isdir(self.root):
+            return
+        for name in sorted(os.listdir(self.root)):
+            spec_path = os.path.join(self.root, name, "template.json")
+            if not os.path.isfile(spec_path):
+                continue
+            with open(spec_path, "r", encoding="utf-8") as f:
+                spec = json.load(f)
+            reference = cv2.imread(os.path.join(self.root, name, spec["reference"]))
+            if reference is None:
+                print(f"Warning: Reference image missing for card template '{name}'. Skipping.")
+                continue
+            gray, scale = _prepare(reference)
+            keypoints, descriptors = self.orb.detectAndCompute(gray, None)
+            if descriptors is None:
+                continue
+            fields = [(field["type"], tuple(field["rect"])) for field in spec["fields"]]
+            self.templates.append(CardTemplate(name, fields, scale, keypoints, descriptors))
+
+    def register(self, name: str, reference_path: str, fields: list) -> None:
+        """Stores a new template ([(field_type, (x, y, w, h)), ...]) and reloads."""
+        folder = os.path.join(self.root, name)
+        os.makedirs(folder, exist_ok=True)
+        reference_name = "reference" + os.path.splitext(reference_path)[1].lower()
+        shutil.copy(reference_path, os.path.join(folder, reference_name))
+        spec = {
+            "reference": reference_name,
+            "fields": [{"type": field_type, "rect": list(rect)} for field_type, rect in fields],
+        }
+        with open(os.path.join(folder, "template.json"), "w", encoding="utf-8") as f:
+            json.dump(spec, f, indent=2)
+        self.load()
+
+    def align(self, img: np.ndarray):
+        """Returns the best TemplateAlignment for `img`, or None if no template is confident."""
+        if not self.templates:
+            return None
+        gray, scale = _prepare(img)
+        keypoints, descriptors = self.orb.detectAndCompute(gray, None)
+        if descriptors is None or len(keypoints) < MIN_GOOD_MATCHES:
+            return None
+
+        best = None
+        for template in self.templates:
+            pairs = self.matcher.knnMatch(template.descriptors, descriptors, k=2)
+            good = [p[0] for p in pairs if len(p) == 2 and p[0].distance < RATIO_TEST * p[1].distance]
+            if len(good) < MIN_GOOD_MATCHES:
+                continue
+
+            src = np.float32([template.keypoints[m.queryIdx].pt for m in good]).reshape(-1, 1, 2)
+            dst = np.float32([keypoints[m.trainIdx].pt for m in good]).reshape(-1, 1, 2)
+            homography, mask = cv2.findHomography(src, dst, cv2.RANSAC, 5.0)
+            if homography is None:
+                continue
+            inliers = int(mask.sum())
+            confidence = inliers / len(good)
+            if inliers < MIN_INLIERS or confidence < MIN_CONFIDENCE:
+                continue
+            if best is None or inliers > best[2]:
+                best = (template, homography, inliers, confidence)
+
+        if best is None:
+            return None
+
+        template, homography, inliers, confidence = best
+        fields = []
+        for field_type, (x, y, w, h) in template.fields:
+            corners = np.float32([[x, y], [x + w, y], [x + w, y + h], [x, y + h]]) * template.scale
+            mapped = cv2.perspectiveTransform(corners.reshape(-1, 1, 2), homography).reshape(-1, 2) / scale
+            # A folded/degenerate quad means the homography is not trustworthy
+            if not cv2.isContourConvex(mapped.astype(np.float32)):
+                return None
+            fields.append((field_type, mapped))
+        return TemplateAlignment(template.name, confidence, inliers, fields)
+
+
+# --- Template Registration CLI ---
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        sys.exit("Usage: python card_templates.py <name> <reference_image> <type:x,y,w,h> [...]")
+    name, reference_path = sys.argv[1], sys.argv[2]
+    fields = []
+    for arg in sys.argv[3:]:
+        field_type, rect = arg.split(":", 1)
+        fields.append((field_type, tuple(int(v) for v in rect.split(","))))
+    TemplateRegistry().register(name, reference_path, fields)
+    print(f"✅ Registered card template '{name}' with {len(fields)} field(s).")
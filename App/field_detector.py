@@ -0,0 +1,82 @@
+"""
+Learned PII field detector: predicts boxes for PII fields (Aadhaar number, PAN,
+photo, QR, DOB, name) directly from pixels, as an OCR-free redaction path.
+
+The architecture is torchvision's Faster R-CNN with a MobileNetV3-Large 320
+FPN backbone, which runs in well under a second per card on CPU. Training lives
+in Model/train_field_detector.py.
+"""
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+import torch
+from torchvision.models.detection import fasterrcnn_mobilenet_v3_large_320_fpn
+from torchvision.ops import FrozenBatchNorm2d
+
+# Index 0 is reserved for the background class
+FIELD_CLASSES = ("aadhaar_number", "pan", "photo", "qr", "dob", "name")
+
+# Detections below this score are not reported at all
+MIN_SCORE = 0.3
+
+
+@dataclass(frozen=True)
+class FieldDetection:
+    field: str
+    score: float
+    points: tuple  # 4 corner points, clockwise from top-left
+
+
+def _freeze_batch_norm(module: torch.nn.Module) -> None:
+    """Replaces every BatchNorm2d under `module` with a FrozenBatchNorm2d of the same size and eps."""
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.BatchNorm2d):
+            setattr(module, name, FrozenBatchNorm2d(child.num_features, eps=child.eps))
+        else:
+            _freeze_batch_norm(child)
+
+
+def build_detector(pretrained_backbone: bool = False):
+    """
+    Recreates the detector architecture (len(FIELD_CLASSES) + background).
+    torchvision builds a pretrained backbone (training) with FrozenBatchNorm2d
+    but an untrained one (serving) with BatchNorm2d; the latter is frozen too,
+    so trained weights load into the same normalisation they were trained with.
+    """
+    weights_backbone = "DEFAULT" if pretrained_backbone else None
+    model = fasterrcnn_mobilenet_v3_large_320_fpn(
+        weights=None,
+        weights_backbone=weights_backbone,
+        num_classes=len(FIELD_CLASSES) + 1,
+    )
+    if not pretrained_backbone:
+        _freeze_batch_norm(model.backbone)
+    return model
+
+
+class FieldDetector:
+    """Loads trained detector weights and runs inference on BGR images."""
+
+    def __init__(self, weights_path: str, device: torch.device):
+        self.device = device
+        self.model = build_detector()
+        self.model.load_state_dict(torch.load(weights_path, map_location=device))
+        self.model.to(device)
+        self.model.eval()
+
+    def detect(self, img: np.ndarray, min_score: float = MIN_SCORE) -> list[FieldDetection]:
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        tensor = torch.from_numpy(rgb).permute(2, 0, 1).float().div(255.0).to(self.device)
+
+        with torch.no_grad():
+            output = self.model([tensor])[0]
+
+        detections = []
+        for box, label, score in zip(output["boxes"].tolist(), output["labels"].tolist(), output["scores"].tolist()):
+            if score < min_score:
+                continue
+            x0, y0, x1, y1 = box
+            points = ((x0, y0), (x1, y0), (x1, y1), (x0, y1))
+            detections.append(FieldDetection(FIELD_CLASSES[label - 1], score, points))
+        return detections
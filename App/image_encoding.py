@@ -0,0 +1,63 @@
+"""
+In-memory image encoding for API responses, with output format negotiation.
+
+Redacted images are encoded with `cv2.imencode` straight from the array; there
+is no temp file to write and read back. The format comes from the request's
+`format` field (png / jpeg / webp) or, failing that, from its Accept header;
+`quality` means the compression level (0-9) for PNG and quality (1-100) for
+JPEG and WebP (above 100 = lossless WebP).
+"""
+import cv2
+import numpy as np
+
+# format -> (MIME type, OpenCV extension, OpenCV quality flag, default, valid range)
+OUTPUT_FORMATS = {
+    "png": ("image/png", ".png", cv2.IMWRITE_PNG_COMPRESSION, 3, (0, 9)),
+    "jpeg": ("image/jpeg", ".jpg", cv2.IMWRITE_JPEG_QUALITY, 90, (1, 100)),
+    "webp": ("image/webp", ".webp", cv2.IMWRITE_WEBP_QUALITY, 90, (1, 101)),
+}
+FORMAT_ALIASES = {"jpg": "jpeg"}
+DEFAULT_FORMAT = "png"  # lossless, as before
+
+
+def normalise_format(name: str) -> str:
+    name = FORMAT_ALIASES.get(name.lower(), name.lower())
+    if name not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{name}'. Choose from: {', '.join(OUTPUT_FORMATS)}")
+    return name
+
+
+def negotiate_format(requested: str = None, accept=None) -> str:
+    """
+    Explicit `requested` format wins; otherwise the best image type in the
+    Accept header (a werkzeug MIMEAccept), else DEFAULT_FORMAT.
+    """
+    if requested:
+        return normalise_format(requested)
+    if accept is not None:
+        mimetypes = {mime: name for name, (mime, *_) in OUTPUT_FORMATS.items()}
+        # Only an explicitly listed image type counts; */* keeps the default
+        listed = {mime: q for mime, q in accept if mime in mimetypes and q > 0}
+        if listed:
+            return mimetypes[max(listed, key=listed.get)]
+    return DEFAULT_FORMAT
+
+
+def resolve_quality(fmt: str, quality: int = None) -> int:
+    """The format's default quality, or `quality` after a range check."""
+    _, _, _, default, (low, high) = OUTPUT_FORMATS[normalise_format(fmt)]
+    if quality is None:
+        return default
+    if not low <= int(quality) <= high:
+        raise ValueError(f"Quality for {fmt} must be between {low} and {high}.")
+    return int(quality)
+
+
+def encode_image(img: np.ndarray, fmt: str = DEFAULT_FORMAT, quality: int = None) -> tuple[bytes, str]:
+    """Encodes a BGR image in memory; returns (bytes, MIME type)."""
+    fmt = normalise_format(fmt)
+    mime, ext, flag, _, _ = OUTPUT_FORMATS[fmt]
+    ok, buffer = cv2.imencode(ext, img, [flag, resolve_quality(fmt, quality)])
+    if not ok:
+        raise RuntimeError(f"OpenCV failed to encode the image as {fmt}.")
+    return buffer.tobytes(), mime
@@ -0,0 +1,216 @@
+"""
+Layout-aware key/value PII detection over PaddleOCR output.
+
+Names, dates of birth, addresses etc. are found by their position next to a
+label ("Name", "DOB", "Father", "Address") rather than by regex. OCR boxes are
+put into a uniform grid index so that every label only looks at the cells in
+its reading direction (to the right on the same line, then below), which keeps
+a page linear in the number of boxes instead of comparing all pairs.
+"""
+import re
+from dataclasses import dataclass
+from statistics import median
+from typing import Iterable
+
+
+# --- 1. Label Vocabulary ---
+
+# Field -> label pattern. Order matters: "Father's Name" must win over "Name".
+LABEL_PATTERNS = (
+    ("father", r"father(?:'?s)?(?:\s*name)?|s\s*/\s*o|d\s*/\s*o|w\s*/\s*o|guardian"),
+    ("dob", r"d\.?\s?o\.?\s?b\.?|date\s+of\s+birth|year\s+of\s+birth|yob|birth"),
+    ("address", r"address|addr\.?"),
+    ("name", r"name"),
+)
+
+_LABEL_RE = re.compile(
+    # Optional regional-script label first (e.g. "जन्म तिथि/DOB: ..."), then the English label.
+    # Each regional word must be followed by a separator: with an optional one a
+    # run of N non-ASCII characters splits into 2^N words and a miss backtracks through all.
+    r"^\s*(?:[^\x00-\x7F\s/]+[\s/]+)*"
+    r"(?:" + "|".join(f"(?P<{field}>{pattern})" for field, pattern in LABEL_PATTERNS) + r")(?![a-z])"
+    r"\s*(?:/\s*[^\x00-\x7F\s]+(?:\s+[^\x00-\x7F\s]+)*)?\s*[:\-]?\s*(?P<value>.*?)\s*$",
+    re.IGNORECASE,
+)
+
+# Address values usually run over several lines below the label
+MAX_ADDRESS_LINES = 4
+
+
+@dataclass(frozen=True)
+class OCRBox:
+    """One OCR line: quadrilateral points plus its axis-aligned bounds."""
+    points: tuple
+    text: str
+    conf: float
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+    @property
+    def height(self) -> float:
+        return max(1.0, self.y1 - self.y0)
+
+
+@dataclass(frozen=True)
+class LayoutMatch:
+    """A value box resolved from a label, ready to be redacted."""
+    field: str
+    text: str
+    points: tuple
+    label_text: str
+    conf: float  # OCR confidence of the value text
+
+
+def boxes_from_ocr(ocr_lines: Iterable, min_conf: float = 0.0) -> list[OCRBox]:
+    """Converts `ocr.ocr(...)[0]` entries ([points, (text, conf)]) to OCRBoxes."""
+    boxes = []
+    for line in ocr_lines or []:
+        if line is None or len(line) < 2:
+            continue
+        points, (text, conf) = line[0], line[1]
+        if conf < min_conf:
+            continue
+        xs = [float(x) for x, _ in points]
+        ys = [float(y) for _, y in points]
+        boxes.append(OCRBox(tuple((float(x), float(y)) for x, y in points), text, conf,
+                            min(xs), min(ys), max(xs), max(ys)))
+    return boxes
+
+
+# --- 2. Spatial Index ---
+
+class GridIndex:
+    """Uniform grid over box bounds; a box is registered in every cell it touches."""
+
+    def __init__(self, boxes: list[OCRBox], cell_size: float = None):
+        self.boxes = boxes
+        if cell_size is None:
+            # ~2 text lines per cell keeps cells sparse on dense pages
+            cell_size = 2 * median(b.height for b in boxes) if boxes else 32.0
+        self.cell = max(1.0, cell_size)
+        self._cells = {}
+        for idx, box in enumerate(boxes):
+            for key in self._keys(box.x0, box.y0, box.x1, box.y1):
+                self._cells.setdefault(key, []).append(idx)
+
+    def _keys(self, x0, y0, x1, y1):
+        c = self.cell
+        for gx in range(int(x0 // c), int(x1 // c) + 1):
+            for gy in range(int(y0 // c), int(y1 // c) + 1):
+                yield gx, gy
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> list[int]:
+        """Indices of boxes intersecting the rectangle (x0, y0, x1, y1)."""
+        found = set()
+        for key in self._keys(x0, y0, x1, y1):
+            for idx in self._cells.get(key, ()):
+                box = self.boxes[idx]
+                if box.x1 >= x0 and box.x0 <= x1 and box.y1 >= y0 and box.y0 <= y1:
+                    found.add(idx)
+        return sorted(found)
+
+
+# --- 3. Label -> Value Resolution ---
+
+def _match_label(text: str):
+    m = _LABEL_RE.match(text)
+    if m is None:
+        return None, ""
+    field = next(f for f, _ in LABEL_PATTERNS if m.group(f))
+    return field, m.group("value")
+
+
+def _sub_box(box: OCRBox, start: int, end: int) -> tuple:
+    """Approximates the region of characters [start, end) of a box's text."""
+    n = max(1, len(box.text))
+    width = box.x1 - box.x0
+    x0 = box.x0 + width * start / n
+    x1 = box.x0 + width * end / n
+    return ((x0, box.y0), (x1, box.y0), (x1, box.y1), (x0, box.y1))
+
+
+def _right_neighbour(index: GridIndex, label: OCRBox, label_ids: set):
+    """Nearest box to the right of the label on the same text line."""
+    h = label.height
+    best, best_dx = None, None
+    for idx in index.query(label.x1 - h, label.y0, label.x1 + 12 * h, label.y1):
+        box = index.boxes[idx]
+        if idx in label_ids or box is label or box.x0 < label.x1 - h:
+            continue
+        overlap = min(box.y1, label.y1) - max(box.y0, label.y0)
+        if overlap < 0.5 * min(box.height, h):
+            continue
+        dx = box.x0 - label.x1
+        if best is None or dx < best_dx:
+            best, best_dx = box, dx
+    return best
+
+
+def _below_neighbour(index: GridIndex, anchor: OCRBox, label_ids: set):
+    """Nearest box directly below the anchor in the same column."""
+    h = anchor.height
+    best, best_dy = None, None
+    for idx in index.query(anchor.x0 - h, anchor.y1 - 0.3 * h, anchor.x1 + 6 * h, anchor.y1 + 1.5 * h):
+        box = index.boxes[idx]
+        if idx in label_ids or box is anchor or box.y0 < anchor.y0 + 0.5 * h:
+            continue
+        # Value must start within the label's column
+        if box.x0 > anchor.x1 or box.x1 < anchor.x0:
+            continue
+        dy = box.y0 - anchor.y1
+        if best is None or dy < best_dy:
+            best, best_dy = box, dy
+    return best
+
+
+def find_labelled_values(ocr_lines, min_conf: float = 0.0, fields: Iterable[str] = None) -> list[LayoutMatch]:
+    """
+    Resolves label -> value relationships on one page of `ocr.ocr` output.
+    Values are taken from the label's own box ("DOB: 01/01/1990"), else the
+    nearest box to the right on the same line, else the nearest box below.
+    """
+    boxes = boxes_from_ocr(ocr_lines, min_conf)
+    if not boxes:
+        return []
+    wanted = set(fields) if fields is not None else {f for f, _ in LABEL_PATTERNS}
+    index = GridIndex(boxes)
+
+    labels = {}
+    for idx, box in enumerate(boxes):
+        field, inline_value = _match_label(box.text)
+        if field is not None:
+            labels[idx] = (field, inline_value)
+    label_ids = set(labels)
+
+    matches = []
+    for idx, (field, inline_value) in labels.items():
+        if field not in wanted:
+            continue
+        label = boxes[idx]
+
+        if len(inline_value) >= 2:
+            start = label.text.rfind(inline_value)
+            matches.append(LayoutMatch(field, inline_value, _sub_box(label, start, start + len(inline_value)), label.text, label.conf))
+            anchor = label
+        else:
+            value = _right_neighbour(index, label, label_ids)
+            if value is None:
+                value = _below_neighbour(index, label, label_ids)
+            if value is None:
+                continue
+            matches.append(LayoutMatch(field, value.text, value.points, label.text, value.conf))
+            anchor = value
+
+        if field == "address":
+            taken = {id(anchor)}
+            for _ in range(MAX_ADDRESS_LINES - 1):
+                nxt = _below_neighbour(index, anchor, label_ids)
+                if nxt is None or id(nxt) in taken:
+                    break
+                matches.append(LayoutMatch(field, nxt.text, nxt.points, label.text, nxt.conf))
+                taken.add(id(nxt))
+                anchor = nxt
+
+    return matches
@@ -3,11 +3,20 @@ from torchvision import transforms, models
 import torch.nn as nn
 from PIL import Image
 import cv2
-import re
 import os
 import logging
-from paddleocr import PaddleOCR
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from pii_rules import default_engine as pii_engine
+from pii_regions import PIIRegion, find_sensitive_regions
+from card_templates import TemplateRegistry
+from field_detector import FieldDetector
+from near_dup_cache import NearDuplicateCache
+from ocr_tiling import tile_grid, merge_tile_lines
+from ocr_backends import create_backend
+from ocr_pool import OCRPoolClient
+from rec_batching import StagedOCR
 
 # --- Configuration & Initialization ---
 
@@ -21,8 +30,16 @@ device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 DL_MODEL_PATH = "efficientnetb3_best.pth"
 IMAGE_SIZE = 300
 
+# Optional learned PII field detector (Model/train_field_detector.py)
+DETECTOR_MODEL_PATH = "field_detector_best.pth"
+# Redact from detector boxes only if every detection is at least this confident
+DETECTOR_CONFIDENT_SCORE = 0.8
+
 model = None
 ocr = None
+ocr_pool = None
+template_registry = None
+field_detector = None
 
 # --- 1. Model Loading (PyTorch/EfficientNetB3) ---
 try:
@@ -67,24 +84,103 @@ transform = transforms.Compose([
     transforms.ToTensor(),
 ])
 
-# --- 3. OCR Initialization (PaddleOCR) ---
+# --- 3. OCR Initialization ---
+# OCR_BACKEND picks the engine (ocr_backends.py): "paddle" (PaddleOCR) or
+# "onnx" (the same models exported to ONNX, run with ONNX Runtime).
+# With OCR_POOL_ADDRESS set, OCR runs in the shared worker-process pool
+# (ocr_pool.py) and this process never loads an OCR model.
+OCR_BACKEND = os.environ.get("OCR_BACKEND", "paddle")
+OCR_POOL_ADDRESS = os.environ.get("OCR_POOL_ADDRESS")
+if OCR_POOL_ADDRESS:
+    try:
+        ocr_pool = OCRPoolClient(OCR_POOL_ADDRESS)
+        print(f"✅ Connected to OCR worker pool at {OCR_POOL_ADDRESS}.")
+    except Exception as e:
+        print(f"❌ ERROR in ml_core: Failed to connect to OCR pool at {OCR_POOL_ADDRESS}. Reason: {e}")
+        ocr_pool = None
+else:
+    try:
+        # PaddleOCR might download models if run for the first time
+        ocr = create_backend(OCR_BACKEND)
+        print(f"✅ OCR backend '{OCR_BACKEND}' initialized successfully in ml_core.")
+    except Exception as e:
+        print(f"❌ ERROR in ml_core: Failed to initialize OCR backend '{OCR_BACKEND}'. Reason: {e}")
+        ocr = None
+
+# The in-process OCR backend is not thread-safe; Flask threads share it
+_ocr_lock = threading.Lock()
+
+# Cross-request recognition batching (see rec_batching.py): detection runs per
+# request, recognised line crops of concurrent requests share rec batches
+REC_BATCHING = True
+REC_BATCH_WAIT_MS = 5.0
+staged_ocr = StagedOCR(ocr, REC_BATCH_WAIT_MS) if ocr is not None and REC_BATCHING else None
+
+# Known card layouts (Card_Templates/) are redacted by alignment, without OCR
+TEMPLATE_REDACTION = True
 try:
-    # Initialize PaddleOCR (This might download models if run for the first time)
-    ocr = PaddleOCR(use_angle_cls=True, lang='en')
-    print("✅ PaddleOCR initialized successfully in ml_core.")
+    template_registry = TemplateRegistry()
+    print(f"✅ Loaded {len(template_registry.templates)} card template(s) in ml_core.")
 except Exception as e:
-    print(f"❌ ERROR in ml_core: Failed to initialize PaddleOCR. Reason: {e}")
-    ocr = None
+    print(f"❌ ERROR in ml_core: Failed to load card templates. Reason: {e}")
+    template_registry = None
+
+# --- 3b. PII Field Detector (optional, OCR-free path) ---
+detector_weights_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Scripts", DETECTOR_MODEL_PATH)
+if os.path.exists(detector_weights_path):
+    try:
+        field_detector = FieldDetector(detector_weights_path, device)
+        print("✅ PII field detector loaded successfully in ml_core.")
+    except Exception as e:
+        print(f"❌ ERROR in ml_core: Failed to load PII field detector from {detector_weights_path}. Reason: {e}")
+        field_detector = None
+
+# PII rules (see pii_rules.py). Checksums are reported on each match but not
+# enforced, so cards with OCR-damaged or synthetic numbers are still redacted.
+OCR_MIN_CONFIDENCE = 0.4
+STRICT_CHECKSUMS = False
+
+# Label-driven fields resolved from the page layout (see layout.py)
+LAYOUT_REDACTION = True
+LAYOUT_FIELDS = ("name", "father", "dob", "address")
 
-# Regex patterns
-aadhaar_pattern = r"\d{4}\s?\d{4}\s?\d{4}"
-pan_pattern = r"[A-Z]{5}[0-9]{4}[A-Z]"
+# Saliency-guided OCR: only OCR the regions the classifier attended to
+SALIENCY_OCR = False
+SALIENCY_THRESHOLD = 0.3   # fraction of the peak class activation
+SALIENCY_MARGIN = 0.04     # safety margin, fraction of the longer image side
+SALIENCY_MAX_AREA = 0.7    # above this page fraction, just OCR the whole page
+
+# Near-duplicate cache: re-scans of an already processed document reuse its
+# redaction regions instead of running OCR again (see near_dup_cache.py)
+NEAR_DUP_CACHE = True
+NEAR_DUP_MAX_DISTANCE = 4      # Hamming distance between 64-bit pHashes
+NEAR_DUP_MAX_ENTRIES = 10_000   # ~4 KB each (64x64 thumbnail + 128 bytes per box)
+near_dup_cache = NearDuplicateCache(NEAR_DUP_MAX_DISTANCE, NEAR_DUP_MAX_ENTRIES) if NEAR_DUP_CACHE else None
+
+# Tiled OCR for very large scans (see ocr_tiling.py). OCR working memory is
+# bounded by TILE_WORKERS tiles in flight, whatever the page size.
+TILE_TRIGGER_SIZE = 2500   # longer side (px) above which a page is tiled
+TILE_SIZE = 1280
+TILE_OVERLAP = 160         # must exceed the tallest expected text line
+TILE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+_tile_pool = ThreadPoolExecutor(max_workers=TILE_WORKERS, thread_name_prefix="ocr-tile")
+_tile_ocr_local = threading.local()
 
 
 # --- 4. Prediction Logic ---
 
 def predict_image(image_path: str) -> tuple[str, float]:
     """Classifies the image as Sensitive or Non-sensitive."""
+    label, prob, _ = predict_image_with_saliency(image_path)
+    return label, prob
+
+
+def predict_image_with_saliency(image_path: str) -> tuple[str, float, np.ndarray]:
+    """
+    Classifies the image and also returns a coarse class activation map (CAM)
+    from the same forward pass: the final EfficientNet feature map weighted by
+    the linear head, normalised to [0, 1] (10x10 for 300px inputs).
+    """
     if model is None:
         raise RuntimeError("Classification model is not loaded in ml_core.")
     
@@ -92,68 +188,221 @@ def predict_image(image_path: str) -> tuple[str, float]:
     image = transform(image).unsqueeze(0).to(device)
 
     with torch.no_grad():
-        prob = model(image).item()
+        features = model.features(image)
+        prob = model.classifier(torch.flatten(model.avgpool(features), 1)).item()
         pred = 1 if prob > 0.5 else 0
 
+        weights = model.classifier[1].weight[0]
+        cam = torch.relu(torch.einsum("c,chw->hw", weights, features[0]))
+        cam = cam / cam.max() if cam.max() > 0 else cam
+
     label = "Sensitive" if pred == 1 else "Non-Sensitive"
-    return label, prob
+    return label, prob, cam.cpu().numpy()
+
+
+def _salient_regions(saliency: np.ndarray, shape: tuple, threshold: float = SALIENCY_THRESHOLD):
+    """
+    Turns a CAM into OCR crop rectangles (x0, y0, x1, y1) in image pixels.
+    Returns None when the salient area is too large to be worth cropping.
+    """
+    h, w = shape[:2]
+    heat = cv2.resize(saliency.astype(np.float32), (w, h), interpolation=cv2.INTER_LINEAR)
+    mask = (heat >= threshold).astype(np.uint8)
+
+    margin = max(1, int(SALIENCY_MARGIN * max(h, w)))
+    mask = cv2.dilate(mask, np.ones((2 * margin + 1, 2 * margin + 1), np.uint8))
+
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+    regions = []
+    for x, y, bw, bh, _ in stats[1:count]:
+        regions.append((x, y, x + bw, y + bh))
+
+    area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions)
+    if not regions or area > SALIENCY_MAX_AREA * h * w:
+        return None
+    return regions
+
+
+def _ocr_image(img: np.ndarray) -> list:
+    """OCRs one image or crop, on the worker pool if configured, else in-process."""
+    if ocr_pool is not None:
+        return ocr_pool.ocr(np.ascontiguousarray(img))
+    if staged_ocr is not None:
+        return staged_ocr.ocr(np.ascontiguousarray(img))
+    with _ocr_lock:
+        return ocr.ocr(np.ascontiguousarray(img))
+
+
+def _tile_ocr():
+    """One OCR backend per tile worker thread (instances are not thread-safe)."""
+    if not hasattr(_tile_ocr_local, "ocr"):
+        threads = max(1, (os.cpu_count() or 1) // TILE_WORKERS)
+        _tile_ocr_local.ocr = create_backend(OCR_BACKEND, threads=threads)
+    return _tile_ocr_local.ocr
+
+
+def _run_ocr_tiled(img: np.ndarray) -> list:
+    """OCRs overlapping tiles in parallel and merges lines across tile seams."""
+    tiles = tile_grid(img.shape[0], img.shape[1], TILE_SIZE, TILE_OVERLAP)
 
+    def ocr_tile(tile):
+        x0, y0, x1, y1 = tile
+        crop = np.ascontiguousarray(img[y0:y1, x0:x1])
+        if ocr_pool is not None:
+            return ocr_pool.ocr(crop)
+        return _tile_ocr().ocr(crop)
 
-def redact_sensitive_info(image_path: str, output_path: str) -> None:
-    """Detects and redacts sensitive info using PaddleOCR, saving output to output_path."""
-    if ocr is None:
-        raise RuntimeError("PaddleOCR is not initialized in ml_core.")
+    tile_lines = list(_tile_pool.map(ocr_tile, tiles))
+    return merge_tile_lines(tile_lines, tiles, img.shape, TILE_OVERLAP)
 
-    img = cv2.imread(image_path)
+
+def _run_ocr(img: np.ndarray, regions=None) -> list:
+    """
+    Runs PaddleOCR on the whole image, or only on the given crop rectangles,
+    and returns lines in `ocr.ocr(...)[0]` format in full-image coordinates.
+    Pages larger than TILE_TRIGGER_SIZE are OCR'd in parallel tiles.
+    """
+    if regions is None:
+        if max(img.shape[:2]) > TILE_TRIGGER_SIZE:
+            return _run_ocr_tiled(img)
+        return _ocr_image(img)
+
+    lines = []
+    for x0, y0, x1, y1 in regions:
+        for line in _ocr_image(img[y0:y1, x0:x1]):
+            if line is None or len(line) < 2:
+                continue
+            points = [[x + x0, y + y0] for x, y in line[0]]
+            lines.append([points, line[1]])
+    return lines
+
+
+def _blur_region(img: np.ndarray, pts) -> None:
+    """Gaussian-blurs (in place) the axis-aligned rectangle enclosing `pts`."""
+    xs = [int(x) for x, _ in pts]
+    ys = [int(y) for _, y in pts]
+
+    # Ensure boundaries are valid
+    x_min, y_min = max(0, min(xs)), max(0, min(ys))
+    x_max, y_max = min(img.shape[1], max(xs)), min(img.shape[0], max(ys))
+
+    roi = img[y_min:y_max, x_min:x_max]
+    if roi.size > 0:
+        k = max(23, (x_max - x_min) // 2 | 1, (y_max - y_min) // 2 | 1)
+        img[y_min:y_max, x_min:x_max] = cv2.GaussianBlur(roi, (k, k), 30)
+
+
+def _find_sensitive_regions(lines: list) -> list[PIIRegion]:
+    """Regions to redact in OCR lines (see pii_regions.py), with this module's rule / layout settings."""
+    layout_fields = LAYOUT_FIELDS if LAYOUT_REDACTION else None
+    return find_sensitive_regions(lines, OCR_MIN_CONFIDENCE, STRICT_CHECKSUMS, layout_fields)
+
+
+def _read_image(image) -> np.ndarray:
+    """Accepts an image path or a BGR array."""
+    if isinstance(image, np.ndarray):
+        return image
+    img = cv2.imread(image)
     if img is None:
-        raise ValueError(f"OpenCV failed to read image at: {image_path}")
+        raise ValueError(f"OpenCV failed to read image at: {image}")
+    return img
 
-    results = ocr.ocr(image_path, cls=True)
-    
-    # Check if results is not empty and has the expected structure
-    if not results or not results[0]:
-        cv2.imwrite(output_path, img) # Save original if OCR fails
-        return
-
-    # Loop through detected text
-    for line in results[0]:
-        if line is None or len(line) < 2:
-            continue
-
-        bbox = line[0]  # Bounding box points
-        text = line[1][0]
-        conf = line[1][1]
-
-        if conf < 0.4:
-            continue
-
-        clean_text = text.replace(" ", "").upper()
-        is_sensitive = False
-
-        # Check for PAN
-        if re.fullmatch(pan_pattern, clean_text):
-            is_sensitive = True
-        
-        # Check for Aadhaar
-        aadhaar_clean = text.replace(" ", "")
-        if re.fullmatch(aadhaar_pattern, aadhaar_clean):
-            is_sensitive = True
-
-        if is_sensitive:
-            # Redaction logic
-            pts = [(int(x), int(y)) for x, y in bbox]
-            x_min, y_min = int(min([p[0] for p in pts])), int(min([p[1] for p in pts]))
-            x_max, y_max = int(max([p[0] for p in pts])), int(max([p[1] for p in pts]))
-            
-            # Ensure boundaries are valid
-            x_min, y_min = max(0, x_min), max(0, y_min)
-            x_max, y_max = min(img.shape[1], x_max), min(img.shape[0], y_max)
-
-            roi = img[y_min:y_max, x_min:x_max]
-            
-            if roi.size > 0:
-                k = max(23, (x_max - x_min) // 2 | 1, (y_max - y_min) // 2 | 1)
-                img[y_min:y_max, x_min:x_max] = cv2.GaussianBlur(roi, (k, k), 30)
-
-    # Save redacted image to the specified output path
-    cv2.imwrite(output_path, img)
+
+def _detect_regions(img: np.ndarray, saliency: np.ndarray = None, text_lines: list = None,
+                    image_regions: list = None) -> list[PIIRegion]:
+    """
+    Finds the regions to redact. `text_lines` (e.g. a digital PDF's text layer,
+    see pdf_text.py) replaces OCR: lines in `ocr.ocr(...)[0]` format, in image
+    coordinates. Only the boxes in `image_regions` (x0, y0, x1, y1; e.g. scans
+    embedded in that PDF page) then go through the image path. Otherwise
+    near-duplicates of already redacted documents reuse the cached regions,
+    uploads that align with a registered card template use the template's field
+    regions, then the learned field detector is tried; everything else (or
+    anything the detector is unsure about) goes through OCR. With SALIENCY_OCR
+    enabled, a classifier saliency map limits OCR to salient regions.
+    """
+    # Text is already known: no OCR, no cache / template / detector guesses,
+    # except inside embedded images, which the text layer does not describe
+    if text_lines is not None:
+        sensitive_regions = _find_sensitive_regions(text_lines)
+        h, w = img.shape[:2]
+        for x0, y0, x1, y1 in image_regions or ():
+            x0, y0, x1, y1 = max(0, int(x0)), max(0, int(y0)), min(w, int(x1)), min(h, int(y1))
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                continue
+            for region in _detect_regions(np.ascontiguousarray(img[y0:y1, x0:x1])):
+                points = [[float(x) + x0, float(y) + y0] for x, y in region.points]
+                sensitive_regions.append(PIIRegion(region.pii_type, region.text_hash, region.confidence, points))
+        return sensitive_regions
+
+    # Cheapest path: a near-duplicate of a document we already redacted
+    if near_dup_cache is not None:
+        cached = near_dup_cache.lookup_labelled(img)
+        if cached is not None:
+            # No text hash: the cached one belongs to the stored document, not this one
+            regions = []
+            for pts, label in cached:
+                pii_type, confidence = label or ("cached", 1.0)
+                regions.append(PIIRegion(pii_type, None, confidence, pts))
+            return regions
+
+    # Fast path: known card layout, no OCR needed
+    if TEMPLATE_REDACTION and template_registry is not None:
+        alignment = template_registry.align(img)
+        if alignment is not None:
+            return [PIIRegion(field, None, alignment.confidence, pts) for field, pts in alignment.fields]
+
+    # Learned detector: trusted only when it finds fields and none is borderline
+    if field_detector is not None:
+        detections = field_detector.detect(img)
+        if detections and min(d.score for d in detections) >= DETECTOR_CONFIDENT_SCORE:
+            return [PIIRegion(d.field, None, d.score, d.points) for d in detections]
+
+    if ocr is None and ocr_pool is None:
+        raise RuntimeError("OCR is not initialized in ml_core.")
+
+    crops = None
+    if SALIENCY_OCR and saliency is not None:
+        crops = _salient_regions(saliency, img.shape)
+    sensitive_regions = _find_sensitive_regions(_run_ocr(img, crops))
+
+    if near_dup_cache is not None and sensitive_regions:
+        near_dup_cache.store(
+            img,
+            [r.points for r in sensitive_regions],
+            [(r.pii_type, r.confidence) for r in sensitive_regions],
+        )
+    return sensitive_regions
+
+
+def detect_sensitive_info(image, saliency: np.ndarray = None, text_lines: list = None,
+                          image_regions: list = None) -> list[dict]:
+    """
+    Detect-only counterpart of redact_sensitive_info for callers that mask
+    themselves: every region as {type, text_hash, confidence, polygon}, with no
+    image written or encoded. `image` is a path or a BGR array.
+    """
+    regions = _detect_regions(_read_image(image), saliency, text_lines, image_regions)
+    return [region.to_dict() for region in regions]
+
+
+def redact_image(img: np.ndarray, saliency: np.ndarray = None, text_lines: list = None,
+                 image_regions: list = None) -> np.ndarray:
+    """
+    Array API: detects (see _detect_regions) and blurs sensitive info in a BGR
+    image, in place; returns the image (unchanged if nothing was found).
+    """
+    # Several matches on one line share its box; blur each box once
+    blurred = set()
+    for region in _detect_regions(img, saliency, text_lines, image_regions):
+        key = tuple((float(x), float(y)) for x, y in region.points)
+        if key not in blurred:
+            blurred.add(key)
+            _blur_region(img, region.points)
+    return img
+
+
+def redact_sensitive_info(image_path: str, output_path: str, saliency: np.ndarray = None,
+                          text_lines: list = None, image_regions: list = None) -> None:
+    """File API around redact_image: reads image_path, saves the redacted image to output_path."""
+    cv2.imwrite(output_path, redact_image(_read_image(image_path), saliency, text_lines, image_regions))
@@ -0,0 +1,241 @@
+"""
+Near-duplicate cache for redaction results.
+
+Re-scans and re-compressions of the same card produce different bytes but
+almost the same perceptual hash. Each processed image is stored under a 64-bit
+pHash of its normalised (grayscale, 32x32) version in a multi-index hash table:
+the hash is split into m chunks, and by the pigeonhole principle any hash within
+d bits differs by at most d // m bits in at least one chunk. A lookup probes
+each chunk's table with every variant within that small radius, so it only
+touches a handful of tiny buckets and stays sub-millisecond even with millions
+of entries. Hits are confirmed with a cheap thumbnail alignment check, then
+every cached box is compared with the same spot of the new image before the
+boxes are reused: two cards with the same layout (same issuer, same photo
+position) can share a pHash and a thumbnail, but not the numbers printed in
+their boxes. Each box is kept only as a coarse 64x8 sketch: which cells are
+clearly darker or lighter than the box's mean (two bit masks, no pixels).
+Lookups compare the sketch over small shifts, so re-scans need not align to
+the pixel. A document whose boxes hold other text at the same positions
+misses; one differing in a single character may hit, but its boxes are then
+in the same places anyway.
+"""
+import threading
+from itertools import combinations
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+HASH_BITS = 64
+THUMB_SIZE = 64
+# Per-region sketch: a 64x8 grid (text boxes are wide and short); cells within
+# REGION_CERTAINTY standard deviations of the mean are left out as uncertain
+REGION_GRID = (64, 8)
+REGION_CERTAINTY = 0.5
+# Shifts tried when comparing a region: +-REGION_SHIFTS steps of 1/20 of its height
+REGION_SHIFTS = 4
+
+
+# --- 1. Perceptual Hashing ---
+
+def _normalise(img: np.ndarray, size: int) -> np.ndarray:
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    gray = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+    return cv2.equalizeHist(gray)
+
+
+def phash(img: np.ndarray) -> int:
+    """64-bit DCT perceptual hash (low 8x8 frequencies above their median)."""
+    small = _normalise(img, 32).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def _box(points, w: int, h: int) -> tuple[int, int, int, int]:
+    """Integer bounding box of a polygon, clipped to a w x h image."""
+    xs = [float(x) for x, _ in points]
+    ys = [float(y) for _, y in points]
+    return (max(0, int(min(xs))), max(0, int(min(ys))), min(w, int(np.ceil(max(xs)))), min(h, int(np.ceil(max(ys)))))
+
+
+def _region_box(region: list, w: int, h: int, normalised: bool):
+    """Integer bounds of a region (pixel or [0, 1] coordinates); None if degenerate."""
+    points = [(x * w, y * h) for x, y in region] if normalised else region
+    x0, y0, x1, y1 = _box(points, w, h)
+    return None if x1 - x0 < 2 or y1 - y0 < 2 else (x0, y0, x1, y1)
+
+
+def _region_cells(gray: np.ndarray, box: tuple) -> np.ndarray:
+    x0, y0, x1, y1 = box
+    return cv2.resize(gray[y0:y1, x0:x1], REGION_GRID, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+def _bits(mask: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(mask.flatten()).tobytes(), "big")
+
+
+def region_signature(gray: np.ndarray, box: tuple) -> tuple[int, int]:
+    """(dark, certain) bit masks of one region: cells clearly darker than its mean, and cells clearly off it."""
+    cells = _region_cells(gray, box)
+    mean, spread = cells.mean(), REGION_CERTAINTY * cells.std()
+    return _bits(cells < mean - spread), _bits(np.abs(cells - mean) > spread)
+
+
+def region_mismatch(gray: np.ndarray, box: tuple, signature: tuple[int, int]) -> float:
+    """Smallest fraction of the signature's certain cells that `gray` disagrees with, over small shifts of `box`."""
+    h, w = gray.shape[:2]
+    dark, certain = signature
+    total = max(1, certain.bit_count())
+    x0, y0, x1, y1 = box
+    step = max(1, (y1 - y0) // 20)
+    best = 1.0
+    for dy in range(-REGION_SHIFTS, REGION_SHIFTS + 1):
+        for dx in range(-REGION_SHIFTS, REGION_SHIFTS + 1):
+            shifted = _region_box([(x0 + dx * step, y0 + dy * step), (x1 + dx * step, y1 + dy * step)], w, h, False)
+            if shifted is None:
+                continue
+            cells = _region_cells(gray, shifted)
+            best = min(best, ((_bits(cells < cells.mean()) ^ dark) & certain).bit_count() / total)
+    return best
+
+
+# --- 2. Multi-Index Hash Table ---
+
+class MultiIndexHashTable:
+    """Hamming-radius search over 64-bit hashes via exact lookups on hash chunks."""
+
+    def __init__(self, max_distance: int = 4, num_chunks: int = 3, bits: int = HASH_BITS):
+        self.max_distance = max_distance
+        radius = max_distance // num_chunks
+        base, extra = divmod(bits, num_chunks)
+        self._chunks = []  # (shift, mask, flip masks within the chunk radius)
+        shift = 0
+        for i in range(num_chunks):
+            width = base + (1 if i < extra else 0)
+            flips = [sum(1 << b for b in combo) for r in range(radius + 1) for combo in combinations(range(width), r)]
+            self._chunks.append((shift, (1 << width) - 1, flips))
+            shift += width
+        self._buckets = [{} for _ in self._chunks]
+        self._hashes = {}  # key -> hash
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, key, value: int) -> None:
+        self._hashes[key] = value
+        for (shift, mask, _), buckets in zip(self._chunks, self._buckets):
+            buckets.setdefault((value >> shift) & mask, []).append(key)
+
+    def remove(self, key) -> None:
+        value = self._hashes.pop(key)
+        for (shift, mask, _), buckets in zip(self._chunks, self._buckets):
+            chunk = (value >> shift) & mask
+            bucket = buckets[chunk]
+            bucket.remove(key)
+            if not bucket:
+                del buckets[chunk]
+
+    def search(self, value: int) -> list[tuple[int, object]]:
+        """All (distance, key) pairs within max_distance, nearest first."""
+        hits = {}
+        for (shift, mask, flips), buckets in zip(self._chunks, self._buckets):
+            chunk = (value >> shift) & mask
+            for flip in flips:
+                for key in buckets.get(chunk ^ flip, ()):
+                    if key not in hits:
+                        distance = (self._hashes[key] ^ value).bit_count()
+                        if distance <= self.max_distance:
+                            hits[key] = distance
+        return sorted((d, k) for k, d in hits.items())
+
+
+# --- 3. Redaction Cache ---
+
+@dataclass
+class CachedRedaction:
+    """Redaction regions stored in normalised [0, 1] page coordinates."""
+    thumbnail: np.ndarray  # uint8, THUMB_SIZE x THUMB_SIZE
+    aspect: float
+    regions: list  # list of 4-point polygons, normalised
+    signatures: list  # per region, region_signature(): (dark, certain) bit masks
+    labels: list   # per region (pii_type, confidence), or None
+
+
+class NearDuplicateCache:
+    """Thread-safe near-duplicate cache of redaction regions, with FIFO eviction."""
+
+    def __init__(self, max_distance: int = 4, max_entries: int = 10_000, min_correlation: float = 0.9,
+                 max_region_mismatch: float = 0.03):
+        self.index = MultiIndexHashTable(max_distance)
+        self.max_entries = max_entries
+        self.min_correlation = min_correlation
+        self.max_region_mismatch = max_region_mismatch
+        self._entries = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, img: np.ndarray):
+        """Returns the cached regions scaled to `img` (list of polygons), or None on a miss."""
+        entries = self.lookup_labelled(img)
+        return None if entries is None else [region for region, _ in entries]
+
+    def lookup_labelled(self, img: np.ndarray):
+        """Like lookup(), but returns (polygon, label) pairs; label is None if none was stored."""
+        h, w = img.shape[:2]
+        value = phash(img)
+        thumb = _normalise(img, THUMB_SIZE).astype(np.float32)
+        gray = None
+
+        with self._lock:
+            candidates = [self._entries[key] for _, key in self.index.search(value)]
+
+        for entry in candidates:
+            # Alignment check: same aspect ratio and near-identical thumbnails
+            if abs(entry.aspect - w / h) > 0.02 * entry.aspect:
+                continue
+            correlation = cv2.matchTemplate(thumb, entry.thumbnail.astype(np.float32), cv2.TM_CCOEFF_NORMED)[0, 0]
+            if correlation < self.min_correlation:
+                continue
+            # Every box must hold the same content as in the cached document
+            if gray is None:
+                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+            boxes = [_region_box(region, w, h, True) for region in entry.regions]
+            if None in boxes or any(region_mismatch(gray, box, signature) > self.max_region_mismatch
+                                    for box, signature in zip(boxes, entry.signatures)):
+                continue
+            labels = entry.labels or [None] * len(entry.regions)
+            return [([(x * w, y * h) for x, y in region], label) for region, label in zip(entry.regions, labels)]
+        return None
+
+    def store(self, img: np.ndarray, regions: list, labels: list = None) -> None:
+        """
+        `labels` are per region (pii_type, confidence); no text or text hashes,
+        which belong to the stored document only. Empty results are not stored:
+        with no box to compare, any look-alike document would hit them.
+        """
+        if not regions:
+            return
+        h, w = img.shape[:2]
+        boxes = [_region_box(region, w, h, False) for region in regions]
+        if None in boxes:
+            return  # a box that cannot be verified later: do not cache this page
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        signatures = [region_signature(gray, box) for box in boxes]
+        entry = CachedRedaction(
+            thumbnail=_normalise(img, THUMB_SIZE),
+            aspect=w / h,
+            regions=[[(float(x) / w, float(y) / h) for x, y in region] for region in regions],
+            signatures=signatures,
+            labels=list(labels) if labels is not None else None,
+        )
+        value = phash(img)
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._entries[key] = entry
+            self.index.add(key, value)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self.index.remove(old_key)
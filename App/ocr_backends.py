@@ -0,0 +1,286 @@
+"""
+Pluggable OCR backends.
+
+Every backend exposes the OCR stages separately (detect -> classify ->
+recognize), which is what the recognition batcher (rec_batching.py) builds on,
+plus `ocr(img)` returning lines in the `ocr.ocr(...)[0]` format used across the
+app: [[4 points], (text, confidence)].
+
+- "paddle": the PaddleOCR package / Paddle inference runtime. Requires
+            paddleocr<3: 3.x removed the TextSystem stages used here.
+- "onnx":   the same PP-OCR det/cls/rec models exported to ONNX and run with
+            ONNX Runtime, with DB post-processing and CTC decoding done here, so
+            Paddle does not need to be installed at all. Export with e.g.
+              paddle2onnx --model_dir en_PP-OCRv4_rec_infer --model_filename inference.pdmodel
+                          --params_filename inference.pdiparams --save_file rec.onnx --opset_version 11
+            and put det.onnx, rec.onnx, (cls.onnx) and the rec dictionary in ONNX_MODEL_DIR.
+"""
+import math
+import os
+
+import cv2
+import numpy as np
+
+ONNX_MODEL_DIR = os.environ.get("ONNX_OCR_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_models"))
+
+
+# --- 1. Shared Geometry (same as PaddleOCR's TextSystem) ---
+
+def sorted_boxes(dt_boxes) -> list:
+    """Sorts detected boxes top-to-bottom, then left-to-right within a text line."""
+    boxes = sorted(dt_boxes, key=lambda b: (b[0][1], b[0][0]))
+    for i in range(len(boxes) - 1):
+        for j in range(i, -1, -1):
+            if abs(boxes[j + 1][0][1] - boxes[j][0][1]) < 10 and boxes[j + 1][0][0] < boxes[j][0][0]:
+                boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+            else:
+                break
+    return boxes
+
+
+def crop_text_region(img: np.ndarray, points) -> np.ndarray:
+    """Perspective-crops a 4-point text box; tall crops are rotated to horizontal."""
+    points = np.float32(points)
+    width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    matrix = cv2.getPerspectiveTransform(points, target)
+    crop = cv2.warpPerspective(img, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+    if crop.shape[0] * 1.0 / max(1, crop.shape[1]) >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+# --- 2. Backend Interface ---
+
+class OCRBackend:
+    """Base class: subclasses implement detect/recognize (and optionally classify)."""
+
+    drop_score = 0.5
+    rec_batch_size = 6
+
+    def detect(self, img: np.ndarray) -> list:
+        """Text boxes as 4x2 float arrays, in image coordinates."""
+        raise NotImplementedError
+
+    def classify(self, crops: list) -> list:
+        """Fixes upside-down crops; default is a no-op."""
+        return crops
+
+    def recognize(self, crops: list) -> list:
+        """One (text, score) per crop."""
+        raise NotImplementedError
+
+    def ocr(self, img: np.ndarray) -> list:
+        boxes = sorted_boxes(self.detect(img))
+        if not boxes:
+            return []
+        crops = self.classify([crop_text_region(img, box) for box in boxes])
+        return [
+            [np.asarray(box).tolist(), (text, float(score))]
+            for box, (text, score) in zip(boxes, self.recognize(crops))
+            if score >= self.drop_score
+        ]
+
+
+class PaddleBackend(OCRBackend):
+    """PaddleOCR (Paddle inference runtime)."""
+
+    def __init__(self, threads: int = None):
+        import paddleocr
+        from paddleocr import PaddleOCR
+
+        if int(paddleocr.__version__.split(".")[0]) >= 3:
+            raise ImportError(f"paddleocr {paddleocr.__version__} is not supported; install 'paddleocr<3'")
+        kwargs = {"cpu_threads": threads} if threads else {}
+        self.paddle_ocr = PaddleOCR(use_angle_cls=True, lang='en', **kwargs)
+        self.drop_score = getattr(self.paddle_ocr, "drop_score", 0.5)
+        self.rec_batch_size = getattr(self.paddle_ocr.args, "rec_batch_num", 6)
+
+    def detect(self, img):
+        dt_boxes, _ = self.paddle_ocr.text_detector(img)
+        return [] if dt_boxes is None else list(dt_boxes)
+
+    def classify(self, crops):
+        if not self.paddle_ocr.use_angle_cls:
+            return crops
+        crops, _, _ = self.paddle_ocr.text_classifier(crops)
+        return crops
+
+    def recognize(self, crops):
+        rec_res, _ = self.paddle_ocr.text_recognizer(crops)
+        return rec_res
+
+    def ocr(self, img):
+        # Native pipeline, identical to the original ocr.ocr() behaviour
+        results = self.paddle_ocr.ocr(img, cls=True)
+        return results[0] if results and results[0] else []
+
+
+# --- 3. ONNX Runtime Backend ---
+
+class OnnxBackend(OCRBackend):
+    """PP-OCR det (DB) / cls / rec (CTC) models exported to ONNX."""
+
+    # DB post-processing (PaddleOCR defaults)
+    det_limit_side_len = 960
+    det_thresh = 0.3
+    det_box_thresh = 0.6
+    det_unclip_ratio = 1.5
+    det_max_candidates = 1000
+    # Recognition input (PP-OCRv3/v4: 3x48x320)
+    rec_height = 48
+    rec_width = 320
+    # Angle classifier input
+    cls_shape = (48, 192)
+    cls_thresh = 0.9
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, threads: int = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        providers = ["CPUExecutionProvider"]
+
+        def session(name):
+            path = os.path.join(model_dir, name)
+            return ort.InferenceSession(path, options, providers=providers) if os.path.exists(path) else None
+
+        self.det = session("det.onnx")
+        self.rec = session("rec.onnx")
+        self.cls = session("cls.onnx")
+        if self.det is None or self.rec is None:
+            raise FileNotFoundError(f"det.onnx and rec.onnx are required in {model_dir}")
+
+        with open(os.path.join(model_dir, "rec_dict.txt"), "r", encoding="utf-8") as f:
+            characters = [line.rstrip("\r\n") for line in f]
+        # CTC blank first; PP-OCR en models also predict a space
+        self.characters = ["blank"] + characters + [" "]
+
+    # -- Detection --
+
+    def _det_preprocess(self, img):
+        h, w = img.shape[:2]
+        ratio = min(1.0, self.det_limit_side_len / max(h, w))
+        resize_h = max(32, int(round(h * ratio / 32)) * 32)
+        resize_w = max(32, int(round(w * ratio / 32)) * 32)
+        resized = cv2.resize(img, (resize_w, resize_h)).astype(np.float32) / 255.0
+        resized = (resized - np.float32([0.485, 0.456, 0.406])) / np.float32([0.229, 0.224, 0.225])
+        return resized.transpose(2, 0, 1)[np.newaxis], (h / resize_h, w / resize_w)
+
+    @staticmethod
+    def _order_points(rect):
+        """minAreaRect corners ordered clockwise from top-left (as PaddleOCR's get_mini_boxes)."""
+        points = sorted(cv2.boxPoints(rect).tolist(), key=lambda p: p[0])
+        left = sorted(points[:2], key=lambda p: p[1])
+        right = sorted(points[2:], key=lambda p: p[1])
+        return np.float32([left[0], right[0], right[1], left[1]])
+
+    @staticmethod
+    def _box_score(prob, box):
+        """Mean probability inside the box polygon (PaddleOCR's box_score_fast)."""
+        h, w = prob.shape
+        x0 = int(np.clip(np.floor(box[:, 0].min()), 0, w - 1))
+        x1 = int(np.clip(np.ceil(box[:, 0].max()), 0, w - 1))
+        y0 = int(np.clip(np.floor(box[:, 1].min()), 0, h - 1))
+        y1 = int(np.clip(np.ceil(box[:, 1].max()), 0, h - 1))
+        mask = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=np.uint8)
+        shifted = (box - np.float32([x0, y0])).astype(np.int32)
+        cv2.fillPoly(mask, [shifted.reshape(-1, 1, 2)], 1)
+        return cv2.mean(prob[y0:y1 + 1, x0:x1 + 1], mask)[0]
+
+    def detect(self, img):
+        tensor, (scale_h, scale_w) = self._det_preprocess(img)
+        prob = self.det.run(None, {self.det.get_inputs()[0].name: tensor})[0][0, 0]
+        bitmap = (prob > self.det_thresh).astype(np.uint8) * 255
+        contours, _ = cv2.findContours(bitmap, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+        h, w = img.shape[:2]
+        boxes = []
+        for contour in contours[:self.det_max_candidates]:
+            rect = cv2.minAreaRect(contour)
+            if min(rect[1]) < 3:
+                continue
+            box = self._order_points(rect)
+            if self._box_score(prob, box) < self.det_box_thresh:
+                continue
+
+            # Unclip: grow the shrunk DB kernel by area * ratio / perimeter on every side
+            (cx, cy), (rw, rh), angle = rect
+            distance = rw * rh * self.det_unclip_ratio / (2 * (rw + rh))
+            grown = ((cx, cy), (rw + 2 * distance, rh + 2 * distance), angle)
+            if min(grown[1]) < 5:
+                continue
+            box = self._order_points(grown)
+
+            box[:, 0] = np.clip(np.round(box[:, 0] * scale_w), 0, w - 1)
+            box[:, 1] = np.clip(np.round(box[:, 1] * scale_h), 0, h - 1)
+            if np.linalg.norm(box[0] - box[1]) <= 3 or np.linalg.norm(box[0] - box[3]) <= 3:
+                continue
+            boxes.append(box)
+        return boxes
+
+    # -- Angle classification --
+
+    def classify(self, crops):
+        if self.cls is None or not crops:
+            return crops
+        ch, cw = self.cls_shape
+        batch = np.stack([self._resize_norm(crop, ch, cw) for crop in crops])
+        probs = self.cls.run(None, {self.cls.get_inputs()[0].name: batch})[0]
+        out = list(crops)
+        for i, p in enumerate(probs):
+            if int(np.argmax(p)) == 1 and p[1] > self.cls_thresh:  # labels: 0, 180
+                out[i] = cv2.rotate(out[i], cv2.ROTATE_180)
+        return out
+
+    # -- Recognition --
+
+    @staticmethod
+    def _resize_norm(crop, height, max_width):
+        """Resize to `height` keeping aspect (capped at max_width), scale to [-1, 1], right-pad."""
+        h, w = crop.shape[:2]
+        width = min(max_width, int(math.ceil(height * w / max(1, h))))
+        resized = cv2.resize(crop, (max(1, width), height)).astype(np.float32)
+        resized = (resized / 255.0 - 0.5) / 0.5
+        padded = np.zeros((3, height, max_width), dtype=np.float32)
+        padded[:, :, :resized.shape[1]] = resized.transpose(2, 0, 1)
+        return padded
+
+    def _ctc_decode(self, probs):
+        """Greedy CTC: collapse repeats, drop blanks; score is the mean kept-char probability."""
+        results = []
+        for seq in probs:
+            indices = seq.argmax(axis=1)
+            scores = seq.max(axis=1)
+            keep = np.ones(len(indices), dtype=bool)
+            keep[1:] = indices[1:] != indices[:-1]
+            keep &= indices != 0
+            text = "".join(self.characters[i] for i in indices[keep])
+            results.append((text, float(scores[keep].mean()) if keep.any() else 0.0))
+        return results
+
+    def recognize(self, crops):
+        results = [None] * len(crops)
+        # Similar aspect ratios per batch keep padding (and wasted compute) low
+        order = sorted(range(len(crops)), key=lambda i: crops[i].shape[1] / max(1, crops[i].shape[0]))
+        for start in range(0, len(order), self.rec_batch_size):
+            idx = order[start:start + self.rec_batch_size]
+            max_ratio = max([self.rec_width / self.rec_height] + [crops[i].shape[1] / max(1, crops[i].shape[0]) for i in idx])
+            width = int(self.rec_height * max_ratio)
+            batch = np.stack([self._resize_norm(crops[i], self.rec_height, width) for i in idx])
+            probs = self.rec.run(None, {self.rec.get_inputs()[0].name: batch})[0]
+            for i, result in zip(idx, self._ctc_decode(probs)):
+                results[i] = result
+        return results
+
+
+BACKENDS = {"paddle": PaddleBackend, "onnx": OnnxBackend}
+
+
+def create_backend(name: str = "paddle", threads: int = None) -> OCRBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown OCR backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name](threads=threads)
@@ -0,0 +1,187 @@
+"""
+Dedicated OCR worker-process pool, decoupled from the web workers.
+
+Each worker process owns one OCR backend (ocr_backends.py) with a pinned thread count, so
+OCR can use several cores safely and web workers no longer carry OCR models in
+memory. The pool runs as its own service and is reached over a local IPC
+socket (multiprocessing.managers), so any number of Flask/gunicorn workers can
+share it and OCR capacity scales independently:
+
+    OCR_POOL_AUTHKEY=<secret> python ocr_pool.py --workers 4 --threads 2 --backend onnx --address 127.0.0.1:50055
+
+Web workers then set OCR_POOL_ADDRESS=127.0.0.1:50055 and the same
+OCR_POOL_AUTHKEY (see ml_core.py). The manager unpickles whatever an
+authenticated client sends, so the key is mandatory: neither side starts
+without it.
+"""
+import argparse
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+DEFAULT_ADDRESS = "127.0.0.1:50055"
+# A request fails after this long; dead workers are detected and respawned
+OCR_TIMEOUT_S = float(os.environ.get("OCR_POOL_TIMEOUT_S", 120))
+MONITOR_INTERVAL_S = 1.0
+
+
+def _authkey() -> bytes:
+    """The shared pool secret (OCR_POOL_AUTHKEY); there is deliberately no default."""
+    key = os.environ.get("OCR_POOL_AUTHKEY", "")
+    if not key:
+        raise RuntimeError("OCR_POOL_AUTHKEY is not set; generate one, e.g. "
+                           "python -c \"import secrets; print(secrets.token_urlsafe(32))\", "
+                           "and give the same value to the pool and its clients.")
+    return key.encode()
+
+
+def _parse_address(address: str) -> tuple[str, int]:
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+# --- 1. Worker Processes ---
+
+def _worker_main(worker_id: int, job_queue, result_queue, running, threads: int, backend: str) -> None:
+    """
+    Worker loop: one OCR backend, jobs are (job_id, image ndarray). The job in
+    progress is recorded in shared memory (running[worker_id], -1 when idle),
+    written synchronously so it is visible even if this process crashes.
+    """
+    # Pin math-library threads before Paddle / ONNX Runtime is imported
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    from ocr_backends import create_backend
+
+    logging.getLogger("ppocr").setLevel(logging.WARNING)
+    ocr = create_backend(backend, threads=threads)
+
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+        job_id, img = job
+        running[worker_id] = job_id
+        try:
+            result_queue.put((job_id, ocr.ocr(img), None))
+        except Exception as e:
+            result_queue.put((job_id, None, f"{type(e).__name__}: {e}"))
+        running[worker_id] = -1
+
+
+# --- 2. Pool Service (runs in the pool's main process) ---
+
+class OCRService:
+    """
+    Dispatches OCR jobs to the worker processes and routes results back. A
+    monitor thread respawns workers that die (OOM, native crash) and fails the
+    request each one was running; requests also time out after OCR_TIMEOUT_S.
+    """
+
+    def __init__(self, workers: int, threads: int, backend: str = "paddle", timeout: float = OCR_TIMEOUT_S):
+        self._ctx = mp.get_context("spawn")
+        self._jobs = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._threads = threads
+        self._backend = backend
+        self._timeout = timeout
+        self._ids = itertools.count()
+        self._pending = {}
+        self._running = self._ctx.Array("q", [-1] * workers, lock=False)  # worker_id -> job_id
+        self._lock = threading.Lock()
+        self._processes = [self._spawn(worker_id) for worker_id in range(workers)]
+        threading.Thread(target=self._collect, daemon=True).start()
+        threading.Thread(target=self._monitor, daemon=True).start()
+
+    def _spawn(self, worker_id: int):
+        args = (worker_id, self._jobs, self._results, self._running, self._threads, self._backend)
+        process = self._ctx.Process(target=_worker_main, args=args, daemon=True)
+        process.start()
+        return process
+
+    def _finish(self, job_id, lines, error) -> None:
+        with self._lock:
+            slot = self._pending.pop(job_id, None)
+        if slot is not None:
+            slot["result"] = (lines, error)
+            slot["done"].set()
+
+    def _collect(self) -> None:
+        while True:
+            self._finish(*self._results.get())
+
+    def _monitor(self) -> None:
+        while True:
+            time.sleep(MONITOR_INTERVAL_S)
+            for worker_id, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                job_id = self._running[worker_id]
+                self._running[worker_id] = -1
+                if job_id >= 0:
+                    self._finish(job_id, None, f"worker process exited with code {process.exitcode}")
+                logging.warning("OCR worker %d exited with code %s; respawning.", worker_id, process.exitcode)
+                self._processes[worker_id] = self._spawn(worker_id)
+
+    def ocr(self, img) -> list:
+        """OCRs one BGR image; returns lines in `ocr.ocr(...)[0]` format."""
+        slot = {"done": threading.Event(), "result": None}
+        with self._lock:
+            job_id = next(self._ids)
+            self._pending[job_id] = slot
+        self._jobs.put((job_id, img))
+        if not slot["done"].wait(self._timeout):
+            with self._lock:
+                self._pending.pop(job_id, None)  # a late result is dropped
+            raise TimeoutError(f"OCR pool did not answer within {self._timeout:.0f}s")
+        lines, error = slot["result"]
+        if error is not None:
+            raise RuntimeError(f"OCR worker failed: {error}")
+        return lines
+
+    def size(self) -> int:
+        return len(self._processes)
+
+
+class _PoolManager(BaseManager):
+    pass
+
+
+# --- 3. Client (used by the web workers) ---
+
+class OCRPoolClient:
+    """Connects to a running OCR pool; safe to share between threads."""
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, authkey: bytes = None):
+        _PoolManager.register("get_service")
+        self._manager = _PoolManager(address=_parse_address(address), authkey=authkey or _authkey())
+        self._manager.connect()
+        # Proxies open one connection per calling thread
+        self._service = self._manager.get_service()
+
+    def ocr(self, img) -> list:
+        return self._service.ocr(img)
+
+
+def serve(address: str, workers: int, threads: int, backend: str = "paddle") -> None:
+    authkey = _authkey()  # refuse to start before spawning any worker
+    service = OCRService(workers, threads, backend)
+    _PoolManager.register("get_service", callable=lambda: service)
+    manager = _PoolManager(address=_parse_address(address), authkey=authkey)
+    print(f"✅ OCR pool listening on {address} with {workers} {backend} worker(s) x {threads} thread(s).")
+    manager.get_server().serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the shared OCR worker pool.")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--threads", type=int, default=2, help="CPU threads per worker")
+    parser.add_argument("--backend", default=os.environ.get("OCR_BACKEND", "paddle"), choices=["paddle", "onnx"])
+    args = parser.parse_args()
+    serve(args.address, args.workers, args.threads, args.backend)
@@ -0,0 +1,191 @@
+"""
+Tiling helpers for OCR on very large scans (A3 forms, stitched multi-card sheets).
+
+The page is split into overlapping tiles that are OCR'd independently; lines
+are then mapped back to page coordinates and the duplicates produced by the
+overlaps are removed. A line cut by an interior tile edge is dropped when it is
+smaller than the overlap, because the neighbouring tile is then guaranteed to
+contain it whole. Lines wider than the overlap that a vertical seam cuts in
+two are merged back: a fragment ending at a tile's right edge is joined with
+a collinear fragment starting at the next tile's left edge that overlaps it
+inside the shared strip, and the text both tiles read there is kept once.
+Remaining duplicates are resolved by overlap, keeping the more confident
+reading.
+"""
+
+# A line closer than this (px) to an interior tile edge counts as cut by it
+EDGE_MARGIN = 3
+# Two lines overlapping by more than this fraction of the smaller one are duplicates
+DUPLICATE_OVERLAP = 0.6
+# Seam fragments are collinear if they share this fraction of the lower height
+FRAGMENT_Y_OVERLAP = 0.6
+# Shortest repeated text accepted as the shared part of two fragments
+MIN_TEXT_OVERLAP = 2
+
+
+def tile_grid(height: int, width: int, tile_size: int, overlap: int) -> list[tuple]:
+    """Overlapping (x0, y0, x1, y1) tiles covering a height x width page."""
+    if overlap >= tile_size:
+        raise ValueError("Tile overlap must be smaller than the tile size.")
+    step = tile_size - overlap
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        points = list(range(0, length - tile_size, step))
+        points.append(length - tile_size)  # last tile flush with the border
+        return points
+
+    return [
+        (x0, y0, min(width, x0 + tile_size), min(height, y0 + tile_size))
+        for y0 in starts(height)
+        for x0 in starts(width)
+    ]
+
+
+def _bounds(points):
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _is_cut(bounds, tile, page_shape, overlap) -> bool:
+    """True if the line touches an interior edge of its tile and fits inside the overlap."""
+    x0, y0, x1, y1 = bounds
+    tx0, ty0, tx1, ty1 = tile
+    height, width = page_shape[:2]
+    fits_x, fits_y = (x1 - x0) < overlap, (y1 - y0) < overlap
+    return (
+        (fits_x and tx0 > 0 and x0 - tx0 <= EDGE_MARGIN)
+        or (fits_x and tx1 < width and tx1 - x1 <= EDGE_MARGIN)
+        or (fits_y and ty0 > 0 and y0 - ty0 <= EDGE_MARGIN)
+        or (fits_y and ty1 < height and ty1 - y1 <= EDGE_MARGIN)
+    )
+
+
+def _merge_text(left: str, left_bounds, right: str, right_bounds) -> str:
+    """
+    Joins the readings of two seam fragments. Both tiles read the shared strip,
+    so the longest repeated part (allowing one garbled character at each cut
+    end) is kept once; failing that, both are split at the middle of the strip
+    assuming evenly spaced characters.
+    """
+    for trim_left in range(2):
+        for trim_right in range(2):
+            a = left[:len(left) - trim_left]
+            b = right[trim_right:]
+            for k in range(min(len(a), len(b)), MIN_TEXT_OVERLAP - 1, -1):
+                if a[-k:] == b[:k]:
+                    return a + b[k:]
+
+    cut = (right_bounds[0] + left_bounds[2]) / 2
+    left_width = max(1e-6, left_bounds[2] - left_bounds[0])
+    right_width = max(1e-6, right_bounds[2] - right_bounds[0])
+    keep = round(len(left) * (cut - left_bounds[0]) / left_width)
+    skip = round(len(right) * (cut - right_bounds[0]) / right_width)
+    return left[:keep] + right[skip:]
+
+
+def _merge_fragments(fragments: list) -> list:
+    """
+    Chains seam fragments left to right. Each fragment is a dict with bounds,
+    text, conf and the cut_left / cut_right flags; returns (conf, bounds, line)
+    candidates, merged lines as axis-aligned boxes with the lowest confidence.
+    """
+    fragments.sort(key=lambda f: f["bounds"][0])
+    used = set()
+    merged = []
+    for i, head in enumerate(fragments):
+        if i in used:
+            continue
+        used.add(i)
+        current = dict(head)
+        while current["cut_right"]:
+            x0, y0, x1, y1 = current["bounds"]
+            best, best_overlap = None, 0.0
+            for j, other in enumerate(fragments):
+                if j in used or not other["cut_left"]:
+                    continue
+                ox0, oy0, ox1, oy1 = other["bounds"]
+                # Starts inside this fragment (the shared strip) and continues past it
+                if not (x0 < ox0 < x1 < ox1):
+                    continue
+                lower = min(y1 - y0, oy1 - oy0)
+                y_overlap = (min(y1, oy1) - max(y0, oy0)) / lower if lower > 0 else 0.0
+                if y_overlap >= FRAGMENT_Y_OVERLAP and y_overlap > best_overlap:
+                    best, best_overlap = j, y_overlap
+            if best is None:
+                break
+            used.add(best)
+            other = fragments[best]
+            current = {
+                "text": _merge_text(current["text"], current["bounds"], other["text"], other["bounds"]),
+                "conf": min(current["conf"], other["conf"]),
+                "bounds": (x0, min(y0, other["bounds"][1]), other["bounds"][2], max(y1, other["bounds"][3])),
+                "points": None,
+                "cut_left": current["cut_left"],
+                "cut_right": other["cut_right"],
+            }
+
+        x0, y0, x1, y1 = current["bounds"]
+        points = current["points"] or [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+        merged.append((current["conf"], current["bounds"], [points, (current["text"], current["conf"])]))
+    return merged
+
+
+def merge_tile_lines(tile_lines: list, tiles: list, page_shape: tuple, overlap: int) -> list:
+    """
+    Merges per-tile `ocr.ocr(...)[0]` lines (tile coordinates) into page-level
+    lines: seam-cut lines that fit in the overlap are dropped, longer ones cut
+    by a vertical seam are joined back, and duplicates are removed.
+    """
+    width = page_shape[1]
+    candidates = []
+    fragments = []
+    for lines, tile in zip(tile_lines, tiles):
+        tx0, ty0, tx1 = tile[0], tile[1], tile[2]
+        for line in lines or []:
+            if line is None or len(line) < 2:
+                continue
+            points = [[float(x) + tx0, float(y) + ty0] for x, y in line[0]]
+            bounds = _bounds(points)
+            if _is_cut(bounds, tile, page_shape, overlap):
+                continue
+            cut_left = tx0 > 0 and bounds[0] - tx0 <= EDGE_MARGIN
+            cut_right = tx1 < width and tx1 - bounds[2] <= EDGE_MARGIN
+            if cut_left or cut_right:
+                fragments.append({"text": line[1][0], "conf": line[1][1], "bounds": bounds, "points": points,
+                                  "cut_left": cut_left, "cut_right": cut_right})
+                continue
+            candidates.append((line[1][1], bounds, [points, line[1]]))
+    candidates.extend(_merge_fragments(fragments))
+
+    # Most confident first; a grid over kept boxes keeps the duplicate check local
+    candidates.sort(key=lambda c: -c[0])
+    cell = max(1, overlap)
+    grid = {}
+    kept = []
+    for _, bounds, line in candidates:
+        x0, y0, x1, y1 = bounds
+        keys = [(gx, gy) for gx in range(int(x0 // cell), int(x1 // cell) + 1)
+                for gy in range(int(y0 // cell), int(y1 // cell) + 1)]
+        duplicate = False
+        for key in keys:
+            for other in grid.get(key, ()):
+                ox0, oy0, ox1, oy1 = other
+                iw = min(x1, ox1) - max(x0, ox0)
+                ih = min(y1, oy1) - max(y0, oy0)
+                if iw <= 0 or ih <= 0:
+                    continue
+                smaller = min((x1 - x0) * (y1 - y0), (ox1 - ox0) * (oy1 - oy0))
+                if smaller > 0 and iw * ih / smaller > DUPLICATE_OVERLAP:
+                    duplicate = True
+                    break
+            if duplicate:
+                break
+        if duplicate:
+            continue
+        for key in keys:
+            grid.setdefault(key, []).append(bounds)
+        kept.append(line)
+    return kept
@@ -0,0 +1,116 @@
+"""
+PDF input/output for /upload.
+
+Pages are rasterised lazily, one `convert_from_path(first_page=n, last_page=n)`
+call per page, and processed with at most `workers` pages in flight, so memory
+follows the number of in-flight pages rather than the document length.
+Processed pages are appended to a redacted PDF by a streaming writer that
+embeds each page as a JPEG image and keeps only the object offsets in memory.
+"""
+import io
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+# Rasterisation resolution for classification / OCR / the output PDF
+PDF_DPI = int(os.environ.get("PDF_DPI", 200))
+# Pages rasterised and processed concurrently
+PDF_PAGE_WORKERS = int(os.environ.get("PDF_PAGE_WORKERS", 2))
+PDF_JPEG_QUALITY = 90
+# Path to Poppler 'bin' folder (only needed on Windows)
+POPPLER_PATH = os.environ.get("POPPLER_PATH")
+
+
+# --- 1. Lazy Page Rasterisation ---
+
+def pdf_page_count(pdf_path: str) -> int:
+    return int(pdfinfo_from_path(pdf_path, poppler_path=POPPLER_PATH)["Pages"])
+
+
+def render_page(pdf_path: str, page_no: int, dpi: int = PDF_DPI):
+    """Rasterises one page (1-based) to an RGB PIL image."""
+    pages = convert_from_path(pdf_path, dpi=dpi, first_page=page_no, last_page=page_no, poppler_path=POPPLER_PATH)
+    return pages[0].convert("RGB")
+
+
+def map_pdf_pages(pdf_path: str, page_fn, dpi: int = PDF_DPI, workers: int = PDF_PAGE_WORKERS):
+    """
+    Yields `page_fn(page_no, image)` for every page, in page order. Rasterising
+    and `page_fn` run in a pool of `workers` threads; a page is only submitted
+    once an earlier one has been consumed, bounding pages held in memory.
+    """
+    page_count = pdf_page_count(pdf_path)
+    workers = max(1, workers)
+
+    def job(page_no):
+        return page_fn(page_no, render_page(pdf_path, page_no, dpi))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-page") as pool:
+        in_flight = deque()
+        next_page = 1
+        while in_flight or next_page <= page_count:
+            while next_page <= page_count and len(in_flight) < workers:
+                in_flight.append(pool.submit(job, next_page))
+                next_page += 1
+            yield in_flight.popleft().result()
+
+
+# --- 2. Streaming PDF Writer ---
+
+def encode_jpeg(image, quality: int = PDF_JPEG_QUALITY) -> bytes:
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+class JpegPdfWriter:
+    """
+    Writes a PDF with one full-page JPEG image per page to a binary file
+    object, page by page. Object 1 is the catalog and object 2 the page tree;
+    both are written by close(), once all pages are known.
+    """
+
+    def __init__(self, fileobj):
+        self._f = fileobj
+        self._offsets = {}
+        self._page_ids = []
+        self._next_id = 3
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write_object(self, obj_id: int, body: bytes, stream: bytes = None) -> None:
+        self._offsets[obj_id] = self._f.tell()
+        self._f.write(f"{obj_id} 0 obj\n".encode() + body)
+        if stream is not None:
+            self._f.write(b"\nstream\n" + stream + b"\nendstream")
+        self._f.write(b"\nendobj\n")
+
+    def add_page(self, jpeg_bytes: bytes, width_px: int, height_px: int, dpi: int = PDF_DPI) -> None:
+        image_id, content_id, page_id = self._next_id, self._next_id + 1, self._next_id + 2
+        self._next_id += 3
+        width_pt, height_pt = width_px * 72.0 / dpi, height_px * 72.0 / dpi
+
+        self._write_object(image_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {width_px} /Height {height_px} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /Length {len(jpeg_bytes)} >>"
+        ).encode(), jpeg_bytes)
+        content = f"q {width_pt:.2f} 0 0 {height_pt:.2f} 0 0 cm /Im0 Do Q".encode()
+        self._write_object(content_id, f"<< /Length {len(content)} >>".encode(), content)
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt:.2f} {height_pt:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode())
+        self._page_ids.append(page_id)
+
+    def close(self) -> None:
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode())
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self._f.tell()
+        size = self._next_id
+        self._f.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode())
+        for obj_id in range(1, size):
+            self._f.write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode())
+        self._f.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
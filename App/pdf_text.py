@@ -0,0 +1,134 @@
+"""
+Text-layer fast path for digital PDFs.
+
+Born-digital PDFs (receipts, statements, e-tickets) already carry their text
+with coordinates. Poppler's `pdftotext -bbox-layout` extracts it per page in
+milliseconds; the lines are returned in the same `ocr.ocr(...)[0]` format the
+OCR path produces ([4 points], (text, confidence)), scaled to the pixel grid
+of the page rasterised at `dpi`, so the PII rules and layout matching run on
+them unchanged and OCR is only needed for image-only (scanned) pages.
+
+A page with text can still carry PII in pictures, e.g. a typed form with a
+pasted scan of an ID card. `pdftohtml -xml` lists the images drawn on the
+page; those not covered by the text layer (a scanned page with an OCR'd text
+layer is) still go through the image path, restricted to their boxes.
+"""
+import os
+import subprocess
+import tempfile
+import xml.etree.ElementTree as ET
+
+from pdf_io import PDF_DPI, POPPLER_PATH
+
+# Fewer alphanumeric characters than this on a page means "image-only"
+MIN_TEXT_CHARS = 16
+PDFTOTEXT_TIMEOUT = 30  # seconds per page
+# Embedded images smaller than this (pixels at dpi, either side) are rules or bullets
+MIN_IMAGE_SIZE = 32
+# An image is covered by the text layer when the lines inside it span this fraction of its area
+TEXT_COVERED_IMAGE = 0.5
+
+
+def _pdftotext() -> str:
+    return os.path.join(POPPLER_PATH, "pdftotext") if POPPLER_PATH else "pdftotext"
+
+
+def _pdftohtml() -> str:
+    return os.path.join(POPPLER_PATH, "pdftohtml") if POPPLER_PATH else "pdftohtml"
+
+
+def _local(tag: str) -> str:
+    """Tag name without the XHTML namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def extract_text_lines(pdf_path: str, page_no: int, dpi: int = PDF_DPI):
+    """
+    Text lines of one page (1-based) with pixel coordinates at `dpi`, or None
+    if the page has no usable text layer (or pdftotext is unavailable).
+    """
+    try:
+        result = subprocess.run(
+            [_pdftotext(), "-f", str(page_no), "-l", str(page_no), "-bbox-layout", pdf_path, "-"],
+            capture_output=True, check=True, timeout=PDFTOTEXT_TIMEOUT,
+        )
+        root = ET.fromstring(result.stdout)
+    except (OSError, subprocess.SubprocessError, ET.ParseError):
+        return None
+
+    scale = dpi / 72.0
+    lines = []
+    chars = 0
+    for element in root.iter():
+        if _local(element.tag) != "line":
+            continue
+        words = [w.text for w in element if _local(w.tag) == "word" and w.text]
+        if not words:
+            continue
+        text = " ".join(words)
+        chars += sum(c.isalnum() for c in text)
+
+        x0, y0 = float(element.get("xMin")) * scale, float(element.get("yMin")) * scale
+        x1, y1 = float(element.get("xMax")) * scale, float(element.get("yMax")) * scale
+        # Digital text is exact: full confidence
+        lines.append([[[x0, y0], [x1, y0], [x1, y1], [x0, y1]], (text, 1.0)])
+
+    return lines if chars >= MIN_TEXT_CHARS else None
+
+
+def extract_image_boxes(pdf_path: str, page_no: int, dpi: int = PDF_DPI):
+    """
+    Pixel boxes (x0, y0, x1, y1) at `dpi` of the images drawn on one page
+    (1-based), or None if they cannot be listed (e.g. pdftohtml is unavailable).
+    """
+    with tempfile.TemporaryDirectory() as out_dir:
+        try:
+            # -zoom 1: coordinates in points; the extracted image files are discarded with out_dir
+            subprocess.run(
+                [_pdftohtml(), "-f", str(page_no), "-l", str(page_no), "-xml", "-zoom", "1", "-q",
+                 pdf_path, os.path.join(out_dir, "page")],
+                capture_output=True, check=True, timeout=PDFTOTEXT_TIMEOUT,
+            )
+            root = ET.parse(os.path.join(out_dir, "page.xml")).getroot()
+        except (OSError, subprocess.SubprocessError, ET.ParseError):
+            return None
+
+    scale = dpi / 72.0
+    boxes = []
+    for element in root.iter():
+        if _local(element.tag) != "image":
+            continue
+        x0, y0 = float(element.get("left")) * scale, float(element.get("top")) * scale
+        x1 = x0 + float(element.get("width")) * scale
+        y1 = y0 + float(element.get("height")) * scale
+        if x1 - x0 >= MIN_IMAGE_SIZE and y1 - y0 >= MIN_IMAGE_SIZE:
+            boxes.append((int(x0), int(y0), int(x1 + 0.5), int(y1 + 0.5)))
+    return boxes
+
+
+def _text_covers(box: tuple, text_lines: list) -> bool:
+    """True if the text lines centred inside `box` span at least TEXT_COVERED_IMAGE of its area."""
+    x0, y0, x1, y1 = box
+    inside = []
+    for points, _ in text_lines:
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+        if x0 <= cx <= x1 and y0 <= cy <= y1:
+            inside.append((min(xs), min(ys), max(xs), max(ys)))
+    if not inside:
+        return False
+    width = min(x1, max(b[2] for b in inside)) - max(x0, min(b[0] for b in inside))
+    height = min(y1, max(b[3] for b in inside)) - max(y0, min(b[1] for b in inside))
+    return width * height >= TEXT_COVERED_IMAGE * (x1 - x0) * (y1 - y0)
+
+
+def image_regions(pdf_path: str, page_no: int, text_lines: list, dpi: int = PDF_DPI):
+    """
+    Boxes of the page's images that its text layer does not cover: these still
+    need the image path (OCR, templates, field detector). None if the images
+    cannot be listed, in which case the whole page should take the image path.
+    """
+    boxes = extract_image_boxes(pdf_path, page_no, dpi)
+    if boxes is None:
+        return None
+    return [box for box in boxes if not _text_covers(box, text_lines)]
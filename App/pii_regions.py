@@ -0,0 +1,79 @@
+"""
+Regions to redact, found in OCR lines.
+
+Kept apart from ml_core (which loads the classifier and OCR models on import)
+so the line -> region logic can be used and tested on its own: lines are in
+`ocr.ocr(...)[0]` format, [points, (text, confidence)].
+"""
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+from dataclasses import dataclass
+
+from pii_rules import default_engine as pii_engine
+from layout import find_labelled_values
+
+# Key for the text hashes reported by detect_sensitive_info. Without it the
+# hashes could be brute-forced (10^12 Aadhaar numbers, fixed-format PANs), so
+# an unset key is replaced by a random one: hashes then only compare within
+# this process. Set PII_HASH_KEY to compare them across restarts / workers.
+PII_HASH_KEY = os.environ.get("PII_HASH_KEY", "").encode()
+if not PII_HASH_KEY:
+    PII_HASH_KEY = secrets.token_bytes(32)
+    logging.getLogger(__name__).warning(
+        "PII_HASH_KEY is not set; using a random per-process key for text hashes.")
+
+
+@dataclass
+class PIIRegion:
+    """One region to redact: what it is, a keyed hash of its text (None if unread), confidence, 4-point polygon."""
+    pii_type: str
+    text_hash: str
+    confidence: float
+    points: list
+
+    def to_dict(self) -> dict:
+        return {
+            "type": self.pii_type,
+            "text_hash": self.text_hash,
+            "confidence": self.confidence,
+            "polygon": [[float(x), float(y)] for x, y in self.points],
+        }
+
+
+def hash_text(text: str) -> str:
+    """HMAC-SHA256 of the matched text: comparable across calls with the same PII_HASH_KEY, not reversible without it."""
+    return hmac.new(PII_HASH_KEY, text.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def find_sensitive_regions(lines: list, min_confidence: float = 0.0, strict: bool = False,
+                           layout_fields=None) -> list[PIIRegion]:
+    """
+    Text lines with PII rule matches (one region per match), plus values next
+    to known labels when `layout_fields` is given (see layout.py).
+    """
+    sensitive_regions = []
+
+    # Loop through detected text; each line is scanned once against all PII rules
+    for line in lines:
+        if line is None or len(line) < 2:
+            continue
+
+        bbox = line[0]  # Bounding box points
+        text = line[1][0]
+        conf = line[1][1]
+
+        if conf < min_confidence:
+            continue
+
+        for match in pii_engine.scan(text, strict=strict):
+            sensitive_regions.append(PIIRegion(match.rule, hash_text(match.text), float(conf), bbox))
+
+    # Values sitting next to labels ("Name", "DOB", ...) that no regex can catch
+    if layout_fields:
+        for match in find_labelled_values(lines, min_confidence, layout_fields):
+            sensitive_regions.append(PIIRegion(match.field, hash_text(match.text), float(match.conf), match.points))
+
+    return sensitive_regions
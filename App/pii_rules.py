@@ -0,0 +1,368 @@
+"""
+Single-pass PII rule engine.
+
+All rules are compiled into ONE lazily-built DFA over character classes, so
+the per-character cost is a table lookup no matter how many rules are
+registered, not a loop over rules. A walk starts at every token; walks that
+reach the same DFA state at the same position share their outcome (memoised),
+so no position is walked twice in one state and a scan stays linear in the
+length of the text even when a rule (e.g. email) can run to its end.
+Rules are ordinary regular expressions (parsed with Python's own regex parser)
+and may carry a validator, e.g. the Verhoeff checksum used by Aadhaar/VID
+numbers, that is applied only to the spans the DFA accepts.
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+
+# --- 1. Checksum / Format Validators ---
+
+# Verhoeff tables (dihedral group D5 multiplication, permutation, inverse)
+_VERHOEFF_D = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 2, 3, 4, 0, 6, 7, 8, 9, 5),
+    (2, 3, 4, 0, 1, 7, 8, 9, 5, 6),
+    (3, 4, 0, 1, 2, 8, 9, 5, 6, 7),
+    (4, 0, 1, 2, 3, 9, 5, 6, 7, 8),
+    (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2),
+    (7, 6, 5, 9, 8, 2, 1, 0, 4, 3),
+    (8, 7, 6, 5, 9, 3, 2, 1, 0, 4),
+    (9, 8, 7, 6, 5, 4, 3, 2, 1, 0),
+)
+_VERHOEFF_P = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 5, 7, 6, 2, 8, 3, 0, 9, 4),
+    (5, 8, 0, 3, 7, 9, 6, 1, 4, 2),
+    (8, 9, 1, 6, 0, 4, 3, 5, 2, 7),
+    (9, 4, 5, 3, 1, 2, 6, 8, 7, 0),
+    (4, 2, 8, 6, 5, 7, 3, 9, 0, 1),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5),
+    (7, 0, 4, 6, 9, 1, 3, 2, 5, 8),
+)
+
+
+def verhoeff_check(value: str) -> bool:
+    """Returns True if the digits in `value` carry a valid Verhoeff check digit."""
+    digits = [int(ch) for ch in value if ch.isdigit()]
+    if not digits:
+        return False
+    c = 0
+    for i, digit in enumerate(reversed(digits)):
+        c = _VERHOEFF_D[c][_VERHOEFF_P[i % 8][digit]]
+    return c == 0
+
+
+def date_check(value: str) -> bool:
+    """Rejects impossible DD/MM/YYYY dates (e.g. 45/13/2020)."""
+    parts = re.split(r"[/\-.]", value)
+    if len(parts) != 3:
+        return False
+    day, month, year = (int(p) for p in parts)
+    return 1 <= day <= 31 and 1 <= month <= 12 and 1900 <= year <= 2100
+
+
+# --- 2. Rule & Match Types ---
+
+@dataclass(frozen=True)
+class PIIRule:
+    """A named PII pattern with an optional validator for candidate spans."""
+    name: str
+    pattern: str
+    validator: Optional[Callable[[str], bool]] = None
+
+
+@dataclass(frozen=True)
+class PIIMatch:
+    """A typed match returned by the engine (offsets refer to the scanned text)."""
+    rule: str
+    text: str
+    start: int
+    end: int
+    validated: bool
+
+
+# Patterns are matched case-insensitively (the old code upper-cased PAN text).
+# Look-arounds are not supported; instead the engine only accepts matches that
+# start and end on token boundaries, so e.g. the 12-digit Aadhaar rule never
+# fires on the first 12 digits of a 16-digit VID.
+DEFAULT_RULES = (
+    PIIRule("vid", r"\d{4}\s?\d{4}\s?\d{4}\s?\d{4}", verhoeff_check),
+    PIIRule("aadhaar", r"\d{4}\s?\d{4}\s?\d{4}", verhoeff_check),
+    PIIRule("phone", r"(?:\+?91[\s\-]?)?[6-9]\d{4}\s?\d{5}"),
+    PIIRule("dob", r"\d{2}[/\-.]\d{2}[/\-.]\d{4}", date_check),
+    PIIRule("email", r"[A-Z0-9._%+\-]+@[A-Z0-9.\-]+\.[A-Z]{2,}"),
+    PIIRule("pan", r"[A-Z]{5}\s?[0-9]{4}\s?[A-Z]"),
+    PIIRule("ifsc", r"[A-Z]{4}0[A-Z0-9]{6}"),
+    PIIRule("voter_id", r"[A-Z]{3}[0-9]{7}"),
+    PIIRule("passport", r"[A-Z][0-9]{7}"),
+)
+
+
+# --- 3. Rule Compilation (regex -> NFA) ---
+
+_ASCII = range(128)
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: {c for c in _ASCII if chr(c).isdigit()},
+    sre_constants.CATEGORY_SPACE: {c for c in _ASCII if chr(c).isspace()},
+    sre_constants.CATEGORY_WORD: {c for c in _ASCII if chr(c).isalnum() or c == ord("_")},
+}
+_CATEGORIES[sre_constants.CATEGORY_NOT_DIGIT] = set(_ASCII) - _CATEGORIES[sre_constants.CATEGORY_DIGIT]
+_CATEGORIES[sre_constants.CATEGORY_NOT_SPACE] = set(_ASCII) - _CATEGORIES[sre_constants.CATEGORY_SPACE]
+_CATEGORIES[sre_constants.CATEGORY_NOT_WORD] = set(_ASCII) - _CATEGORIES[sre_constants.CATEGORY_WORD]
+
+# Non-ASCII characters all share one pseudo code point
+_OTHER = 128
+
+
+def _with_case(codes: set) -> set:
+    """Adds the other-case variant of every ASCII letter (case-insensitive matching)."""
+    out = set(codes)
+    for c in codes:
+        if c < 128 and chr(c).isalpha():
+            out.add(ord(chr(c).swapcase()))
+    return out
+
+
+def _charset(op, av) -> frozenset:
+    """Converts one sre_parse charset item into a set of code points (0..128)."""
+    if op is sre_constants.LITERAL:
+        return frozenset(_with_case({av}))
+    if op is sre_constants.NOT_LITERAL:
+        return frozenset(set(range(129)) - _with_case({av}))
+    if op is sre_constants.ANY:
+        return frozenset(set(range(129)) - {ord("\n")})
+    if op is sre_constants.IN:
+        codes, negate = set(), False
+        for item_op, item_av in av:
+            if item_op is sre_constants.NEGATE:
+                negate = True
+            elif item_op is sre_constants.LITERAL:
+                codes.add(item_av)
+            elif item_op is sre_constants.RANGE:
+                codes.update(range(item_av[0], min(item_av[1], 127) + 1))
+            elif item_op is sre_constants.CATEGORY:
+                codes |= _CATEGORIES[item_av]
+            else:
+                raise ValueError(f"Unsupported character set item: {item_op}")
+        codes = _with_case(codes)
+        return frozenset(set(range(129)) - codes if negate else codes)
+    raise ValueError(f"Unsupported regex construct: {op}")
+
+
+class _NFA:
+    """Thompson NFA shared by all rules: epsilon edges plus charset edges."""
+
+    def __init__(self):
+        self.eps = []      # state -> list of states
+        self.edges = []    # state -> list of (charset, state)
+        self.accept = {}   # state -> rule index
+
+    def new_state(self) -> int:
+        self.eps.append([])
+        self.edges.append([])
+        return len(self.eps) - 1
+
+    def build(self, items, start: int) -> int:
+        """Adds the parsed pattern `items` starting at `start`; returns its end state."""
+        current = start
+        for op, av in items:
+            current = self._build_item(op, av, current)
+        return current
+
+    def _build_item(self, op, av, start: int) -> int:
+        if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN):
+            end = self.new_state()
+            self.edges[start].append((_charset(op, av), end))
+            return end
+        if op is sre_constants.SUBPATTERN:
+            return self.build(av[-1], start)
+        if op is sre_constants.BRANCH:
+            end = self.new_state()
+            for alternative in av[1]:
+                self.eps[self.build(alternative, start)].append(end)
+            return end
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, sub = av
+            current = start
+            for _ in range(low):
+                current = self.build(sub, current)
+            if high is sre_constants.MAXREPEAT:
+                loop_start = self.new_state()
+                self.eps[current].append(loop_start)
+                self.eps[self.build(sub, loop_start)].append(loop_start)
+                return loop_start
+            end = self.new_state()
+            self.eps[current].append(end)
+            for _ in range(high - low):
+                current = self.build(sub, current)
+                self.eps[current].append(end)
+            return end
+        raise ValueError(f"Unsupported regex construct in PII rule: {op}")
+
+
+# --- 4. Engine ---
+
+_DEAD = -1
+_UNKNOWN = -2
+
+# A match may only start where a token starts (previous char is not alphanumeric)
+_TOKEN_START = re.compile(r"(?<![A-Za-z0-9])[A-Za-z0-9+]")
+
+
+class PIIRuleEngine:
+    """Compiles a set of PIIRules into a single DFA and scans text in one pass."""
+
+    def __init__(self, rules: Iterable[PIIRule] = DEFAULT_RULES):
+        self.rules = tuple(rules)
+        if not self.rules:
+            raise ValueError("PIIRuleEngine needs at least one rule.")
+
+        # 1. One NFA for all rules, hanging off a shared start state
+        nfa = _NFA()
+        nfa_start = nfa.new_state()
+        for i, rule in enumerate(self.rules):
+            rule_start = nfa.new_state()
+            nfa.eps[nfa_start].append(rule_start)
+            end = nfa.build(sre_parse.parse(rule.pattern).data, rule_start)
+            nfa.accept.setdefault(end, i)
+        self._nfa = nfa
+
+        # 2. Partition code points into classes that no rule can tell apart
+        charsets = {cs for edges in nfa.edges for cs, _ in edges}
+        signatures = {}
+        code_class = []
+        for code in range(129):
+            sig = frozenset(cs for cs in charsets if code in cs)
+            code_class.append(signatures.setdefault(sig, len(signatures)))
+        self._num_classes = len(signatures)
+        self._class_table = _ClassTable({code: chr(code_class[code]) for code in range(128)})
+        self._class_table.other = chr(code_class[_OTHER])
+
+        # Per-NFA-state edges keyed by class instead of code point
+        self._class_edges = [
+            [(frozenset(code_class[c] for c in cs), target) for cs, target in edges]
+            for edges in nfa.edges
+        ]
+
+        # 3. DFA states are built lazily (RE2-style) and cached
+        self._dfa_sets = []
+        self._dfa_index = {}
+        self._trans = []
+        self._accept = []
+        self._start = self._dfa_state(self._closure({nfa_start}))
+
+    def _closure(self, states) -> frozenset:
+        stack, seen = list(states), set(states)
+        while stack:
+            for nxt in self._nfa.eps[stack.pop()]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return frozenset(seen)
+
+    def _dfa_state(self, nfa_states: frozenset) -> int:
+        if not nfa_states:
+            return _DEAD
+        idx = self._dfa_index.get(nfa_states)
+        if idx is None:
+            idx = len(self._dfa_sets)
+            self._dfa_index[nfa_states] = idx
+            self._dfa_sets.append(nfa_states)
+            self._trans.append([_UNKNOWN] * self._num_classes)
+            accepting = [self._nfa.accept[s] for s in nfa_states if s in self._nfa.accept]
+            self._accept.append(min(accepting) if accepting else None)
+        return idx
+
+    def _step(self, state: int, cls: int) -> int:
+        targets = {t for s in self._dfa_sets[state] for cs, t in self._class_edges[s] if cls in cs}
+        nxt = self._dfa_state(self._closure(targets))
+        self._trans[state][cls] = nxt
+        return nxt
+
+    def scan(self, text: str, strict: bool = True) -> list[PIIMatch]:
+        """
+        Returns every PII match in `text` (leftmost-longest, non-overlapping).
+        With strict=True, candidates rejected by their rule's validator are
+        dropped; otherwise they are returned with validated=False.
+        """
+        classes = text.translate(self._class_table).encode("latin-1")
+        trans, accept, n = self._trans, self._accept, len(text)
+        matches = []
+        resume = 0
+        # (DFA state, position) -> longest accepted (end, rule) reachable from there, or None
+        tails = {}
+
+        for token in _TOKEN_START.finditer(text):
+            i = token.start()
+            if i < resume or _continues_number(text, i - 1, i):
+                continue
+
+            # Walk the DFA from i until it dies or joins an earlier walk
+            state, j = self._start, i
+            path, best = [], None
+            while j < n:
+                nxt = trans[state][classes[j]]
+                if nxt == _UNKNOWN:
+                    nxt = self._step(state, classes[j])
+                if nxt == _DEAD:
+                    break
+                state = nxt
+                j += 1
+                if (state, j) in tails:
+                    best = tails[state, j]
+                    break
+                path.append((state, j))
+
+            # Longest accepted span, propagated back along the walk
+            for key in reversed(path):
+                if best is None and accept[key[0]] is not None and _ends_token(text, key[1]):
+                    best = (key[1], accept[key[0]])
+                tails[key] = best
+            if best is None:
+                continue
+            best_end, best_rule = best
+
+            rule = self.rules[best_rule]
+            value = text[i:best_end]
+            validated = rule.validator(value) if rule.validator else True
+            if strict and not validated:
+                continue
+            matches.append(PIIMatch(rule.name, value, i, best_end, validated))
+            resume = best_end
+
+        return matches
+
+
+class _ClassTable(dict):
+    """str.translate table mapping ASCII to class ids and everything else to `other`."""
+    other = "\x00"
+
+    def __missing__(self, key):
+        return self.other
+
+
+def _continues_number(text: str, prev: int, i: int) -> bool:
+    """True if position i continues a space-separated digit group (e.g. '1234 |5678')."""
+    return prev >= 1 and text[prev] == " " and text[prev - 1].isdigit() and text[i].isdigit()
+
+
+def _ends_token(text: str, j: int) -> bool:
+    """True if a match ending at j ends on a token boundary."""
+    if j >= len(text):
+        return True
+    nxt = text[j]
+    if nxt.isalnum():
+        return False
+    return not (nxt == " " and j + 1 < len(text) and text[j - 1].isdigit() and text[j + 1].isdigit())
+
+
+# Shared engine over the default rule set
+default_engine = PIIRuleEngine()
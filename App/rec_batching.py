@@ -0,0 +1,100 @@
+"""
+Cross-request batching of OCR text recognition.
+
+The OCR engine recognises only the lines of the document it was called on, often in
+tiny batches. Here OCR is split into its stages: detection (and angle
+classification) run per request, while the detected line crops of all
+in-flight requests are gathered by one scheduler thread into full recognition
+batches (the rec model's batch size) and the results are scattered back.
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+from ocr_backends import crop_text_region, sorted_boxes
+
+
+# --- 1. Recognition Scheduler ---
+
+class RecognitionBatcher:
+    """
+    Collects line crops from concurrent callers into batches of `batch_size`
+    (waiting at most `max_wait_ms` to fill one) and runs `recognize_fn` on them.
+    `recognize_fn(list_of_crops)` must return one (text, score) per crop.
+    """
+
+    def __init__(self, recognize_fn, batch_size: int, max_wait_ms: float = 5.0):
+        self.recognize_fn = recognize_fn
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True, name="rec-batcher").start()
+
+    def recognize(self, crops: list) -> list:
+        """Blocks until every crop is recognised; results keep the input order."""
+        if not crops:
+            return []
+        request = {"results": [None] * len(crops), "remaining": len(crops), "done": threading.Event(), "error": None}
+        for i, crop in enumerate(crops):
+            self._queue.put((request, i, crop))
+        request["done"].wait()
+        if request["error"] is not None:
+            raise request["error"]
+        return request["results"]
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                outputs = list(self.recognize_fn([crop for _, _, crop in batch]))
+                error = None
+                if len(outputs) != len(batch):
+                    # zip() would silently leave the tail's requests waiting forever
+                    raise RuntimeError(f"recognize_fn returned {len(outputs)} results for {len(batch)} crops")
+            except Exception as e:
+                outputs, error = [None] * len(batch), e
+
+            for (request, i, _), output in zip(batch, outputs):
+                request["results"][i] = output
+                if error is not None:
+                    request["error"] = error
+                request["remaining"] -= 1
+                if request["remaining"] == 0:
+                    request["done"].set()
+
+
+# --- 2. Staged OCR (per-request detection, batched recognition) ---
+
+class StagedOCR:
+    """Drop-in for `backend.ocr(img)` on an OCRBackend (ocr_backends.py), with shared rec batches."""
+
+    def __init__(self, backend, max_wait_ms: float = 5.0):
+        self.backend = backend
+        self._stage_lock = threading.Lock()  # det/cls predictors are not thread-safe
+        self.batcher = RecognitionBatcher(backend.recognize, backend.rec_batch_size, max_wait_ms)
+
+    def ocr(self, img: np.ndarray) -> list:
+        with self._stage_lock:
+            boxes = sorted_boxes(self.backend.detect(img))
+            if not boxes:
+                return []
+            crops = self.backend.classify([crop_text_region(img, box) for box in boxes])
+
+        rec_res = self.batcher.recognize(crops)
+        return [
+            [np.asarray(box).tolist(), (text, float(score))]
+            for box, (text, score) in zip(boxes, rec_res)
+            if score >= self.backend.drop_score
+        ]
@@ -0,0 +1,49 @@
+"""
+Scaling check for layout.find_labelled_values on dense multi-column pages.
+Time per box should stay roughly constant as the page grows (linear scaling).
+
+Run from the project root:  python Benchmarks/layout_bench.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from layout import find_labelled_values
+
+BOX_COUNTS = [500, 2000, 8000, 32000]
+LINE_HEIGHT = 24
+COLUMN_WIDTH = 420
+ROWS_PER_COLUMN = 120
+REPEATS = 3
+
+LABELS = ["Name", "DOB:", "Father's Name", "Address", "Policy No", "Amount", "Date"]
+
+
+def synthetic_page(num_boxes: int, seed: int = 0) -> list:
+    """Label/value pairs laid out in as many columns as needed, `ocr.ocr` format."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(num_boxes // 2):
+        column, row = divmod(i, ROWS_PER_COLUMN)
+        x = column * COLUMN_WIDTH + rng.uniform(0, 4)
+        y = row * LINE_HEIGHT * 1.3 + rng.uniform(0, 2)
+        label = rng.choice(LABELS)
+        lines.append([[(x, y), (x + 120, y), (x + 120, y + LINE_HEIGHT), (x, y + LINE_HEIGHT)], (label, 0.95)])
+        vx = x + 140
+        lines.append([[(vx, y), (vx + 250, y), (vx + 250, y + LINE_HEIGHT), (vx, y + LINE_HEIGHT)], (f"VALUE {i}", 0.95)])
+    return lines
+
+
+if __name__ == "__main__":
+    print(f"{'boxes':>7} | {'total (ms)':>10} | {'per box (us)':>12} | {'matches':>7}")
+    print("-" * 46)
+    for count in BOX_COUNTS:
+        page = synthetic_page(count)
+        best = float("inf")
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            matches = find_labelled_values(page)
+            best = min(best, time.perf_counter() - start)
+        print(f"{count:>7} | {best * 1e3:>10.1f} | {best * 1e6 / count:>12.2f} | {len(matches):>7}")
@@ -0,0 +1,51 @@
+"""
+Lookup latency of the near-duplicate hash index as it grows to millions of entries.
+
+Run from the project root:  python Benchmarks/near_dup_bench.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from near_dup_cache import MultiIndexHashTable
+
+SIZES = [10_000, 100_000, 1_000_000, 2_000_000]
+MAX_DISTANCE = 4
+QUERIES = 2000
+
+
+def flip_bits(value: int, count: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    table = MultiIndexHashTable(MAX_DISTANCE)
+    stored = []
+
+    print(f"{'entries':>9} | {'hit (us)':>8} | {'miss (us)':>9} | {'recall':>6}")
+    print("-" * 42)
+    for size in SIZES:
+        while len(table) < size:
+            value = rng.getrandbits(64)
+            table.add(len(table), value)
+            stored.append(value)
+
+        # Hits: stored hashes with up to MAX_DISTANCE bits flipped (re-scans)
+        queries = [(i, flip_bits(stored[i], rng.randint(0, MAX_DISTANCE), rng))
+                   for i in rng.sample(range(size), QUERIES)]
+        start = time.perf_counter()
+        found = sum(any(k == i for _, k in table.search(q)) for i, q in queries)
+        hit_us = (time.perf_counter() - start) * 1e6 / QUERIES
+
+        misses = [rng.getrandbits(64) for _ in range(QUERIES)]
+        start = time.perf_counter()
+        for q in misses:
+            table.search(q)
+        miss_us = (time.perf_counter() - start) * 1e6 / QUERIES
+
+        print(f"{size:>9} | {hit_us:>8.1f} | {miss_us:>9.1f} | {found / QUERIES:>6.3f}")
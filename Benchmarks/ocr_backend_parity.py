@@ -0,0 +1,109 @@
+"""
+Parity and speed of the ONNX Runtime OCR backend against PaddleOCR.
+
+Both backends OCR every image in the sample set. A Paddle line counts as found
+when an ONNX line overlaps it with IoU >= 0.5; found lines are compared by text
+(exact match and character error rate) and every image is also checked for
+identical redaction decisions (the set of PII rule matches in its text).
+Exits non-zero if the ONNX backend falls below the parity thresholds; the same
+gate on detected PII regions runs in tests/test_ocr_backend_parity.py.
+
+Run from the project root:  python Benchmarks/ocr_backend_parity.py [image_dir]
+"""
+import logging
+import os
+import sys
+import time
+
+import cv2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "App"))
+from ocr_backends import OnnxBackend, PaddleBackend
+from pii_rules import default_engine
+
+logging.getLogger("ppocr").setLevel(logging.WARNING)
+
+MATCH_IOU = 0.5
+MIN_LINE_RECALL = 0.97
+MAX_CER = 0.02
+
+
+def _bounds(points):
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _iou(a, b) -> float:
+    iw = min(a[2], b[2]) - max(a[0], b[0])
+    ih = min(a[3], b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter)
+
+
+def _edit_distance(a: str, b: str) -> int:
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+    return row[-1]
+
+
+def _pii(lines) -> set:
+    return {(m.rule, m.text) for line in lines for m in default_engine.scan(line[1][0], strict=False)}
+
+
+def timed_ocr(backend, images):
+    start = time.perf_counter()
+    outputs = [backend.ocr(img) for img in images]
+    return outputs, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "Sample_dataset", "Sensitive")
+    names = [f for f in sorted(os.listdir(image_dir)) if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
+    images = [cv2.imread(os.path.join(image_dir, f)) for f in names]
+    if not images:
+        sys.exit(f"🛑 No images found in {image_dir}")
+
+    paddle, onnx = PaddleBackend(), OnnxBackend()
+    paddle.ocr(images[0])  # warm-up
+    onnx.ocr(images[0])
+    paddle_out, paddle_time = timed_ocr(paddle, images)
+    onnx_out, onnx_time = timed_ocr(onnx, images)
+
+    total = found = exact = chars = errors = 0
+    pii_mismatches = []
+    for name, ref_lines, test_lines in zip(names, paddle_out, onnx_out):
+        test_bounds = [_bounds(line[0]) for line in test_lines]
+        for ref in ref_lines:
+            total += 1
+            ref_bounds = _bounds(ref[0])
+            best = max(range(len(test_lines)), key=lambda i: _iou(ref_bounds, test_bounds[i]), default=None)
+            if best is None or _iou(ref_bounds, test_bounds[best]) < MATCH_IOU:
+                continue
+            found += 1
+            ref_text, test_text = ref[1][0], test_lines[best][1][0]
+            exact += ref_text == test_text
+            chars += max(1, len(ref_text))
+            errors += _edit_distance(ref_text, test_text)
+        if _pii(ref_lines) != _pii(test_lines):
+            pii_mismatches.append(name)
+
+    recall = found / max(1, total)
+    cer = errors / max(1, chars)
+    print(f"{len(images)} images, {total} PaddleOCR lines\n")
+    print(f"line recall (IoU >= {MATCH_IOU}): {recall:.3f}")
+    print(f"exact text match:         {exact / max(1, found):.3f}")
+    print(f"character error rate:     {cer:.4f}")
+    print(f"PII decision mismatches:  {len(pii_mismatches)}" + (f"  {pii_mismatches[:10]}" if pii_mismatches else ""))
+    print(f"\npaddle: {len(images) / paddle_time:.2f} img/s   onnx: {len(images) / onnx_time:.2f} img/s   "
+          f"speed-up {paddle_time / onnx_time:.2f}x")
+
+    if recall < MIN_LINE_RECALL or cer > MAX_CER or pii_mismatches:
+        sys.exit("🛑 ONNX backend is not at parity with PaddleOCR.")
+    print("✅ ONNX backend matches PaddleOCR.")
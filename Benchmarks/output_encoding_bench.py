@@ -0,0 +1,64 @@
+"""
+Encode time and output size of the redacted image per output format, on the
+sample redactions in Output/. Baseline is the old path: cv2.imwrite of a PNG
+to a temp file, then reading the bytes back.
+
+Run from the project root:  python Benchmarks/output_encoding_bench.py [image ...]
+"""
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import cv2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "App"))
+from image_encoding import encode_image
+
+REPEATS = 10
+SETTINGS = [
+    ("png", 1), ("png", 3), ("png", 6), ("png", 9),
+    ("jpeg", 75), ("jpeg", 90), ("jpeg", 95),
+    ("webp", 80), ("webp", 90), ("webp", 101),
+]
+
+
+def _median_ms(fn) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def temp_file_png(img) -> bytes:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp:
+        path = tmp.name
+    try:
+        cv2.imwrite(path, img)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join(ROOT, "Output", "*_redacted.png")))
+    if not paths:
+        sys.exit("🛑 No redacted samples found in Output/")
+
+    for path in paths:
+        img = cv2.imread(path)
+        print(f"\n{os.path.basename(path)}  ({img.shape[1]}x{img.shape[0]})")
+        print(f"{'format':>8} | {'quality':>7} | {'encode ms':>9} | {'size KB':>8}")
+        print("-" * 42)
+        size = len(temp_file_png(img)) / 1024
+        print(f"{'tmp png':>8} | {'-':>7} | {_median_ms(lambda: temp_file_png(img)):>9.1f} | {size:>8.0f}")
+        for fmt, quality in SETTINGS:
+            size = len(encode_image(img, fmt, quality)[0]) / 1024
+            ms = _median_ms(lambda: encode_image(img, fmt, quality))
+            print(f"{fmt:>8} | {quality:>7} | {ms:>9.1f} | {size:>8.0f}")
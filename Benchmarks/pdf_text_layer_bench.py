@@ -0,0 +1,62 @@
+"""
+Per-page cost of finding PII text in PDFs: text-layer fast path (pdftotext
+-bbox-layout + rules) vs. the OCR path (OCR of the rasterised page + rules).
+Rasterisation is excluded from both; it is needed for the output page either way.
+
+Run from the project root:  python Benchmarks/pdf_text_layer_bench.py [pdf_dir] [paddle|onnx]
+"""
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "App"))
+from ocr_backends import create_backend
+from pdf_io import PDF_DPI, pdf_page_count, render_page
+from pdf_text import extract_text_lines
+from pii_rules import default_engine
+
+logging.getLogger("ppocr").setLevel(logging.WARNING)
+
+
+def _scan(lines) -> int:
+    return sum(len(default_engine.scan(line[1][0], strict=False)) for line in lines)
+
+
+if __name__ == "__main__":
+    pdf_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "Sample_dataset", "Non_sensitive")
+    pdfs = [os.path.join(pdf_dir, f) for f in sorted(os.listdir(pdf_dir)) if f.lower().endswith(".pdf")]
+    if not pdfs:
+        sys.exit(f"🛑 No PDFs found in {pdf_dir}")
+    ocr = create_backend(sys.argv[2] if len(sys.argv) > 2 else "paddle")
+
+    print(f"{'document':<32} | {'page':>4} | {'text layer ms':>13} | {'OCR ms':>8} | {'speed-up':>8} | matches")
+    print("-" * 90)
+    text_total = ocr_total = 0.0
+    for pdf_path in pdfs:
+        for page_no in range(1, pdf_page_count(pdf_path) + 1):
+            start = time.perf_counter()
+            lines = extract_text_lines(pdf_path, page_no, PDF_DPI)
+            text_matches = _scan(lines) if lines is not None else None
+            text_time = time.perf_counter() - start
+
+            img = cv2.cvtColor(np.asarray(render_page(pdf_path, page_no, PDF_DPI)), cv2.COLOR_RGB2BGR)
+            start = time.perf_counter()
+            ocr_matches = _scan(ocr.ocr(img))
+            ocr_time = time.perf_counter() - start
+
+            name = os.path.basename(pdf_path)[:32]
+            if lines is None:
+                print(f"{name:<32} | {page_no:>4} | {'image-only':>13} | {ocr_time * 1000:>8.0f} | {'-':>8} | - / {ocr_matches}")
+                continue
+            text_total += text_time
+            ocr_total += ocr_time
+            print(f"{name:<32} | {page_no:>4} | {text_time * 1000:>13.1f} | {ocr_time * 1000:>8.0f} | "
+                  f"{ocr_time / text_time:>7.0f}x | {text_matches} / {ocr_matches}")
+
+    if text_total:
+        print(f"\nText-layer pages overall: {ocr_total / text_total:.0f}x faster than OCR")
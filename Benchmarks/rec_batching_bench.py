@@ -0,0 +1,68 @@
+"""
+Throughput of per-request OCR vs cross-request batched recognition at
+concurrency 1, 4 and 16.
+
+Baseline: one shared OCR backend, each request runs ocr.ocr() under a lock (what
+ml_core does without batching). Batched: rec_batching.StagedOCR, where line
+crops from all in-flight requests share recognition batches.
+
+Run from the project root:  python Benchmarks/rec_batching_bench.py [image_dir] [paddle|onnx]
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "App"))
+from ocr_backends import create_backend
+from rec_batching import StagedOCR
+
+logging.getLogger("ppocr").setLevel(logging.WARNING)
+
+CONCURRENCY = [1, 4, 16]
+DOCUMENTS_PER_RUN = 48
+
+
+def run(ocr_fn, images: list, concurrency: int) -> tuple[float, int]:
+    """Processes DOCUMENTS_PER_RUN documents with `concurrency` client threads."""
+    docs = [images[i % len(images)] for i in range(DOCUMENTS_PER_RUN)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        line_counts = list(pool.map(lambda img: len(ocr_fn(img)), docs))
+    return time.perf_counter() - start, sum(line_counts)
+
+
+if __name__ == "__main__":
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "Sample_dataset", "Sensitive")
+    images = [cv2.imread(os.path.join(image_dir, f)) for f in sorted(os.listdir(image_dir))
+              if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
+    if not images:
+        sys.exit(f"🛑 No images found in {image_dir}")
+
+    ocr = create_backend(sys.argv[2] if len(sys.argv) > 2 else "paddle")
+    lock = threading.Lock()
+
+    def baseline(img):
+        with lock:
+            return ocr.ocr(img)
+
+    staged = StagedOCR(ocr)
+
+    # Warm-up (model load, first-run allocations)
+    baseline(images[0])
+    staged.ocr(images[0])
+
+    print(f"{DOCUMENTS_PER_RUN} documents per run, rec batch size {staged.batcher.batch_size}\n")
+    print(f"{'concurrency':>11} | {'baseline docs/s':>15} | {'batched docs/s':>14} | {'speed-up':>8}")
+    print("-" * 59)
+    for concurrency in CONCURRENCY:
+        base_time, base_lines = run(baseline, images, concurrency)
+        batch_time, batch_lines = run(staged.ocr, images, concurrency)
+        print(f"{concurrency:>11} | {DOCUMENTS_PER_RUN / base_time:>15.2f} | "
+              f"{DOCUMENTS_PER_RUN / batch_time:>14.2f} | {base_time / batch_time:>7.2f}x"
+              f"   (lines {base_lines} vs {batch_lines})")
@@ -0,0 +1,87 @@
+"""
+Recall-vs-speed evaluation of saliency-guided OCR.
+
+For every image, full-page OCR is the reference: the PII lines it finds (rule
+matches + layout values) are the ground truth. Saliency-guided OCR is run at
+several thresholds and scored on how many of those PII values it still finds,
+how much of the page it OCRs and how long it takes.
+
+Run from the App folder (ml_core loads the models):
+    python ../Benchmarks/saliency_ocr_eval.py [image_dir]
+"""
+import os
+import sys
+import time
+
+import cv2
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App")
+sys.path.append(APP_DIR)
+import ml_core
+from layout import find_labelled_values
+
+DEFAULT_IMAGE_DIR = os.path.join(os.path.dirname(APP_DIR), "Sample_dataset", "Sensitive")
+THRESHOLDS = [0.2, 0.3, 0.4, 0.5]
+
+
+def pii_values(lines) -> set:
+    """Normalised PII strings found in a set of OCR lines."""
+    found = set()
+    for line in lines:
+        text, conf = line[1]
+        if conf < ml_core.OCR_MIN_CONFIDENCE:
+            continue
+        for match in ml_core.pii_engine.scan(text, strict=ml_core.STRICT_CHECKSUMS):
+            found.add((match.rule, match.text.replace(" ", "").upper()))
+    for match in find_labelled_values(lines, ml_core.OCR_MIN_CONFIDENCE, ml_core.LAYOUT_FIELDS):
+        found.add((match.field, match.text.replace(" ", "").upper()))
+    return found
+
+
+def evaluate(image_dir: str) -> None:
+    image_paths = sorted(
+        os.path.join(image_dir, f) for f in os.listdir(image_dir)
+        if f.lower().endswith(('.jpg', '.jpeg', '.png'))
+    )
+    if not image_paths:
+        sys.exit(f"🛑 No images found in {image_dir}")
+
+    full_time, truth = 0.0, {}
+    saliency_maps, images = {}, {}
+    for path in image_paths:
+        img = cv2.imread(path)
+        _, _, saliency_maps[path] = ml_core.predict_image_with_saliency(path)
+        start = time.perf_counter()
+        truth[path] = pii_values(ml_core._run_ocr(img))
+        full_time += time.perf_counter() - start
+        images[path] = img
+
+    total_truth = sum(len(v) for v in truth.values())
+    print(f"{len(image_paths)} images, {total_truth} PII values found by full-page OCR")
+    print(f"Full-page OCR: {1e3 * full_time / len(image_paths):.0f} ms/image\n")
+    print(f"{'threshold':>9} | {'recall':>6} | {'OCR area':>8} | {'ms/image':>8} | {'speed-up':>8}")
+    print("-" * 52)
+
+    for threshold in THRESHOLDS:
+        hits, area, elapsed = 0, 0.0, 0.0
+        for path in image_paths:
+            img = images[path]
+            h, w = img.shape[:2]
+            start = time.perf_counter()
+            regions = ml_core._salient_regions(saliency_maps[path], img.shape, threshold)
+            found = pii_values(ml_core._run_ocr(img, regions))
+            elapsed += time.perf_counter() - start
+
+            hits += len(truth[path] & found)
+            if regions is None:
+                area += 1.0
+            else:
+                area += sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions) / (h * w)
+
+        recall = hits / total_truth if total_truth else 1.0
+        print(f"{threshold:>9.2f} | {recall:>6.3f} | {area / len(image_paths):>8.1%} | "
+              f"{1e3 * elapsed / len(image_paths):>8.0f} | {full_time / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    evaluate(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_IMAGE_DIR)
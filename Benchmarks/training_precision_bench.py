@@ -0,0 +1,86 @@
+"""
+Training throughput and final validation metrics per precision setting:
+fp32 vs bfloat16 autocast, default vs channels_last memory format, and
+gradient accumulation. Each setting trains the same model (head plus the last
+TRAINABLE_BLOCKS EfficientNet blocks, TRAINING_MODE "full") from the same seed
+on the same subset, so only speed and accuracy differ.
+
+bf16 rows are skipped when the CPU has no native bfloat16 (AVX512-BF16 / AMX).
+
+Run from the project root:  python Benchmarks/training_precision_bench.py [epochs] [train images]
+"""
+import os
+import sys
+
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import DataLoader, Subset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "Model"))
+from model import BATCH_SIZE, build_datasets, build_model, train_epoch, evaluate, summarise, train_augment
+from training_utils import loader_settings, balanced_sampler, bf16_supported, EpochTimer
+
+TRAINABLE_BLOCKS = 2
+# (precision, channels_last, gradient accumulation steps, batch size)
+SETTINGS = [
+    ("fp32", False, 1, BATCH_SIZE),
+    ("fp32", True, 1, BATCH_SIZE),
+    ("bf16", False, 1, BATCH_SIZE),
+    ("bf16", True, 1, BATCH_SIZE),
+    ("bf16", True, 4, BATCH_SIZE // 4),
+]
+
+
+def run(setting, train_dataset, train_labels, val_dataset, epochs, device):
+    precision, channels_last, accum_steps, batch_size = setting
+    torch.manual_seed(0)
+    settings = loader_settings(device)
+    train_loader = DataLoader(train_dataset, batch_size=batch_size, sampler=balanced_sampler(train_labels), **settings)
+    val_loader = DataLoader(val_dataset, batch_size=BATCH_SIZE, **settings)
+
+    model = build_model(device, TRAINABLE_BLOCKS, channels_last)
+    criterion = nn.BCELoss()
+    optimizer = optim.Adam([param for param in model.parameters() if param.requires_grad], lr=1e-4)
+    timer = EpochTimer(device)
+
+    images = seconds = 0.0
+    for epoch in range(epochs):
+        model.train()
+        train_epoch(model, train_loader, criterion, optimizer, device, train_augment, precision,
+                    channels_last, accum_steps, timer, desc=f"{precision} epoch {epoch + 1}")
+        images += timer.images
+        seconds += timer.data_time + timer.compute_time
+
+    model.eval()
+    val = summarise(evaluate(model, val_loader, criterion, device, precision, channels_last))
+    return images / seconds, val
+
+
+if __name__ == "__main__":
+    epochs = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    device = torch.device("cpu")
+
+    train_dataset, val_dataset, _ = build_datasets()
+    indices = torch.randperm(len(train_dataset), generator=torch.Generator().manual_seed(0))[:limit].tolist()
+    train_labels = [train_dataset.samples[i][1] for i in indices]
+    train_subset = Subset(train_dataset, indices)
+    print(f"{len(indices)} train / {len(val_dataset)} val images, {epochs} epoch(s), "
+          f"{TRAINABLE_BLOCKS} trainable blocks, native bf16: {bf16_supported(device)}")
+
+    results = []
+    for setting in SETTINGS:
+        if setting[0] == "bf16" and not bf16_supported(device):
+            continue
+        results.append((setting, *run(setting, train_subset, train_labels, val_dataset, epochs, device)))
+
+    baseline_speed, baseline_val = results[0][1], results[0][2]
+    print(f"\n{'precision':>9} | {'ch_last':>7} | {'accum':>5} | {'img/s':>7} | {'speedup':>7} | "
+          f"{'val loss':>8} | {'val acc':>7} | {'val F1':>6} | {'dF1':>6}")
+    print("-" * 86)
+    for (precision, channels_last, accum_steps, batch_size), speed, val in results:
+        print(f"{precision:>9} | {str(channels_last):>7} | {accum_steps:>5} | {speed:>7.1f} | "
+              f"{speed / baseline_speed:>6.2f}x | {val['loss']:>8.4f} | {val['acc']:>7.4f} | "
+              f"{val['f1']:>6.4f} | {val['f1'] - baseline_val['f1']:>+6.3f}")
@@ -0,0 +1,69 @@
+"""
+Batched on-the-fly augmentation for training.
+
+Replaces the offline Keras ImageDataGenerator step (Preprocessing/
+data_generation.py) with the same augmentations (rotation, width/height
+shift, zoom, horizontal flip, nearest fill) applied to whole batches: one
+random affine matrix per image, then a single affine_grid + grid_sample call
+for the batch, on whatever device the batch is on.
+"""
+import math
+
+import torch
+import torch.nn.functional as F
+
+
+class BatchAugment:
+    """
+    Random affine augmentation of float image batches (N x C x H x W, or a
+    single C x H x W image). Ranges follow ImageDataGenerator: rotation in
+    degrees, shifts as fractions of the width / height, zoom as +- fraction
+    (independent per axis), horizontal flips with probability 0.5. Pixels
+    sampled from outside the image repeat the border (fill_mode='nearest').
+    """
+
+    def __init__(self, rotation: float = 30, shift: float = 0.1, zoom: float = 0.1, horizontal_flip: bool = True):
+        self.rotation = rotation
+        self.shift = shift
+        self.zoom = zoom
+        self.horizontal_flip = horizontal_flip
+
+    def __repr__(self):
+        return (f"{type(self).__name__}(rotation={self.rotation}, shift={self.shift}, zoom={self.zoom}, "
+                f"horizontal_flip={self.horizontal_flip})")
+
+    def matrices(self, n: int, height: int, width: int, device=None) -> torch.Tensor:
+        """N x 2 x 3 affine_grid matrices (output -> input, normalised coordinates)."""
+        def uniform(low, high):
+            return torch.empty(n, device=device).uniform_(low, high)
+
+        angle = uniform(-self.rotation, self.rotation) * (math.pi / 180)
+        zoom_x = uniform(1 - self.zoom, 1 + self.zoom)
+        zoom_y = uniform(1 - self.zoom, 1 + self.zoom)
+        # Normalised coordinates span 2 across the image
+        shift_x = uniform(-self.shift, self.shift) * 2
+        shift_y = uniform(-self.shift, self.shift) * 2
+        flip = torch.ones(n, device=device)
+        if self.horizontal_flip:
+            flip = torch.where(torch.rand(n, device=device) < 0.5, -flip, flip)
+
+        cos, sin = torch.cos(angle), torch.sin(angle)
+        aspect = height / width  # rotate in pixel space, not in the (non-square) normalised space
+        theta = torch.empty(n, 2, 3, device=device)
+        theta[:, 0, 0] = cos * zoom_x * flip
+        theta[:, 0, 1] = -sin * zoom_y * aspect
+        theta[:, 0, 2] = shift_x
+        theta[:, 1, 0] = sin * zoom_x * flip / aspect
+        theta[:, 1, 1] = cos * zoom_y
+        theta[:, 1, 2] = shift_y
+        return theta
+
+    def __call__(self, images: torch.Tensor) -> torch.Tensor:
+        single = images.dim() == 3
+        if single:
+            images = images.unsqueeze(0)
+        n, _, height, width = images.shape
+        theta = self.matrices(n, height, width, device=images.device).to(images.dtype)
+        grid = F.affine_grid(theta, list(images.shape), align_corners=False)
+        augmented = F.grid_sample(images, grid, mode="bilinear", padding_mode="border", align_corners=False)
+        return augmented[0] if single else augmented
@@ -0,0 +1,132 @@
+"""
+Cached backbone embeddings for training the classifier head on frozen features.
+
+With `model.features` frozen, every epoch would recompute the same EfficientNet
+features only to train one Linear layer. Here the pooled backbone embedding of
+every image is computed once (optionally for K augmented views per image) and
+stored in a memory-mapped .npy file; the head then trains on those rows.
+
+Augmented views come from a batched augmentation (augmentation.BatchAugment)
+applied to each batch before the backbone.
+
+The cache directory holds embeddings.npy (views x samples x dim, float16),
+labels.npy and meta.json. meta.json is written last and carries a fingerprint
+of the image list (path, size, mtime, label), the backbone weights, the
+transform, the augmentation and the number of views; a mismatch (or a missing meta.json) means
+the cache is rebuilt.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset
+from tqdm import tqdm
+
+
+def backbone_embeddings(model, images: torch.Tensor) -> torch.Tensor:
+    """Pooled EfficientNet features: the classifier head's input."""
+    return torch.flatten(model.avgpool(model.features(images)), 1)
+
+
+def cache_fingerprint(samples: list, model, transform, views: int, augment=None) -> str:
+    """Changes when any image, label, backbone weight, the transform, `augment` or `views` changes."""
+    digest = hashlib.sha256()
+    for path, label in sorted(samples):
+        stat = os.stat(path)
+        digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{label}\n".encode())
+    for name, tensor in model.features.state_dict().items():
+        digest.update(name.encode())
+        digest.update(tensor.detach().cpu().numpy().tobytes())
+    digest.update(f"{transform!r}|{augment!r}|views={views}".encode())
+    return digest.hexdigest()
+
+
+class _ViewDataset(Dataset):
+    """Wraps an image dataset; returns (image, label, index)."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, idx):
+        image, label = self.dataset[idx]
+        return image, label, idx
+
+
+def build_embedding_cache(model, dataset, cache_dir: str, views: int = 1, batch_size: int = 64,
+                          device=torch.device("cpu"), num_workers: int = 0, augment=None) -> str:
+    """
+    Computes (or reuses) the embedding cache of `dataset`, a ManifestDataset.
+    `augment` (a batch augmentation) makes the K views differ; without it all
+    views are identical, so use views=1. The backbone runs in eval mode.
+    Returns cache_dir.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    fingerprint = cache_fingerprint(dataset.samples, model, dataset.transform, views, augment)
+
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            if json.load(f).get("fingerprint") == fingerprint:
+                print(f"✅ Reusing embedding cache in {cache_dir}")
+                return cache_dir
+        os.remove(meta_path)  # stale: invalidate before rewriting the arrays
+
+    was_training = model.training
+    model.eval()
+    loader = DataLoader(_ViewDataset(dataset), batch_size=batch_size, num_workers=num_workers)
+    dim = model.classifier[1].in_features
+    embeddings = np.lib.format.open_memmap(
+        os.path.join(cache_dir, "embeddings.npy"), mode="w+", dtype=np.float16, shape=(views, len(dataset), dim)
+    )
+    labels = np.array([label for _, label in dataset.samples], dtype=np.float32)
+
+    with torch.no_grad():
+        for view in range(views):
+            for images, _, idx in tqdm(loader, desc=f"Embedding view {view + 1}/{views}", leave=False):
+                images = images.to(device)
+                if augment is not None:
+                    images = augment(images)
+                features = backbone_embeddings(model, images)
+                embeddings[view, idx.numpy()] = features.cpu().numpy().astype(np.float16)
+    embeddings.flush()
+    del embeddings
+    np.save(os.path.join(cache_dir, "labels.npy"), labels)
+    model.train(was_training)
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "views": views, "samples": len(dataset), "dim": dim}, f, indent=2)
+    print(f"✅ Cached {views} view(s) x {len(dataset)} embeddings in {cache_dir}")
+    return cache_dir
+
+
+class CachedEmbeddingDataset(Dataset):
+    """
+    Reads (embedding, label) rows from an embedding cache. Each access picks a
+    random view, so every epoch sees a different augmentation of each image.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.embeddings_path = os.path.join(cache_dir, "embeddings.npy")
+        self.labels = np.load(os.path.join(cache_dir, "labels.npy"))
+        self.embeddings = np.load(self.embeddings_path, mmap_mode="r")
+        self.views = self.embeddings.shape[0]
+
+    def __getstate__(self):
+        # A memmap would be pickled as a full in-memory copy (spawned workers)
+        state = self.__dict__.copy()
+        state["embeddings"] = None
+        return state
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx):
+        if self.embeddings is None:
+            self.embeddings = np.load(self.embeddings_path, mmap_mode="r")
+        view = int(torch.randint(self.views, (1,))) if self.views > 1 else 0
+        return torch.from_numpy(self.embeddings[view, idx].astype(np.float32)), int(self.labels[idx])
@@ -0,0 +1,165 @@
+"""
+Split manifest: the train / val / test assignment of every source image,
+without copying any files.
+
+The manifest is a CSV with one row per image: path, label, split, sha256
+(plus size and mtime_ns, so unchanged files are not re-hashed). The split is
+derived from the content hash, so it is stable: re-running update_manifest()
+only hashes new or modified files, new images get a split without moving any
+existing one, and byte-identical copies always land in the same split.
+
+Preprocessing/dedup.py fills the phash, group and keep columns: near-
+duplicate images of one label share a group (and a split), and of copies of
+the same image only one has keep=1. manifest_samples() skips keep=0 rows.
+update_manifest() gives new images a split by content hash alone, so it must
+be followed by deduplicate_manifest() (model.organize_dataset() does) for a
+new near-duplicate to join its cluster's split.
+
+Tools that need the old Final_Data/<split>/<label>/ folder layout can get it
+with link_split_folders(), which hardlinks instead of copying.
+"""
+import csv
+import hashlib
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+from torch.utils.data import Dataset
+
+FIELDS = ["path", "label", "split", "sha256", "size", "mtime_ns", "phash", "group", "keep"]
+LABELS_MAP = {"non_sensitive": 0, "sensitive": 1}
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+# Cumulative split boundaries over the hash value: 70% train, 15% val, 15% test
+SPLITS = (("train", 0.70), ("val", 0.85), ("test", 1.0))
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def split_for_hash(sha256: str) -> str:
+    """Deterministic split from the content hash (uniform over [0, 1))."""
+    position = int(sha256[:8], 16) / 2**32
+    for split, upper in SPLITS:
+        if position < upper:
+            return split
+    return SPLITS[-1][0]
+
+
+def read_manifest(manifest_path: str, split: str = None) -> list[dict]:
+    if not os.path.exists(manifest_path):
+        return []
+    with open(manifest_path, "r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return [row for row in rows if split is None or row["split"] == split]
+
+
+def write_manifest(manifest_path: str, rows: list[dict]) -> None:
+    """Atomic write: readers never see a half-written manifest."""
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, restval="", extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(sorted(rows, key=lambda row: row["path"]))
+    os.replace(tmp_path, manifest_path)
+
+
+def update_manifest(manifest_path: str, sources: dict, workers: int = 8) -> list[dict]:
+    """
+    Incrementally syncs the manifest with the images under `sources`
+    ({label: directory}): new or modified files are hashed and assigned a
+    split, deleted files are dropped, everything else is kept as is.
+    """
+    existing = {row["path"]: row for row in read_manifest(manifest_path)}
+    rows, to_hash = [], []
+
+    for label, directory in sources.items():
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if not name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                path = os.path.abspath(os.path.join(root, name))
+                stat = os.stat(path)
+                row = existing.get(path)
+                if (row is not None and row["label"] == label and int(row["size"]) == stat.st_size
+                        and int(row["mtime_ns"]) == stat.st_mtime_ns):
+                    rows.append(row)
+                else:
+                    to_hash.append({"path": path, "label": label, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for row, sha256 in zip(to_hash, pool.map(lambda r: file_sha256(r["path"]), to_hash)):
+            row["sha256"] = sha256
+            row["split"] = split_for_hash(sha256)
+            rows.append(row)
+
+    removed = len(set(existing) - {row["path"] for row in rows})
+    write_manifest(manifest_path, rows)
+    counts = {split: sum(row["split"] == split for row in rows) for split, _ in SPLITS}
+    print(f"✅ Manifest updated: {len(to_hash)} new/changed, {removed} removed, splits {counts}")
+    unhashed = sum(not row.get("phash") for row in rows)
+    if unhashed:
+        print(f"⚠ {unhashed} images are not deduplicated yet: run Preprocessing/dedup.py before training, "
+              f"or near-duplicates may sit in different splits.")
+    return rows
+
+
+def manifest_samples(manifest_path: str, split: str) -> list[tuple[str, int]]:
+    """(path, label index) pairs of one split, without deduplicated (keep=0) images."""
+    return [(row["path"], LABELS_MAP[row["label"]]) for row in read_manifest(manifest_path, split)
+            if row.get("keep") != "0"]
+
+
+def manifest_fingerprint(manifest_path: str, splits: tuple = ("train", "val")) -> str:
+    """
+    Short hash of the images (content, label, split) that training sees; it
+    changes whenever images are added, removed, relabelled or deduplicated.
+    """
+    digest = hashlib.sha256()
+    for row in read_manifest(manifest_path):
+        if row["split"] in splits and row.get("keep") != "0":
+            digest.update(f"{row['sha256']},{row['label']},{row['split']}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def link_split_folders(manifest_path: str, dataset_dir: str) -> None:
+    """
+    Optional fallback for folder-based tools: recreates dataset_dir/<split>/<label>/
+    with hardlinks (a copy only where linking fails, e.g. across drives).
+    """
+    for row in read_manifest(manifest_path):
+        if row.get("keep") == "0":
+            continue
+        label_dir = os.path.join(dataset_dir, row["split"], row["label"])
+        os.makedirs(label_dir, exist_ok=True)
+        target = os.path.join(label_dir, f"{row['sha256'][:8]}_{os.path.basename(row['path'])}")
+        if os.path.exists(target):
+            continue
+        try:
+            os.link(row["path"], target)
+        except OSError:
+            shutil.copy2(row["path"], target)
+
+
+class ManifestDataset(Dataset):
+    """One split of the manifest: (image, label index) items, with `samples` as (path, label index) pairs."""
+
+    def __init__(self, manifest_path: str, split: str, transform=None):
+        self.samples = manifest_samples(manifest_path, split)
+        self.labels_map = LABELS_MAP
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getitem__(self, idx):
+        img_path, label = self.samples[idx]
+        image = Image.open(img_path).convert("RGB")
+        if self.transform:
+            image = self.transform(image)
+        return image, label
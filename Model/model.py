@@ -1,15 +1,24 @@
 import os
-import shutil
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.utils.class_weight import compute_class_weight
-from PIL import Image
+import sys
+from contextlib import nullcontext
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import DataLoader
 from torchvision import transforms, models
 from tqdm import tqdm
+from manifest import update_manifest, link_split_folders, manifest_fingerprint, ManifestDataset, LABELS_MAP
+from embedding_cache import build_embedding_cache, CachedEmbeddingDataset
+from tensor_store import build_tensor_store, TensorStoreDataset
+from training_utils import (loader_settings, balanced_sampler, resolve_precision, autocast, EpochTimer,
+                            EarlyStopping, save_checkpoint, load_checkpoint)
+from augmentation import BatchAugment
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Preprocessing"))
+from dedup import deduplicate_manifest
+
+# Everything that runs is under `if __name__ == "__main__"`: DataLoader worker
+# processes (spawned on Windows) re-import this module and must not retrain.
 
 # -------------------------------
 # 1. Paths Setup
@@ -18,43 +27,67 @@ BASE_DIR = r"D:\5th sem\Deep Learning\Project\Data"
 NON_SENSITIVE_DIR = os.path.join(BASE_DIR, "Non_sensitive_Images")
 SENSITIVE_DIR = os.path.join(BASE_DIR, "Sensitive", "acw-90")
 
+# Split manifest (path, label, split, sha256): splits without copying any image.
+# LINK_SPLIT_FOLDERS also hardlinks Final_Data/<split>/<label>/ for folder-based tools.
+MANIFEST_PATH = os.path.join(BASE_DIR, "split_manifest.csv")
+LINK_SPLIT_FOLDERS = False
 DATASET_DIR = os.path.join(BASE_DIR, "Final_Data")
-TRAIN_DIR = os.path.join(DATASET_DIR, "train")
-VAL_DIR = os.path.join(DATASET_DIR, "val")
-TEST_DIR = os.path.join(DATASET_DIR, "test")
+# Perceptual dedup (Preprocessing/dedup.py) after every manifest update, so new
+# images share a split with their near-duplicates instead of leaking into train
+DEDUPLICATE = True
+
+# "full": images through the (frozen) backbone every epoch.
+# "cached_embeddings": backbone embeddings computed once (EMBEDDING_VIEWS
+# augmented views per training image) and the head trained on the cache.
+TRAINING_MODE = "cached_embeddings"
+EMBEDDING_VIEWS = 4
+EMBEDDING_BATCH_SIZE = 256
+EMBEDDING_CACHE_DIR = os.path.join(BASE_DIR, "Embedding_Cache")
+
+# "tensor_store": images decoded and resized once into uint8 memmap shards
+# (tensor_store.py); "images": decode + resize the JPEGs on every access.
+DATA_SOURCE = "tensor_store"
+TENSOR_STORE_DIR = os.path.join(BASE_DIR, "Tensor_Store")
+
+# "bf16": forward pass autocast to bfloat16 where the CPU (AVX512-BF16 / AMX)
+# or GPU supports it natively, fp32 otherwise. CHANNELS_LAST: NHWC image
+# batches and conv weights (faster oneDNN convolutions). GRAD_ACCUM_STEPS > 1
+# steps the optimizer every N batches (effective batch BATCH_SIZE * N).
+# Compare settings with Benchmarks/training_precision_bench.py.
+PRECISION = "fp32"
+CHANNELS_LAST = False
+GRAD_ACCUM_STEPS = 1
+# Last EfficientNet feature blocks trained with the head (TRAINING_MODE = "full" only)
+TRAINABLE_BLOCKS = 0
+
+# At most EPOCHS epochs; stops after PATIENCE epochs without a better
+# validation EARLY_STOPPING_METRIC ("loss" or "f1"). The LR is multiplied by
+# LR_FACTOR after LR_PATIENCE epochs without improvement. The full training
+# state is checkpointed every epoch and, with RESUME, picked up automatically
+# after an interruption; BEST_MODEL_PATH holds the best weights only.
+EPOCHS = 25
+EARLY_STOPPING_METRIC = "loss"
+PATIENCE = 5
+LR_FACTOR = 0.5
+LR_PATIENCE = 2
+RESUME = True
+CHECKPOINT_PATH = "efficientnetb3_checkpoint.pth"
+BEST_MODEL_PATH = "efficientnetb3_best.pth"
 
 # -------------------------------
-# 2. Create Final Dataset Structure
+# 2. Split Manifest
 # -------------------------------
-if not os.path.exists(DATASET_DIR):
-    os.makedirs(TRAIN_DIR), os.makedirs(VAL_DIR), os.makedirs(TEST_DIR)
-
-    # Get image paths
-    non_sensitive_imgs = [os.path.join(NON_SENSITIVE_DIR, img) for img in os.listdir(NON_SENSITIVE_DIR)]
-    sensitive_imgs = [os.path.join(SENSITIVE_DIR, img) for img in os.listdir(SENSITIVE_DIR)]
-
-    # Labels
-    non_sensitive_labels = ["non_sensitive"] * len(non_sensitive_imgs)
-    sensitive_labels = ["sensitive"] * len(sensitive_imgs)
-
-    X = np.array(non_sensitive_imgs + sensitive_imgs)
-    y = np.array(non_sensitive_labels + sensitive_labels)
-
-    # Split train, val, test
-    X_train, X_tmp, y_train, y_tmp = train_test_split(X, y, test_size=0.3, stratify=y, random_state=42)
-    X_val, X_test, y_val, y_test = train_test_split(X_tmp, y_tmp, test_size=0.5, stratify=y_tmp, random_state=42)
-
-    def copy_files(X, y, dest_dir):
-        for img_path, label in zip(X, y):
-            label_dir = os.path.join(dest_dir, label)
-            os.makedirs(label_dir, exist_ok=True)
-            shutil.copy(img_path, label_dir)
-
-    copy_files(X_train, y_train, TRAIN_DIR)
-    copy_files(X_val, y_val, VAL_DIR)
-    copy_files(X_test, y_test, TEST_DIR)
-
-    print("✅ Dataset successfully organized!")
+def organize_dataset():
+    """
+    Adds new / changed source images to the manifest and deduplicates it: new
+    near-duplicates join their cluster's split, existing images stay put unless
+    a new image links two clusters.
+    """
+    update_manifest(MANIFEST_PATH, {"non_sensitive": NON_SENSITIVE_DIR, "sensitive": SENSITIVE_DIR})
+    if DEDUPLICATE:
+        deduplicate_manifest(MANIFEST_PATH)
+    if LINK_SPLIT_FOLDERS:
+        link_split_folders(MANIFEST_PATH, DATASET_DIR)
 
 # -------------------------------
 # 3. PyTorch Dataset & DataLoader
@@ -62,150 +95,261 @@ if not os.path.exists(DATASET_DIR):
 IMAGE_SIZE = 300
 BATCH_SIZE = 32
 
-class ImageFolderDataset(Dataset):
-    def __init__(self, root_dir, transform=None):
-        self.samples = []
-        self.labels_map = {"non_sensitive": 0, "sensitive": 1}
-        for label in ["non_sensitive", "sensitive"]:
-            folder = os.path.join(root_dir, label)
-            for img_name in os.listdir(folder):
-                self.samples.append((os.path.join(folder, img_name), self.labels_map[label]))
-        self.transform = transform
-
-    def __len__(self):
-        return len(self.samples)
-
-    def __getitem__(self, idx):
-        img_path, label = self.samples[idx]
-        image = Image.open(img_path).convert("RGB")
-        if self.transform:
-            image = self.transform(image)
-        return image, label
-
-# Transforms
-train_transform = transforms.Compose([
-    transforms.Resize((IMAGE_SIZE, IMAGE_SIZE)),
-    transforms.RandomHorizontalFlip(),
-    transforms.RandomRotation(20),
-    transforms.ToTensor(),
-])
-
+# Transforms: deterministic per image; training augmentation runs per batch
+# (train_augment, on the training device) instead
 val_test_transform = transforms.Compose([
     transforms.Resize((IMAGE_SIZE, IMAGE_SIZE)),
     transforms.ToTensor(),
 ])
+train_transform = val_test_transform
+
+# Tensor-store transforms: inputs are already IMAGE_SIZE uint8 CHW tensors
+store_val_test_transform = transforms.ConvertImageDtype(torch.float)
+store_train_transform = store_val_test_transform
+
+# Same augmentations the offline Keras ImageDataGenerator step used to write to disk
+train_augment = BatchAugment(rotation=30, shift=0.1, zoom=0.1, horizontal_flip=True)
+
 
-# Datasets
-train_dataset = ImageFolderDataset(TRAIN_DIR, transform=train_transform)
-val_dataset = ImageFolderDataset(VAL_DIR, transform=val_test_transform)
-test_dataset = ImageFolderDataset(TEST_DIR, transform=val_test_transform)
+def build_datasets():
+    """Train / val / test datasets of the manifest, from the tensor store or the images (DATA_SOURCE)."""
+    train_dataset = ManifestDataset(MANIFEST_PATH, "train", transform=train_transform)
+    val_dataset = ManifestDataset(MANIFEST_PATH, "val", transform=val_test_transform)
+    test_dataset = ManifestDataset(MANIFEST_PATH, "test", transform=val_test_transform)
 
-# Compute class weights
-labels = [label for _, label in train_dataset.samples]
-class_weights = compute_class_weight(class_weight="balanced", classes=np.unique(labels), y=labels)
-class_weights = torch.tensor(class_weights, dtype=torch.float32)
-print("⚖ Class Weights:", class_weights.numpy())
+    if DATA_SOURCE == "tensor_store":
+        def store_dataset(dataset, split, transform):
+            store_dir = build_tensor_store(dataset.samples, os.path.join(TENSOR_STORE_DIR, split), IMAGE_SIZE)
+            return TensorStoreDataset(store_dir, transform=transform)
 
-# DataLoaders
-train_loader = DataLoader(train_dataset, batch_size=BATCH_SIZE, shuffle=True)
-val_loader = DataLoader(val_dataset, batch_size=BATCH_SIZE)
-test_loader = DataLoader(test_dataset, batch_size=BATCH_SIZE)
+        train_dataset = store_dataset(train_dataset, "train", store_train_transform)
+        val_dataset = store_dataset(val_dataset, "val", store_val_test_transform)
+        test_dataset = store_dataset(test_dataset, "test", store_val_test_transform)
+
+    return train_dataset, val_dataset, test_dataset
 
 # -------------------------------
 # 4. Model Setup (EfficientNetB3)
 # -------------------------------
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model = models.efficientnet_b3(pretrained=True)
-for param in model.features.parameters():
-    param.requires_grad = False  # Freeze base layers
-
-# Replace classifier
-model.classifier = nn.Sequential(
-    nn.Dropout(0.4),
-    nn.Linear(model.classifier[1].in_features, 1),
-    nn.Sigmoid()
-)
-model = model.to(device)
-
-# Loss and optimizer
-criterion = nn.BCELoss()
-optimizer = optim.Adam(model.classifier.parameters(), lr=1e-4)
+class Float32Head(nn.Sequential):
+    """
+    Classifier head that always runs in fp32, outside any autocast region: in
+    bfloat16 the Sigmoid rounds every p > 0.998 to 1.0 (and the BCE loss with
+    it). Same submodules as nn.Sequential, so the state_dict keys are unchanged.
+    """
+
+    def forward(self, x):
+        with torch.autocast(device_type=x.device.type, enabled=False):
+            return super().forward(x.float())
+
+
+def build_model(device, trainable_blocks=0, channels_last=False):
+    model = models.efficientnet_b3(pretrained=True)
+    for param in model.features.parameters():
+        param.requires_grad = False  # Freeze base layers
+    for param in model.features[len(model.features) - trainable_blocks:].parameters():
+        param.requires_grad = True  # Unfreeze the last `trainable_blocks` blocks
+
+    # Replace classifier (fp32 even under bf16 autocast)
+    model.classifier = Float32Head(
+        nn.Dropout(0.4),
+        nn.Linear(model.classifier[1].in_features, 1),
+        nn.Sigmoid()
+    )
+    model = model.to(device)
+    if channels_last:
+        model = model.to(memory_format=torch.channels_last)
+    return model
 
 # -------------------------------
-# 5. Training Loop with Progress Bar
+# 5. Training / Evaluation Steps
 # -------------------------------
-EPOCHS = 25
-best_val_loss = float("inf")
-
-for epoch in range(EPOCHS):
-    # Training
-    model.train()
-    train_loss = 0
-    correct = 0
-    total = 0
-    train_bar = tqdm(train_loader, desc=f"Epoch {epoch+1}/{EPOCHS} [Train]", leave=False)
-    
-    for images, labels in train_bar:
-        images, labels = images.to(device), labels.float().to(device).unsqueeze(1)
-        optimizer.zero_grad()
-        outputs = model(images)
-        loss = criterion(outputs, labels)
-        loss.backward()
+# Per-epoch sums; summarise() turns them into loss / accuracy / F1
+COUNT_KEYS = ("loss", "correct", "total", "tp", "fp", "fn")
+
+
+def batch_to_device(images, labels, device, channels_last=False):
+    images = images.to(device, non_blocking=True)
+    if channels_last and images.dim() == 4:  # image batches only, not cached embeddings
+        images = images.contiguous(memory_format=torch.channels_last)
+    return images, labels.float().to(device, non_blocking=True).unsqueeze(1)
+
+
+def _count(counts, loss, outputs, labels):
+    preds = (outputs.float() > 0.5).float()
+    counts["loss"] += loss.item() * labels.size(0)
+    counts["correct"] += (preds == labels).sum().item()
+    counts["total"] += labels.size(0)
+    counts["tp"] += (preds * labels).sum().item()
+    counts["fp"] += (preds * (1 - labels)).sum().item()
+    counts["fn"] += ((1 - preds) * labels).sum().item()
+
+
+def summarise(counts):
+    """Mean loss, accuracy and F1 (Sensitive = positive class) from summed counts."""
+    total = max(counts["total"], 1)
+    f1_denominator = 2 * counts["tp"] + counts["fp"] + counts["fn"]
+    return {
+        "loss": counts["loss"] / total,
+        "acc": counts["correct"] / total,
+        "f1": 2 * counts["tp"] / f1_denominator if f1_denominator else 0.0,
+    }
+
+
+def train_epoch(forward, loader, criterion, optimizer, device, augment=None, precision="fp32",
+                channels_last=False, accum_steps=1, timer=None, desc="Train", progress=True, no_sync=None):
+    """
+    One training epoch (call model.train() first). Returns the summed counts.
+    `no_sync` (DistributedDataParallel.no_sync) skips the gradient all-reduce
+    on every micro-batch but the last of each accumulation window.
+    Each window's gradient is the mean over its micro-batches, including the
+    last window of the epoch when fewer than `accum_steps` batches are left.
+    """
+    counts = dict.fromkeys(COUNT_KEYS, 0.0)
+    bar = tqdm(loader, desc=desc, leave=False, disable=not progress)
+    optimizer.zero_grad()
+    pending = 0
+    window = accum_steps
+    last_step = len(loader) - 1
+    for step, (images, labels) in enumerate(timer.iterate(bar) if timer else bar):
+        images, labels = batch_to_device(images, labels, device, channels_last)
+        if augment is not None:
+            images = augment(images)
+        if pending == 0:
+            window = max(1, min(accum_steps, last_step - step + 1))
+        pending += 1
+        window_end = pending == window
+        with nullcontext() if no_sync is None or window_end else no_sync():
+            with autocast(device, precision):
+                outputs = forward(images)
+            loss = criterion(outputs.float(), labels)  # BCE in fp32 (autocast-unsafe)
+            (loss / window).backward()
+        if window_end:
+            optimizer.step()
+            optimizer.zero_grad()
+            pending = 0
+
+        _count(counts, loss, outputs, labels)
+        bar.set_postfix(loss=counts["loss"] / counts["total"], acc=counts["correct"] / counts["total"])
+
+    if pending:  # the loader yielded fewer batches than len(loader) reported
         optimizer.step()
+        optimizer.zero_grad()
+    return counts
 
-        train_loss += loss.item() * images.size(0)
-        preds = (outputs > 0.5).float()
-        correct += (preds == labels).sum().item()
-        total += labels.size(0)
-
-        train_bar.set_postfix(loss=train_loss/total, acc=correct/total)
-
-    train_acc = correct / total
-    train_loss /= total
 
-    # Validation
-    model.eval()
-    val_loss = 0
-    correct = 0
-    total = 0
-    val_bar = tqdm(val_loader, desc=f"Epoch {epoch+1}/{EPOCHS} [Val]  ", leave=False)
+def evaluate(forward, loader, criterion, device, precision="fp32", channels_last=False, desc="Val", progress=True):
+    """One pass without gradients (call model.eval() first). Returns the summed counts."""
+    counts = dict.fromkeys(COUNT_KEYS, 0.0)
+    bar = tqdm(loader, desc=desc, leave=False, disable=not progress)
     with torch.no_grad():
-        for images, labels in val_bar:
-            images, labels = images.to(device), labels.float().to(device).unsqueeze(1)
-            outputs = model(images)
-            loss = criterion(outputs, labels)
-
-            val_loss += loss.item() * images.size(0)
-            preds = (outputs > 0.5).float()
-            correct += (preds == labels).sum().item()
-            total += labels.size(0)
-
-            val_bar.set_postfix(loss=val_loss/total, acc=correct/total)
-
-    val_acc = correct / total
-    val_loss /= total
-
-    print(f"Epoch {epoch+1}/{EPOCHS}: Train Loss {train_loss:.4f}, Train Acc {train_acc:.4f}, Val Loss {val_loss:.4f}, Val Acc {val_acc:.4f}")
-
-    # Save best model
-    if val_loss < best_val_loss:
-        torch.save(model.state_dict(), "efficientnetb3_best.pth")
-        best_val_loss = val_loss
-
-# -------------------------------
-# 6. Test Evaluation
-# -------------------------------
-model.load_state_dict(torch.load("efficientnetb3_best.pth"))
-model.eval()
-correct = 0
-total = 0
-with torch.no_grad():
-    for images, labels in test_loader:
-        images, labels = images.to(device), labels.float().to(device).unsqueeze(1)
-        outputs = model(images)
-        preds = (outputs > 0.5).float()
-        correct += (preds == labels).sum().item()
-        total += labels.size(0)
-test_acc = correct / total
-print(f"✅ Test Accuracy: {test_acc:.4f}")
-
+        for images, labels in bar:
+            images, labels = batch_to_device(images, labels, device, channels_last)
+            with autocast(device, precision):
+                outputs = forward(images)
+            loss = criterion(outputs.float(), labels)
+
+            _count(counts, loss, outputs, labels)
+            bar.set_postfix(loss=counts["loss"] / counts["total"], acc=counts["correct"] / counts["total"])
+    return counts
+
+
+if __name__ == "__main__":
+    organize_dataset()
+    train_dataset, val_dataset, test_dataset = build_datasets()
+
+    # Class balancing: each batch draws both classes equally often
+    labels = [label for _, label in train_dataset.samples]
+    train_sampler = balanced_sampler(labels)
+    print("⚖ Class counts:", {name: labels.count(index) for name, index in LABELS_MAP.items()})
+
+    # DataLoaders: workers / prefetch auto-tuned from the core count (NUM_WORKERS,
+    # PREFETCH_FACTOR override), pinned memory on CUDA
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    LOADER_SETTINGS = loader_settings(device)
+    print("🧵 DataLoader settings:", LOADER_SETTINGS)
+
+    train_loader = DataLoader(train_dataset, batch_size=BATCH_SIZE, sampler=train_sampler, **LOADER_SETTINGS)
+    val_loader = DataLoader(val_dataset, batch_size=BATCH_SIZE, **LOADER_SETTINGS)
+    test_loader = DataLoader(test_dataset, batch_size=BATCH_SIZE, **LOADER_SETTINGS)
+
+    precision = resolve_precision(device, PRECISION)
+    if TRAINABLE_BLOCKS and TRAINING_MODE == "cached_embeddings":
+        raise ValueError("TRAINABLE_BLOCKS needs TRAINING_MODE = 'full': cached embeddings freeze the backbone.")
+    model = build_model(device, TRAINABLE_BLOCKS, CHANNELS_LAST)
+    print(f"🧮 Precision {precision}, channels_last {CHANNELS_LAST}, gradient accumulation {GRAD_ACCUM_STEPS}")
+
+    # Loss, optimizer, LR schedule and early stopping (on the same validation metric)
+    criterion = nn.BCELoss()
+    optimizer = optim.Adam([param for param in model.parameters() if param.requires_grad], lr=1e-4)
+    early_stopping = EarlyStopping(EARLY_STOPPING_METRIC, PATIENCE)
+    scheduler = optim.lr_scheduler.ReduceLROnPlateau(optimizer, mode=early_stopping.mode, factor=LR_FACTOR,
+                                                     patience=LR_PATIENCE)
+
+    # Cached mode: the frozen backbone runs once per augmented view, epochs only train the head
+    forward = model
+    augment = train_augment
+    if TRAINING_MODE == "cached_embeddings":
+        train_cache = build_embedding_cache(model, train_dataset, os.path.join(EMBEDDING_CACHE_DIR, "train"),
+                                            views=EMBEDDING_VIEWS, batch_size=BATCH_SIZE, device=device,
+                                            num_workers=LOADER_SETTINGS["num_workers"], augment=train_augment)
+        val_cache = build_embedding_cache(model, val_dataset, os.path.join(EMBEDDING_CACHE_DIR, "val"),
+                                          views=1, batch_size=BATCH_SIZE, device=device,
+                                          num_workers=LOADER_SETTINGS["num_workers"])
+        # Cached rows are tiny: loading in-process beats worker IPC
+        train_loader = DataLoader(CachedEmbeddingDataset(train_cache), batch_size=EMBEDDING_BATCH_SIZE,
+                                  sampler=train_sampler, pin_memory=LOADER_SETTINGS["pin_memory"])
+        val_loader = DataLoader(CachedEmbeddingDataset(val_cache), batch_size=EMBEDDING_BATCH_SIZE,
+                                pin_memory=LOADER_SETTINGS["pin_memory"])
+        forward = model.classifier
+        augment = None  # embeddings are already augmented views
+
+    # -------------------------------
+    # 6. Training Loop with Progress Bar
+    # -------------------------------
+    # A checkpoint only resumes the run that wrote it, on the same data: new
+    # images change the fingerprint, so a finished run is not "resumed" past its last epoch
+    run_config = {"training_mode": TRAINING_MODE, "trainable_blocks": TRAINABLE_BLOCKS, "precision": precision,
+                  "channels_last": CHANNELS_LAST, "metric": EARLY_STOPPING_METRIC,
+                  "data": manifest_fingerprint(MANIFEST_PATH)}
+    start_epoch = 0
+    if RESUME:
+        start_epoch = load_checkpoint(CHECKPOINT_PATH, model, optimizer, scheduler, early_stopping, run_config,
+                                      map_location=device)
+    train_timer = EpochTimer(device)
+
+    for epoch in range(start_epoch, EPOCHS):
+        if early_stopping.should_stop:
+            print(f"⏹ Early stopping: no better val {EARLY_STOPPING_METRIC} for {PATIENCE} epochs "
+                  f"(best {early_stopping.best:.4f})")
+            break
+
+        model.train()
+        train = summarise(train_epoch(forward, train_loader, criterion, optimizer, device, augment, precision,
+                                      CHANNELS_LAST, GRAD_ACCUM_STEPS, train_timer,
+                                      desc=f"Epoch {epoch+1}/{EPOCHS} [Train]"))
+        model.eval()
+        val = summarise(evaluate(forward, val_loader, criterion, device, precision, CHANNELS_LAST,
+                                 desc=f"Epoch {epoch+1}/{EPOCHS} [Val]  "))
+
+        print(f"Epoch {epoch+1}/{EPOCHS}: Train Loss {train['loss']:.4f}, Train Acc {train['acc']:.4f}, "
+              f"Val Loss {val['loss']:.4f}, Val Acc {val['acc']:.4f}, Val F1 {val['f1']:.4f}")
+        print(f"   ⏱ Train input pipeline: {train_timer.summary()}, LR {optimizer.param_groups[0]['lr']:.1e}")
+
+        # Save best model (always the full model, backbone included)
+        if early_stopping.step(val):
+            torch.save(model.state_dict(), BEST_MODEL_PATH)
+        scheduler.step(val[EARLY_STOPPING_METRIC])
+        save_checkpoint(CHECKPOINT_PATH, model, optimizer, scheduler, early_stopping, epoch, run_config)
+
+    # -------------------------------
+    # 7. Test Evaluation
+    # -------------------------------
+    # A run resumed past its last epoch (or on another machine) may have no best weights here
+    if os.path.exists(BEST_MODEL_PATH):
+        model.load_state_dict(torch.load(BEST_MODEL_PATH, map_location=device))
+    else:
+        print(f"⚠ {BEST_MODEL_PATH} not found; testing the current weights.")
+    model.eval()
+    test = summarise(evaluate(model, test_loader, criterion, device, precision, CHANNELS_LAST, desc="Test"))
+    print(f"✅ Test Accuracy: {test['acc']:.4f}, Test F1: {test['f1']:.4f}")
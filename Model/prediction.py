@@ -3,11 +3,15 @@ from torchvision import transforms, models
 from PIL import Image
 import torch.nn as nn
 import cv2
-import re
 import os
+import sys
 from paddleocr import PaddleOCR
 import logging
 
+# Share the PII rule engine with the Flask app (App/pii_rules.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from pii_rules import default_engine as pii_engine
+
 logging.getLogger("ppocr").setLevel(logging.WARNING)
 
 # -------------------------------
@@ -44,9 +48,6 @@ transform = transforms.Compose([
 # -------------------------------
 ocr = PaddleOCR(use_angle_cls=True, lang='en')  # English OCR
 
-# Regex patterns
-aadhaar_pattern = r"\d{4}\s?\d{4}\s?\d{4}"
-pan_pattern = r"[A-Z]{5}[0-9]{4}[A-Z]"
 
 # -------------------------------
 # 4. Redaction function using PaddleOCR
@@ -68,25 +69,11 @@ def redact_sensitive_info(image_path):
         if conf < 0.4:  # Ignore low-confidence results
             continue
 
-        clean_text = text.replace(" ", "").upper()
-
-        # ----- Check for PAN -----
-        if re.fullmatch(pan_pattern, clean_text):
-            sensitive_found = True
-            print(f"--> Blurring PAN: {text}")
-            pts = [(int(x), int(y)) for x, y in bbox]
-            x_min, y_min = int(min([p[0] for p in pts])), int(min([p[1] for p in pts]))
-            x_max, y_max = int(max([p[0] for p in pts])), int(max([p[1] for p in pts]))
-            roi = img[y_min:y_max, x_min:x_max]
-            if roi.size > 0:
-                k = max(23, (x_max - x_min) // 2 | 1, (y_max - y_min) // 2 | 1)
-                img[y_min:y_max, x_min:x_max] = cv2.GaussianBlur(roi, (k, k), 30)
-
-        # ----- Check for Aadhaar -----
-        aadhaar_clean = text.replace(" ", "")
-        if re.fullmatch(aadhaar_pattern, aadhaar_clean):
+        # ----- Check all PII rules in one pass -----
+        matches = pii_engine.scan(text, strict=False)
+        if matches:
             sensitive_found = True
-            print(f"--> Blurring Aadhaar: {text}")
+            print(f"--> Blurring {matches[0].rule}: {text}")
             pts = [(int(x), int(y)) for x, y in bbox]
             x_min, y_min = int(min([p[0] for p in pts])), int(min([p[1] for p in pts]))
             x_max, y_max = int(max([p[0] for p in pts])), int(max([p[1] for p in pts]))
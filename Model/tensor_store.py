@@ -0,0 +1,118 @@
+"""
+Pre-resized, memory-mapped uint8 image store for training.
+
+Decoding a full-size JPEG and resizing it to 300x300 on every access, every
+epoch, starves training. build_tensor_store() does it once per image: all
+images of a split go into one uint8 shard (samples x H x W x 3, raw bytes)
+next to an index.json that maps each sample to its byte offset, label and
+source path. TensorStoreDataset returns zero-copy CHW uint8 views of the
+shard, so augmentations run on small arrays and only the final
+ConvertImageDtype allocates.
+
+index.json also holds a fingerprint of the source images (path, size, mtime,
+label) and the image size; the store is rebuilt when it changes.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+from PIL import Image
+from torch.utils.data import Dataset
+from tqdm import tqdm
+
+SHARD_NAME = "shard.u8"
+INDEX_NAME = "index.json"
+
+
+def _fingerprint(samples: list, image_size: int) -> str:
+    digest = hashlib.sha256(f"size={image_size}\n".encode())
+    for path, label in samples:
+        stat = os.stat(path)
+        digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{label}\n".encode())
+    return digest.hexdigest()
+
+
+def build_tensor_store(samples: list, store_dir: str, image_size: int = 300, workers: int = None) -> str:
+    """
+    Decodes and resizes every (path, label) sample once into store_dir (same
+    bilinear resize as transforms.Resize on PIL images). Returns store_dir.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    index_path = os.path.join(store_dir, INDEX_NAME)
+    fingerprint = _fingerprint(samples, image_size)
+
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            if json.load(f).get("fingerprint") == fingerprint:
+                print(f"✅ Reusing tensor store in {store_dir}")
+                return store_dir
+        os.remove(index_path)  # stale: invalidate before rewriting the shard
+
+    shape = (len(samples), image_size, image_size, 3)
+    shard = np.memmap(os.path.join(store_dir, SHARD_NAME), dtype=np.uint8, mode="w+", shape=shape)
+    sample_bytes = image_size * image_size * 3
+
+    def load(i):
+        with Image.open(samples[i][0]) as image:
+            shard[i] = np.asarray(image.convert("RGB").resize((image_size, image_size), Image.BILINEAR))
+
+    # PIL decodes/resizes outside the GIL, so threads scale
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        list(tqdm(pool.map(load, range(len(samples))), total=len(samples), desc="Building tensor store", leave=False))
+    shard.flush()
+    del shard
+
+    index = {
+        "fingerprint": fingerprint,
+        "image_size": image_size,
+        "samples": [
+            {"path": path, "label": label, "offset": i * sample_bytes}
+            for i, (path, label) in enumerate(samples)
+        ],
+    }
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    print(f"✅ Stored {len(samples)} images ({os.path.getsize(os.path.join(store_dir, SHARD_NAME)) / 2**20:.0f} MB) in {store_dir}")
+    return store_dir
+
+
+class TensorStoreDataset(Dataset):
+    """
+    Reads (CHW uint8 tensor, label) samples from a tensor store. Transforms get
+    the uint8 tensor, so they must be tensor transforms ending in
+    transforms.ConvertImageDtype(torch.float) instead of ToTensor().
+    """
+
+    def __init__(self, store_dir: str, transform=None):
+        with open(os.path.join(store_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        size = index["image_size"]
+        self.samples = [(entry["path"], entry["label"]) for entry in index["samples"]]
+        self.offsets = [entry["offset"] for entry in index["samples"]]
+        self.shard_path = os.path.join(store_dir, SHARD_NAME)
+        self.shard = None  # mapped lazily, once per DataLoader worker process
+        self.sample_shape = (size, size, 3)
+        self.transform = transform
+
+    def __getstate__(self):
+        # A memmap would be pickled as a full in-memory copy (spawned workers)
+        state = self.__dict__.copy()
+        state["shard"] = None
+        return state
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getitem__(self, idx):
+        if self.shard is None:
+            # Copy-on-write mapping: writable views for torch.from_numpy, never written back
+            self.shard = np.memmap(self.shard_path, dtype=np.uint8, mode="c")
+        offset = self.offsets[idx]
+        view = self.shard[offset:offset + int(np.prod(self.sample_shape))].reshape(self.sample_shape)
+        image = torch.from_numpy(view).permute(2, 0, 1)  # HWC -> CHW, no copy
+        if self.transform:
+            image = self.transform(image)
+        return image, self.samples[idx][1]
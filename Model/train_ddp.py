@@ -0,0 +1,214 @@
+"""
+Distributed data-parallel fine-tuning of EfficientNet-B3 on CPU processes
+(gloo backend), on one machine or several.
+
+Rendezvous is env:// (MASTER_ADDR, MASTER_PORT, RANK, WORLD_SIZE, plus
+LOCAL_RANK / LOCAL_WORLD_SIZE), so it runs under torchrun as is:
+
+    torchrun --nnodes 2 --nproc-per-node 4 --node-rank 0 --master-addr 10.0.0.1 --master-port 29500 Model/train_ddp.py
+
+Without RANK in the environment it launches --nproc local processes itself
+(handy for a quick test on one box):
+
+    python Model/train_ddp.py --nproc 4 --epochs 1 --limit 512
+
+Each rank trains on its own share of the class-balanced epoch
+(DistributedBalancedSampler) and validates on a strided shard of the val
+split; metric sums are all-reduced so every rank sees the global loss / F1.
+Rank 0 prepares the manifest and tensor store first (the other ranks wait at
+a barrier and reuse them; nodes must see the data at the same paths) and is
+the only one writing checkpoints.
+
+Early stopping, the LR schedule and resuming work as in model.py. Rank 0
+reads the checkpoint and broadcasts it (its optimizer state included), and
+broadcasts the best weights for the test pass, so checkpoint paths need not
+be shared between nodes. The per-rank augmentation RNG is re-seeded from
+(seed, epoch, rank) each epoch, so a resumed run does not need every rank's
+RNG state. With --accum-steps, gradients are only all-reduced on the last
+micro-batch of each accumulation window.
+"""
+import argparse
+import os
+import socket
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.nn as nn
+import torch.optim as optim
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, Subset
+
+from manifest import manifest_fingerprint
+from model import (BATCH_SIZE, COUNT_KEYS, MANIFEST_PATH, organize_dataset, build_datasets, build_model,
+                   train_epoch, evaluate, summarise, train_augment)
+from training_utils import (loader_settings, resolve_precision, DistributedBalancedSampler, EpochTimer,
+                            EarlyStopping, save_checkpoint, read_checkpoint, restore_checkpoint)
+
+CHECKPOINT_PATH = "efficientnetb3_ddp_checkpoint.pth"
+BEST_MODEL_PATH = "efficientnetb3_ddp_best.pth"
+
+
+def all_reduce_counts(counts: dict) -> dict:
+    """Sums the per-rank metric counts over all ranks."""
+    totals = torch.tensor([counts[key] for key in COUNT_KEYS], dtype=torch.float64)
+    dist.all_reduce(totals, op=dist.ReduceOp.SUM)
+    return dict(zip(COUNT_KEYS, totals.tolist()))
+
+
+def broadcast_object(obj, is_main: bool):
+    """Rank 0's `obj` on every rank (pickled; the other ranks pass None)."""
+    objects = [obj if is_main else None]
+    dist.broadcast_object_list(objects, src=0)
+    return objects[0]
+
+
+def shard(dataset, rank: int, world_size: int):
+    """Strided, non-overlapping shard (unlike DistributedSampler, no padded duplicates in the metrics)."""
+    return Subset(dataset, range(rank, len(dataset), world_size))
+
+
+def train(args):
+    rank = int(os.environ["RANK"])
+    local_rank = int(os.environ.get("LOCAL_RANK", rank))
+    world_size = int(os.environ["WORLD_SIZE"])
+    local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE", world_size))
+    is_main = rank == 0
+
+    # Split the node's cores between its ranks (compute threads + loader workers)
+    cores = max(1, (os.cpu_count() or 1) // local_world_size)
+    torch.set_num_threads(max(1, cores - args.workers))
+    dist.init_process_group(backend="gloo", init_method="env://")
+    device = torch.device("cpu")
+
+    if is_main:
+        organize_dataset()
+        build_datasets()
+    if local_rank == 0:
+        build_model(device)  # download the pretrained weights once per node
+    dist.barrier()
+    train_dataset, val_dataset, test_dataset = build_datasets()
+    indices = range(min(args.limit, len(train_dataset))) if args.limit else range(len(train_dataset))
+    train_labels = [train_dataset.samples[i][1] for i in indices]
+    train_dataset = Subset(train_dataset, indices)
+
+    settings = loader_settings(device, num_workers=args.workers)
+    sampler = DistributedBalancedSampler(train_labels, world_size, rank, seed=args.seed)
+    train_loader = DataLoader(train_dataset, batch_size=args.batch_size, sampler=sampler, **settings)
+    val_loader = DataLoader(shard(val_dataset, rank, world_size), batch_size=args.batch_size, **settings)
+    test_loader = DataLoader(shard(test_dataset, rank, world_size), batch_size=args.batch_size, **settings)
+
+    # Same initial weights everywhere (DDP also broadcasts rank 0's parameters)
+    torch.manual_seed(args.seed)
+    precision = resolve_precision(device, args.precision)
+    model = build_model(device, args.trainable_blocks, args.channels_last)
+    criterion = nn.BCELoss()
+    optimizer = optim.Adam([param for param in model.parameters() if param.requires_grad], lr=args.lr)
+    early_stopping = EarlyStopping(args.metric, args.patience)
+    scheduler = optim.lr_scheduler.ReduceLROnPlateau(optimizer, mode=early_stopping.mode, factor=args.lr_factor,
+                                                     patience=args.lr_patience)
+    run_config = {"world_size": world_size, "trainable_blocks": args.trainable_blocks, "precision": precision,
+                  "channels_last": args.channels_last, "metric": args.metric,
+                  "data": manifest_fingerprint(MANIFEST_PATH), "limit": args.limit}
+    start_epoch = 0
+    if args.resume:
+        # Only rank 0 writes the checkpoint, so only rank 0 can be expected to read it
+        state = broadcast_object(read_checkpoint(CHECKPOINT_PATH, run_config) if is_main else None, is_main)
+        if state is not None:
+            start_epoch = restore_checkpoint(state, model, optimizer, scheduler, early_stopping, restore_rng=False,
+                                             verbose=is_main)
+        del state
+    ddp_model = DistributedDataParallel(model)
+    timer = EpochTimer(device)
+
+    if is_main:
+        print(f"🌐 {world_size} ranks, {torch.get_num_threads()} threads + {args.workers} loader workers per rank, "
+              f"{len(train_labels)} train images, precision {precision}")
+
+    for epoch in range(start_epoch, args.epochs):
+        # Every rank reaches the same decision: metrics are all-reduced
+        if early_stopping.should_stop:
+            if is_main:
+                print(f"⏹ Early stopping: no better val {args.metric} for {args.patience} epochs "
+                      f"(best {early_stopping.best:.4f})")
+            break
+
+        torch.manual_seed(args.seed + epoch * world_size + rank)
+        sampler.set_epoch(epoch)
+        ddp_model.train()
+        train_metrics = summarise(all_reduce_counts(train_epoch(
+            ddp_model, train_loader, criterion, optimizer, device, train_augment, precision, args.channels_last,
+            args.accum_steps, timer, desc=f"Epoch {epoch+1}/{args.epochs} [Train]", progress=is_main,
+            no_sync=ddp_model.no_sync)))
+        ddp_model.eval()
+        val = summarise(all_reduce_counts(evaluate(
+            ddp_model, val_loader, criterion, device, precision, args.channels_last,
+            desc=f"Epoch {epoch+1}/{args.epochs} [Val]  ", progress=is_main)))
+
+        if is_main:
+            print(f"Epoch {epoch+1}/{args.epochs}: Train Loss {train_metrics['loss']:.4f}, "
+                  f"Train Acc {train_metrics['acc']:.4f}, Val Loss {val['loss']:.4f}, Val Acc {val['acc']:.4f}, "
+                  f"Val F1 {val['f1']:.4f}")
+            print(f"   ⏱ Rank 0 input pipeline: {timer.summary()}, LR {optimizer.param_groups[0]['lr']:.1e}")
+
+        improved = early_stopping.step(val)
+        scheduler.step(val[args.metric])
+        if is_main:
+            if improved:
+                torch.save(model.state_dict(), BEST_MODEL_PATH)
+            save_checkpoint(CHECKPOINT_PATH, model, optimizer, scheduler, early_stopping, epoch, run_config)
+
+    # A run resumed past its last epoch on a fresh node has no best weights: test the current ones
+    has_best = is_main and os.path.exists(BEST_MODEL_PATH)
+    best = broadcast_object(torch.load(BEST_MODEL_PATH, map_location=device) if has_best else None, is_main)
+    if best is not None:
+        model.load_state_dict(best)
+    elif is_main:
+        print(f"⚠ {BEST_MODEL_PATH} not found; testing the current weights.")
+    ddp_model.eval()
+    test = summarise(all_reduce_counts(evaluate(ddp_model, test_loader, criterion, device, precision,
+                                                args.channels_last, desc="Test", progress=is_main)))
+    if is_main:
+        print(f"✅ Test Accuracy: {test['acc']:.4f}, Test F1: {test['f1']:.4f}")
+    dist.destroy_process_group()
+
+
+def _local_worker(local_rank: int, nproc: int, port: int, args):
+    os.environ.update({
+        "MASTER_ADDR": "127.0.0.1", "MASTER_PORT": str(port),
+        "RANK": str(local_rank), "WORLD_SIZE": str(nproc),
+        "LOCAL_RANK": str(local_rank), "LOCAL_WORLD_SIZE": str(nproc),
+    })
+    train(args)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DDP (gloo) training of the document classifier.")
+    parser.add_argument("--nproc", type=int, default=2, help="local processes when not launched by torchrun")
+    parser.add_argument("--epochs", type=int, default=25, help="maximum; early stopping may end sooner")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="per rank")
+    parser.add_argument("--lr", type=float, default=1e-4)
+    parser.add_argument("--lr-factor", type=float, default=0.5, help="LR multiplier on a plateau")
+    parser.add_argument("--lr-patience", type=int, default=2)
+    parser.add_argument("--metric", default="loss", choices=["loss", "f1"], help="early-stopping / LR metric")
+    parser.add_argument("--patience", type=int, default=5)
+    parser.add_argument("--no-resume", dest="resume", action="store_false", help="ignore an existing checkpoint")
+    parser.add_argument("--trainable-blocks", type=int, default=9, help="last EfficientNet blocks to fine-tune (9 = all)")
+    parser.add_argument("--precision", default="fp32", choices=["fp32", "bf16"])
+    parser.add_argument("--channels-last", action="store_true")
+    parser.add_argument("--accum-steps", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=2, help="DataLoader workers per rank")
+    parser.add_argument("--limit", type=int, default=0, help="train on the first N images only (smoke tests)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if "RANK" in os.environ:
+        train(args)
+    else:
+        mp.spawn(_local_worker, args=(args.nproc, _free_port(), args), nprocs=args.nproc)
@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import random
+import logging
+import cv2
+import torch
+from torch.utils.data import Dataset, DataLoader
+from tqdm import tqdm
+
+# Detector architecture, PII rules and layout resolution are shared with the Flask app
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from field_detector import FIELD_CLASSES, build_detector
+from pii_rules import default_engine as pii_engine
+from layout import find_labelled_values
+
+logging.getLogger("ppocr").setLevel(logging.WARNING)
+
+# -------------------------------
+# 1. Paths & Settings
+# -------------------------------
+BASE_DIR = r"D:\5th sem\Deep Learning\Project\Data"
+SENSITIVE_DIR = os.path.join(BASE_DIR, "Sensitive")
+
+# Boxes harvested automatically (PaddleOCR + rules + QR/face detectors)
+HARVESTED_ANNOTATIONS = os.path.join(BASE_DIR, "field_boxes_harvested.json")
+# Hand-labelled boxes/crops in the same format; merged over harvested ones
+LABELLED_ANNOTATIONS = os.path.join(BASE_DIR, "field_boxes_labelled.json")
+
+DETECTOR_WEIGHTS = "field_detector_best.pth"
+EPOCHS = 20
+BATCH_SIZE = 4
+VAL_FRACTION = 0.15
+OCR_MIN_CONFIDENCE = 0.4
+
+# PII rule / layout field -> detector class
+RULE_TO_FIELD = {"aadhaar": "aadhaar_number", "vid": "aadhaar_number", "pan": "pan", "dob": "dob"}
+LAYOUT_TO_FIELD = {"name": "name", "father": "name", "dob": "dob"}
+
+# Annotation file format:
+# {"images": [{"path": "...", "boxes": [[x0, y0, x1, y1], ...], "labels": ["pan", ...]}]}
+# A labelled crop of a single field may omit "boxes" and give one label; the
+# whole crop is then used as the box.
+
+
+# -------------------------------
+# 2. Box Harvesting (PaddleOCR + regex/layout + QR/face)
+# -------------------------------
+def _bounds(points):
+    xs = [float(x) for x, _ in points]
+    ys = [float(y) for _, y in points]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def harvest_boxes(image_dir: str, output_path: str) -> None:
+    """Runs the OCR redaction logic over a folder and stores the boxes it would redact."""
+    from paddleocr import PaddleOCR
+
+    ocr = PaddleOCR(use_angle_cls=True, lang='en')
+    qr_detector = cv2.QRCodeDetector()
+    face_detector = cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml"))
+
+    image_paths = []
+    for root, _, files in os.walk(image_dir):
+        for f in files:
+            if f.lower().endswith(('.jpg', '.jpeg', '.png')):
+                image_paths.append(os.path.join(root, f))
+
+    annotations = []
+    for img_path in tqdm(image_paths, desc="Harvesting boxes"):
+        img = cv2.imread(img_path)
+        if img is None:
+            continue
+        boxes, labels = [], []
+
+        results = ocr.ocr(img_path, cls=True)
+        lines = results[0] if results and results[0] else []
+        for line in lines:
+            text, conf = line[1]
+            if conf < OCR_MIN_CONFIDENCE:
+                continue
+            for match in pii_engine.scan(text, strict=False):
+                if match.rule in RULE_TO_FIELD:
+                    boxes.append(_bounds(line[0]))
+                    labels.append(RULE_TO_FIELD[match.rule])
+                    break
+        for match in find_labelled_values(lines, OCR_MIN_CONFIDENCE, LAYOUT_TO_FIELD.keys()):
+            boxes.append(_bounds(match.points))
+            labels.append(LAYOUT_TO_FIELD[match.field])
+
+        found, qr_points = qr_detector.detect(img)
+        if found and qr_points is not None:
+            boxes.append(_bounds(qr_points.reshape(-1, 2)))
+            labels.append("qr")
+
+        # Card photos: face box grown to roughly the printed photo frame
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        for (x, y, w, h) in face_detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(40, 40)):
+            x0, y0 = max(0, x - 0.3 * w), max(0, y - 0.4 * h)
+            x1, y1 = min(img.shape[1], x + 1.3 * w), min(img.shape[0], y + 1.6 * h)
+            boxes.append([x0, y0, x1, y1])
+            labels.append("photo")
+
+        if boxes:
+            annotations.append({"path": img_path, "boxes": boxes, "labels": labels})
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"images": annotations}, f)
+    print(f"✅ Harvested boxes for {len(annotations)}/{len(image_paths)} images -> {output_path}")
+
+
+def load_annotations(*paths: str) -> list[dict]:
+    """Merges annotation files; later files override earlier entries for the same image."""
+    by_path = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for entry in json.load(f)["images"]:
+                by_path[entry["path"]] = entry
+    return list(by_path.values())
+
+
+# -------------------------------
+# 3. Dataset
+# -------------------------------
+class FieldBoxDataset(Dataset):
+    def __init__(self, entries: list[dict], train: bool = False):
+        self.entries = entries
+        self.train = train
+        self.class_index = {name: i + 1 for i, name in enumerate(FIELD_CLASSES)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, idx):
+        entry = self.entries[idx]
+        img = cv2.cvtColor(cv2.imread(entry["path"]), cv2.COLOR_BGR2RGB)
+        image = torch.from_numpy(img).permute(2, 0, 1).float().div(255.0)
+
+        # Light photometric jitter only: flips/rotations would produce unrealistic text
+        if self.train:
+            image = (image * random.uniform(0.8, 1.2) + random.uniform(-0.1, 0.1)).clamp(0, 1)
+
+        boxes = entry.get("boxes") or [[0, 0, img.shape[1], img.shape[0]]]
+        target = {
+            "boxes": torch.tensor(boxes, dtype=torch.float32).reshape(-1, 4),
+            "labels": torch.tensor([self.class_index[label] for label in entry["labels"]], dtype=torch.int64),
+        }
+        return image, target
+
+
+def collate(batch):
+    return tuple(zip(*batch))
+
+
+# -------------------------------
+# 4. Training
+# -------------------------------
+def train_detector(entries: list[dict]) -> None:
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    random.Random(42).shuffle(entries)
+    n_val = max(1, int(len(entries) * VAL_FRACTION))
+    val_entries, train_entries = entries[:n_val], entries[n_val:]
+
+    train_loader = DataLoader(FieldBoxDataset(train_entries, train=True), batch_size=BATCH_SIZE, shuffle=True, collate_fn=collate)
+    val_loader = DataLoader(FieldBoxDataset(val_entries), batch_size=BATCH_SIZE, collate_fn=collate)
+
+    model = build_detector(pretrained_backbone=True).to(device)
+    params = [p for p in model.parameters() if p.requires_grad]
+    optimizer = torch.optim.SGD(params, lr=0.01, momentum=0.9, weight_decay=1e-4)
+    scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=EPOCHS)
+
+    best_val_loss = float("inf")
+    for epoch in range(EPOCHS):
+        model.train()
+        train_loss, batches = 0.0, 0
+        for images, targets in tqdm(train_loader, desc=f"Epoch {epoch+1}/{EPOCHS} [Train]", leave=False):
+            images = [img.to(device) for img in images]
+            targets = [{k: v.to(device) for k, v in t.items()} for t in targets]
+            loss = sum(model(images, targets).values())
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            train_loss += loss.item()
+            batches += 1
+        scheduler.step()
+        train_loss /= max(1, batches)
+
+        # torchvision detectors only return losses in train mode
+        val_loss, batches = 0.0, 0
+        with torch.no_grad():
+            for images, targets in val_loader:
+                images = [img.to(device) for img in images]
+                targets = [{k: v.to(device) for k, v in t.items()} for t in targets]
+                val_loss += sum(model(images, targets).values()).item()
+                batches += 1
+        val_loss /= max(1, batches)
+
+        print(f"Epoch {epoch+1}/{EPOCHS}: Train Loss {train_loss:.4f}, Val Loss {val_loss:.4f}")
+        if val_loss < best_val_loss:
+            torch.save(model.state_dict(), DETECTOR_WEIGHTS)
+            best_val_loss = val_loss
+
+    print(f"✅ Best detector weights saved to {DETECTOR_WEIGHTS} (Val Loss {best_val_loss:.4f})")
+
+
+if __name__ == "__main__":
+    if not os.path.exists(HARVESTED_ANNOTATIONS):
+        harvest_boxes(SENSITIVE_DIR, HARVESTED_ANNOTATIONS)
+
+    entries = load_annotations(HARVESTED_ANNOTATIONS, LABELLED_ANNOTATIONS)
+    if not entries:
+        sys.exit("🛑 No annotated images found. Check the annotation paths.")
+    train_detector(entries)
@@ -0,0 +1,258 @@
+"""
+Helpers for the training scripts: DataLoader settings tuned from the core
+count, a class-balancing sampler, bfloat16 autocast, a per-epoch report of
+time spent waiting on data vs computing (so input-pipeline stalls are
+visible), early stopping, and resumable checkpoints.
+"""
+import math
+import os
+import random
+import time
+
+import numpy as np
+import torch
+from torch.utils.data import Sampler, WeightedRandomSampler
+
+# Overrides for the auto-tuned values (e.g. NUM_WORKERS=0 to debug in-process)
+MAX_AUTO_WORKERS = 8
+
+
+def loader_settings(device: torch.device, num_workers: int = None, prefetch_factor: int = None) -> dict:
+    """
+    DataLoader keyword arguments: one worker per core (leaving one for the
+    training loop, at most MAX_AUTO_WORKERS), persistent workers, prefetching,
+    and pinned memory when training on CUDA. NUM_WORKERS / PREFETCH_FACTOR
+    environment variables take precedence over the arguments.
+    """
+    if os.environ.get("NUM_WORKERS"):
+        num_workers = int(os.environ["NUM_WORKERS"])
+    if os.environ.get("PREFETCH_FACTOR"):
+        prefetch_factor = int(os.environ["PREFETCH_FACTOR"])
+    if num_workers is None:
+        num_workers = min(MAX_AUTO_WORKERS, max(0, (os.cpu_count() or 1) - 1))
+
+    settings = {"num_workers": num_workers, "pin_memory": device.type == "cuda"}
+    if num_workers > 0:
+        settings["persistent_workers"] = True
+        settings["prefetch_factor"] = prefetch_factor or 4
+    return settings
+
+
+def balanced_sampler(labels: list) -> WeightedRandomSampler:
+    """
+    Samples every class equally often (with replacement, one epoch = len(labels)
+    draws), instead of duplicating minority-class files on disk.
+    """
+    labels = torch.as_tensor(labels, dtype=torch.long)
+    counts = torch.bincount(labels).float()
+    weights = (1.0 / counts)[labels]
+    return WeightedRandomSampler(weights.double(), num_samples=len(labels), replacement=True)
+
+
+class DistributedBalancedSampler(Sampler):
+    """
+    balanced_sampler() for distributed training: every rank draws the same
+    class-balanced epoch (seeded by seed + epoch) and takes its own strided
+    share of it, like DistributedSampler. Call set_epoch() before each epoch.
+    """
+
+    def __init__(self, labels: list, num_replicas: int, rank: int, seed: int = 0):
+        labels = torch.as_tensor(labels, dtype=torch.long)
+        self.weights = (1.0 / torch.bincount(labels).double())[labels]
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.seed = seed
+        self.epoch = 0
+        self.num_samples = math.ceil(len(labels) / num_replicas)
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self):
+        return self.num_samples
+
+    def __iter__(self):
+        generator = torch.Generator()
+        generator.manual_seed(self.seed + self.epoch)
+        total = self.num_samples * self.num_replicas
+        indices = torch.multinomial(self.weights, total, replacement=True, generator=generator).tolist()
+        return iter(indices[self.rank:total:self.num_replicas])
+
+
+def bf16_supported(device: torch.device) -> bool:
+    """Native bfloat16 support: AVX512-BF16 / AMX through oneDNN on CPU, Ampere+ on CUDA."""
+    if device.type == "cuda":
+        return torch.cuda.is_bf16_supported()
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def resolve_precision(device: torch.device, precision: str) -> str:
+    """"bf16" if requested and natively supported (emulated bf16 is slower than fp32), else "fp32"."""
+    if precision not in ("fp32", "bf16"):
+        raise ValueError(f"Unknown precision '{precision}' (expected 'fp32' or 'bf16').")
+    if precision == "bf16" and not bf16_supported(device):
+        print(f"⚠ No native bfloat16 support on {device.type}; training in fp32.")
+        return "fp32"
+    return precision
+
+
+def autocast(device: torch.device, precision: str):
+    """Autocast context for the forward pass; a no-op in fp32."""
+    return torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=precision == "bf16")
+
+
+class EpochTimer:
+    """
+    Wraps a batch iterator and splits the epoch's wall time into data wait
+    (blocked on the next batch) and compute (everything between batches).
+    On CUDA the device is synchronised before each wait is timed, so
+    asynchronous kernels are counted as compute.
+    """
+
+    def __init__(self, device: torch.device):
+        self.sync = device.type == "cuda"
+        self.data_time = 0.0
+        self.compute_time = 0.0
+        self.images = 0
+
+    def iterate(self, batches):
+        self.data_time = self.compute_time = 0.0
+        self.images = 0
+        iterator = iter(batches)
+        while True:
+            start = time.perf_counter()
+            try:
+                batch = next(iterator)
+            except StopIteration:
+                break
+            fetched = time.perf_counter()
+            self.data_time += fetched - start
+
+            yield batch
+
+            if self.sync:
+                torch.cuda.synchronize()
+            self.compute_time += time.perf_counter() - fetched
+            self.images += len(batch[0])
+
+    def summary(self) -> str:
+        total = self.data_time + self.compute_time
+        wait_share = self.data_time / total if total else 0.0
+        return (f"data wait {self.data_time:.1f}s ({wait_share:.0%}), compute {self.compute_time:.1f}s, "
+                f"{self.images / total if total else 0.0:.1f} images/s")
+
+
+class EarlyStopping:
+    """
+    Tracks the best value of a validation metric ("loss": lower is better,
+    "f1": higher is better); should_stop turns True after `patience` epochs
+    without an improvement of more than min_delta.
+    """
+
+    def __init__(self, metric: str = "loss", patience: int = 5, min_delta: float = 0.0):
+        if metric not in ("loss", "f1"):
+            raise ValueError(f"Unknown early-stopping metric '{metric}' (expected 'loss' or 'f1').")
+        self.metric = metric
+        self.mode = "min" if metric == "loss" else "max"
+        self.patience = patience
+        self.min_delta = min_delta
+        self.best = None
+        self.bad_epochs = 0
+
+    def step(self, metrics: dict) -> bool:
+        """Records one epoch's metrics; returns True if they are the best so far."""
+        value = metrics[self.metric]
+        if self.best is None:
+            improved = True
+        elif self.mode == "min":
+            improved = value < self.best - self.min_delta
+        else:
+            improved = value > self.best + self.min_delta
+        if improved:
+            self.best = value
+            self.bad_epochs = 0
+        else:
+            self.bad_epochs += 1
+        return improved
+
+    @property
+    def should_stop(self) -> bool:
+        return self.bad_epochs >= self.patience
+
+    def state_dict(self) -> dict:
+        return {"best": self.best, "bad_epochs": self.bad_epochs}
+
+    def load_state_dict(self, state: dict) -> None:
+        self.best = state["best"]
+        self.bad_epochs = state["bad_epochs"]
+
+
+def save_checkpoint(path: str, model, optimizer, scheduler, early_stopping: EarlyStopping, epoch: int,
+                    config: dict = None) -> None:
+    """
+    Full training state after `epoch` (0-based): weights, optimizer, LR
+    scheduler, early-stopping state and RNG states. Written to a temp file and
+    renamed, so an interrupted save never leaves a corrupt checkpoint.
+    """
+    state = {
+        "epoch": epoch,
+        "config": config,
+        "model": model.state_dict(),
+        "optimizer": optimizer.state_dict(),
+        "scheduler": scheduler.state_dict(),
+        "early_stopping": early_stopping.state_dict(),
+        "rng": {
+            "torch": torch.get_rng_state(),
+            "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None,
+            "numpy": np.random.get_state(),
+            "python": random.getstate(),
+        },
+    }
+    tmp_path = path + ".tmp"
+    torch.save(state, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path: str, config: dict = None, map_location="cpu"):
+    """A save_checkpoint() state, or None if there is none or it was written with a different `config`."""
+    if not os.path.exists(path):
+        return None
+    state = torch.load(path, map_location=map_location, weights_only=False)
+    if state.get("config") != config:
+        print(f"⚠ {path} was saved with different settings ({state.get('config')}); starting from scratch.")
+        return None
+    return state
+
+
+def restore_checkpoint(state: dict, model, optimizer, scheduler, early_stopping: EarlyStopping,
+                       restore_rng: bool = True, verbose: bool = True) -> int:
+    """Restores a read_checkpoint() state and returns the epoch to continue from."""
+    model.load_state_dict(state["model"])
+    optimizer.load_state_dict(state["optimizer"])
+    scheduler.load_state_dict(state["scheduler"])
+    early_stopping.load_state_dict(state["early_stopping"])
+    if restore_rng:
+        rng = state["rng"]
+        torch.set_rng_state(rng["torch"])
+        if rng["cuda"] is not None and torch.cuda.is_available():
+            torch.cuda.set_rng_state_all(rng["cuda"])
+        np.random.set_state(rng["numpy"])
+        random.setstate(rng["python"])
+    if verbose:
+        print(f"↩ Resuming after epoch {state['epoch'] + 1}")
+    return state["epoch"] + 1
+
+
+def load_checkpoint(path: str, model, optimizer, scheduler, early_stopping: EarlyStopping, config: dict = None,
+                    restore_rng: bool = True, map_location="cpu") -> int:
+    """
+    Restores a save_checkpoint() state and returns the epoch to continue from;
+    0 if there is no checkpoint or it was written with a different `config`.
+    """
+    state = read_checkpoint(path, config, map_location)
+    if state is None:
+        return 0
+    return restore_checkpoint(state, model, optimizer, scheduler, early_stopping, restore_rng)
@@ -23,8 +23,13 @@ CLASSIFICATION_THRESHOLD = 0.5  # Threshold for converting probability to binary
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR)) 
 TEST_DATA_DIR = r"D:\5th sem\Deep Learning\Project\Data\Final_Data\test" 
+# Split manifest written by Model/model.py; preferred over TEST_DATA_DIR when present
+SPLIT_MANIFEST_PATH = r"D:\5th sem\Deep Learning\Project\Data\split_manifest.csv"
 # --- END CORRECTED PATH CALCULATION ---
 
+sys.path.append(os.path.join(os.path.dirname(SCRIPT_DIR), "Model"))
+from manifest import manifest_samples
+
 
 # --- 1. Model Loading Function ---
 
@@ -102,6 +107,15 @@ def load_test_data_from_folders(base_dir: str) -> list[tuple[str, int]]:
     return test_data
 
 
+def load_test_data_from_manifest(manifest_path: str, split: str = "test") -> list[tuple[str, int]]:
+    """
+    Reads the images of one split from the split manifest (no copied folders needed).
+    """
+    test_data = manifest_samples(manifest_path, split)
+    print(f"Found {len(test_data)} '{split}' images in manifest: {manifest_path}")
+    return test_data
+
+
 # --- 3. Prediction Function ---
 
 def make_prediction(model, image_path: str) -> float:
@@ -138,8 +152,11 @@ if __name__ == "__main__":
     if model is None:
         sys.exit("Evaluation stopped due to model loading error.")
 
-    # Load data automatically from the specified directory structure
-    TEST_DATA = load_test_data_from_folders(TEST_DATA_DIR)
+    # Load data from the split manifest, or from the test folder structure without one
+    if os.path.exists(SPLIT_MANIFEST_PATH):
+        TEST_DATA = load_test_data_from_manifest(SPLIT_MANIFEST_PATH)
+    else:
+        TEST_DATA = load_test_data_from_folders(TEST_DATA_DIR)
     
     if not TEST_DATA:
         print("🛑 WARNING: No test data found. Please ensure the directory is correct and contains 'sensitive' and 'non_sensitive' subfolders.")
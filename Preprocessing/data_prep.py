@@ -1,5 +1,7 @@
+import json
 import os
-from pdf2image import convert_from_path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pdf2image import convert_from_path, pdfinfo_from_path
 
 # ---------------------- USER CONFIG ----------------------
 # Root folder containing non-sensitive PDFs
@@ -10,26 +12,127 @@ output_dir = r"D:\5th sem\Deep Learning\Project\Data\Non_sensitive_Images"
 
 # Path to Poppler 'bin' folder
 poppler_path = r"C:\Users\Ajai\Downloads\Release-25.07.0-0\poppler-25.07.0\Library\bin"  # <-- change this path if needed
+
+# Rasterisation settings
+dpi = 200
+image_format = "jpg"       # "jpg" or "png"
+jpeg_quality = 90
+pages_per_chunk = 8        # pages rasterised per convert_from_path call (bounds memory per PDF)
+workers = os.cpu_count()   # PDFs converted in parallel
+
+# Records converted PDFs (keyed by path, mtime, size and the settings above) so
+# re-runs skip them; entries and images of deleted PDFs are pruned
+manifest_path = os.path.join(output_dir, "conversion_manifest.json")
 # ---------------------------------------------------------
 
-# Walk through all subfolders
-for root, dirs, files in os.walk(non_sensitive_dir):
-    # Compute relative path to maintain folder structure
-    rel_path = os.path.relpath(root, non_sensitive_dir)
+
+def page_image_paths(pdf_path, page_count):
+    """Output image paths of a PDF, mirroring its folder structure under output_dir."""
+    rel_path = os.path.relpath(os.path.dirname(pdf_path), non_sensitive_dir)
     save_path = os.path.join(output_dir, rel_path)
-    os.makedirs(save_path, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    return [os.path.join(save_path, f"{stem}_page{i + 1}.{image_format}") for i in range(page_count)]
+
+
+def convert_pdf(pdf_path):
+    """Converts one PDF, pages_per_chunk pages at a time. Returns its output image paths."""
+    page_count = int(pdfinfo_from_path(pdf_path, poppler_path=poppler_path)["Pages"])
+    paths = page_image_paths(pdf_path, page_count)
+    os.makedirs(os.path.dirname(paths[0]) if paths else output_dir, exist_ok=True)
+
+    save_options = {"quality": jpeg_quality} if image_format == "jpg" else {}
+    for first in range(1, page_count + 1, pages_per_chunk):
+        last = min(first + pages_per_chunk - 1, page_count)
+        pages = convert_from_path(pdf_path, dpi=dpi, first_page=first, last_page=last, poppler_path=poppler_path)
+        for page_no, page in enumerate(pages, start=first):
+            page.convert("RGB").save(paths[page_no - 1], "JPEG" if image_format == "jpg" else "PNG", **save_options)
+        del pages
+    return paths
+
+
+def load_manifest():
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest):
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, manifest_path)
+
+
+def conversion_settings():
+    """The settings a page image depends on, as recorded per PDF in the manifest."""
+    return {"dpi": dpi, "format": image_format, "jpeg_quality": jpeg_quality if image_format == "jpg" else None}
 
-    # Process all PDFs in this folder
-    for f in files:
-        if f.lower().endswith('.pdf'):
-            pdf_path = os.path.join(root, f)
+
+def is_converted(entry, stat):
+    """Unchanged PDF, same settings, and every page image still on disk."""
+    return (entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+            and all(entry.get(key) == value for key, value in conversion_settings().items())
+            and all(os.path.exists(path) for path in entry["images"]))
+
+
+def remove_images(paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def prune_manifest(manifest, pdf_paths):
+    """Drops the entries and page images of PDFs no longer in the source tree; returns how many."""
+    deleted = [pdf_path for pdf_path in manifest if pdf_path not in pdf_paths]
+    stale = {path for pdf_path in deleted for path in manifest.pop(pdf_path)["images"]}
+    # A PDF in the same folder with the same stem (e.g. a.pdf -> a.PDF) now owns the same image paths
+    remove_images(stale - {path for entry in manifest.values() for path in entry["images"]})
+    return len(deleted)
+
+
+if __name__ == "__main__":
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest()
+
+    # Walk through all subfolders; only new or changed PDFs are converted
+    pending = {}
+    pdf_paths = set()
+    for root, dirs, files in os.walk(non_sensitive_dir):
+        for f in files:
+            if f.lower().endswith('.pdf'):
+                pdf_path = os.path.join(root, f)
+                pdf_paths.add(pdf_path)
+                stat = os.stat(pdf_path)
+                if not is_converted(manifest.get(pdf_path), stat):
+                    pending[pdf_path] = stat
+
+    removed = prune_manifest(manifest, pdf_paths)
+    if removed:
+        save_manifest(manifest)
+    print(f"{len(pending)} PDFs to convert ({len(manifest)} in manifest, {removed} deleted PDFs pruned), "
+          f"{workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(convert_pdf, pdf_path): pdf_path for pdf_path in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            pdf_path = futures[future]
             try:
-                pages = convert_from_path(pdf_path, poppler_path=poppler_path)
-                for i, page in enumerate(pages):
-                    img_name = f"{os.path.splitext(f)[0]}_page{i+1}.jpg"
-                    page.save(os.path.join(save_path, img_name), 'JPEG')
-                print(f"Converted {pdf_path} -> {len(pages)} images")
+                images = future.result()
             except Exception as e:
                 print(f"Error converting {pdf_path}: {e}")
+                continue
+
+            # A changed PDF with fewer pages: drop the stale page images
+            previous = manifest.get(pdf_path, {}).get("images", [])
+            remove_images(set(previous) - set(images))
+
+            stat = pending[pdf_path]
+            manifest[pdf_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, **conversion_settings(),
+                                  "images": images}
+            print(f"Converted {pdf_path} -> {len(images)} images")
+            if done % 50 == 0:
+                save_manifest(manifest)
 
-print("All PDFs converted to images successfully!")
+    save_manifest(manifest)
+    print("All PDFs converted to images successfully!")
@@ -0,0 +1,146 @@
+"""
+Perceptual deduplication of the training corpus.
+
+Augmented copies and overlapping PDF sources leave many near-identical images
+in the split manifest (Model/manifest.py). They waste training compute and,
+when they fall into different splits, leak test images into training.
+
+1. pHash every image (App/near_dup_cache.phash) in a process pool. JPEGs are
+   decoded at 1/4 scale in grayscale, which is all a 32x32 hash needs. Hashes
+   are stored in the manifest's phash column, so re-runs only hash new or
+   changed images.
+2. Per label, cluster images within MAX_DISTANCE bits with the multi-index
+   hash table from near_dup_cache and a union-find. Identical hashes are
+   merged up front, so large exact-duplicate groups do not blow up the
+   candidate lists.
+3. Move every member of a cluster into one split, derived from the cluster's
+   group (stored in the group column): the smallest group its members already
+   had, so new images join the existing split, else its smallest content
+   hash. Single linkage can chain distinct documents that share a template,
+   so clusters only decide the split: within a cluster, only images within
+   DUPLICATE_DISTANCE bits of each other are duplicates, and all but the
+   largest file of each such set get keep=0 (skipped by ManifestDataset).
+
+Model/model.py runs this after every manifest update (DEDUPLICATE); run it by
+hand after calling update_manifest() from anywhere else.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "App"))
+sys.path.append(os.path.join(ROOT, "Model"))
+from near_dup_cache import MultiIndexHashTable, phash
+from manifest import read_manifest, write_manifest, split_for_hash
+
+# ---------------------- USER CONFIG ----------------------
+# Split manifest written by Model/model.py
+manifest_path = r"D:\5th sem\Deep Learning\Project\Data\split_manifest.csv"
+
+# Hamming distance (of 64 bits) under which two images share a split
+MAX_DISTANCE = 6
+# ... and under which they are the same image (re-scan / re-compression): one is kept
+DUPLICATE_DISTANCE = 2
+workers = os.cpu_count()
+# ---------------------------------------------------------
+
+
+def image_phash(path: str) -> str:
+    """Hex pHash of one image, or "" if it cannot be decoded."""
+    img = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if img is None:
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    return "" if img is None else f"{phash(img):016x}"
+
+
+class UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:  # path compression
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def cluster_hashes(hashes: list[int], max_distance: int = MAX_DISTANCE) -> list[int]:
+    """Cluster id (index of a member) per hash; single-linkage within max_distance."""
+    uf = UnionFind(len(hashes))
+    first_index = {}  # identical hashes: union with the first, index once
+    index = MultiIndexHashTable(max_distance)
+    for i, value in enumerate(hashes):
+        if value in first_index:
+            uf.union(i, first_index[value])
+            continue
+        first_index[value] = i
+        for _, j in index.search(value):
+            uf.union(i, j)
+        index.add(i, value)
+    return [uf.find(i) for i in range(len(hashes))]
+
+
+def _groups(rows: list[dict], max_distance: int) -> list[list[dict]]:
+    """Rows grouped by cluster_hashes() on their phash column."""
+    groups = {}
+    for row, cluster in zip(rows, cluster_hashes([int(row["phash"], 16) for row in rows], max_distance)):
+        groups.setdefault(cluster, []).append(row)
+    return list(groups.values())
+
+
+def deduplicate_manifest(path: str = manifest_path, max_distance: int = MAX_DISTANCE,
+                         duplicate_distance: int = DUPLICATE_DISTANCE, workers: int = workers) -> None:
+    rows = read_manifest(path)
+    to_hash = [row for row in rows if not row.get("phash")]
+    if to_hash:
+        print(f"Hashing {len(to_hash)} images with {workers} workers...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hashes = pool.map(image_phash, [row["path"] for row in to_hash], chunksize=256)
+            for row, value in zip(to_hash, hashes):
+                row["phash"] = value
+
+    hashed = [row for row in rows if row["phash"]]
+    for row in rows:
+        if not row["phash"]:
+            print(f"Warning: could not decode {row['path']}; left as its own group.")
+            row["group"], row["keep"] = row["sha256"], "1"
+
+    # Images of different labels are never clustered (nor dropped) together
+    by_label = {}
+    for row in hashed:
+        by_label.setdefault(row["label"], []).append(row)
+    clusters = [cluster for members in by_label.values() for cluster in _groups(members, max_distance)]
+
+    moved = dropped = 0
+    for members in clusters:
+        group = (min((row["group"] for row in members if row.get("group")), default="")
+                 or min(row["sha256"] for row in members))
+        split = split_for_hash(group)
+        for row in members:
+            moved += row["split"] != split
+            row["split"] = split
+            row["group"] = group
+        for duplicates in (_groups(members, duplicate_distance) if len(members) > 1 else [members]):
+            representative = max(duplicates, key=lambda row: (int(row["size"]), row["path"]))
+            for row in duplicates:
+                dropped += row is not representative
+                row["keep"] = "1" if row is representative else "0"
+
+    write_manifest(path, rows)
+    largest = max((len(members) for members in clusters), default=0)
+    print(f"✅ {len(rows)} images, {len(clusters)} clusters (largest {largest}): {dropped} near-duplicates dropped, "
+          f"{moved} images moved to their cluster's split")
+
+
+if __name__ == "__main__":
+    deduplicate_manifest()
@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pdf2image")
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Preprocessing"))
+import data_prep
+
+
+@pytest.fixture
+def converted(tmp_path, monkeypatch):
+    """A source PDF with its two page images and manifest entry, under the current settings."""
+    monkeypatch.setattr(data_prep, "non_sensitive_dir", str(tmp_path / "pdfs"))
+    monkeypatch.setattr(data_prep, "output_dir", str(tmp_path / "images"))
+    pdf_path = tmp_path / "pdfs" / "statement.pdf"
+    pdf_path.parent.mkdir()
+    pdf_path.write_bytes(b"%PDF-1.4")
+    images = data_prep.page_image_paths(str(pdf_path), 2)
+    os.makedirs(os.path.dirname(images[0]))
+    for path in images:
+        open(path, "wb").close()
+    stat = os.stat(pdf_path)
+    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, **data_prep.conversion_settings(), "images": images}
+    return str(pdf_path), stat, entry
+
+
+def test_unchanged_pdf_is_not_reconverted(converted):
+    _, stat, entry = converted
+    assert data_prep.is_converted(entry, stat)
+
+
+@pytest.mark.parametrize("setting, value", [("dpi", 300), ("image_format", "png"), ("jpeg_quality", 75)])
+def test_changed_setting_triggers_reconversion(converted, monkeypatch, setting, value):
+    _, stat, entry = converted
+    monkeypatch.setattr(data_prep, setting, value)
+    assert not data_prep.is_converted(entry, stat)
+
+
+def test_entry_without_jpeg_quality_is_reconverted(converted):
+    _, stat, entry = converted
+    del entry["jpeg_quality"]
+    assert not data_prep.is_converted(entry, stat)
+
+
+def test_missing_page_image_triggers_reconversion(converted):
+    _, stat, entry = converted
+    os.remove(entry["images"][1])
+    assert not data_prep.is_converted(entry, stat)
+
+
+def test_deleted_pdf_is_pruned_with_its_images(converted):
+    pdf_path, _, entry = converted
+    manifest = {pdf_path: entry}
+
+    assert data_prep.prune_manifest(manifest, {pdf_path}) == 0
+    assert manifest == {pdf_path: entry}
+
+    assert data_prep.prune_manifest(manifest, set()) == 1
+    assert manifest == {}
+    assert not any(os.path.exists(path) for path in entry["images"])
+
+
+def test_images_now_owned_by_another_pdf_are_kept(converted):
+    pdf_path, _, entry = converted
+    renamed = pdf_path[:-4] + ".PDF"
+    manifest = {pdf_path: entry, renamed: dict(entry)}
+
+    assert data_prep.prune_manifest(manifest, {renamed}) == 1
+    assert list(manifest) == [renamed]
+    assert all(os.path.exists(path) for path in entry["images"])
@@ -0,0 +1,102 @@
+import os
+import sys
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+pytest.importorskip("torch")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "Preprocessing"))
+from dedup import UnionFind, cluster_hashes, deduplicate_manifest
+from manifest import read_manifest, update_manifest, write_manifest
+
+
+def _flip(value: int, bits) -> int:
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def test_union_find_roots_at_the_smallest_index():
+    uf = UnionFind(6)
+    uf.union(4, 5)
+    uf.union(5, 2)
+    uf.union(0, 1)
+    assert [uf.find(i) for i in range(6)] == [0, 0, 2, 3, 2, 2]
+    uf.union(1, 4)
+    assert {uf.find(i) for i in (0, 1, 2, 4, 5)} == {0}
+    assert uf.find(3) == 3
+
+
+def test_clusters_chain_through_intermediate_hashes():
+    a = 0x0F0F0F0F0F0F0F0F
+    b = _flip(a, range(5))        # 5 bits from a
+    c = _flip(b, range(5, 10))    # 5 bits from b, 10 from a
+    far = ~a & (2**64 - 1)
+    assert cluster_hashes([a, b, c, far, a], max_distance=6) == [0, 0, 0, 3, 0]
+
+
+def test_nothing_is_clustered_beyond_max_distance():
+    a = 0x123456789ABCDEF0
+    assert cluster_hashes([a, _flip(a, range(7))], max_distance=6) == [0, 1]
+
+
+def _row(path, label, sha256, phash, size, split="train"):
+    return {"path": path, "label": label, "split": split, "sha256": sha256, "size": str(size),
+            "mtime_ns": "0", "phash": f"{phash:016x}", "group": "", "keep": ""}
+
+
+def test_dedup_unifies_splits_per_label_and_keeps_the_largest_copy(tmp_path):
+    path = str(tmp_path / "manifest.csv")
+    a = 0x0F0F0F0F0F0F0F0F
+    b = _flip(a, [0])             # a re-compressed copy of a
+    c = _flip(a, range(1, 6))     # a different document on the same template
+    write_manifest(path, [
+        _row("/s/a.jpg", "sensitive", "aa" * 32, a, 100, "train"),
+        _row("/s/b.jpg", "sensitive", "bb" * 32, b, 300, "test"),
+        _row("/s/c.jpg", "sensitive", "cc" * 32, c, 200, "val"),
+        _row("/n/a.jpg", "non_sensitive", "dd" * 32, a, 100, "test"),
+    ])
+
+    deduplicate_manifest(path, max_distance=6, duplicate_distance=2, workers=1)
+    rows = {row["path"]: row for row in read_manifest(path)}
+
+    sensitive = [rows[p] for p in ("/s/a.jpg", "/s/b.jpg", "/s/c.jpg")]
+    assert {row["group"] for row in sensitive} == {"aa" * 32}
+    assert len({row["split"] for row in sensitive}) == 1
+    # a and b are one image: only the larger file is trained on; c is its own document
+    assert [row["keep"] for row in sensitive] == ["0", "1", "1"]
+    # Same hash, other label: never merged with the sensitive cluster
+    assert rows["/n/a.jpg"]["group"] == "dd" * 32 and rows["/n/a.jpg"]["keep"] == "1"
+
+
+def _document(seed):
+    rng = np.random.default_rng(seed)
+    blocks = (rng.random((12, 16)) * 255).astype(np.uint8)
+    return cv2.resize(blocks, (640, 480), interpolation=cv2.INTER_NEAREST)
+
+
+def test_new_near_duplicate_follows_its_cluster_split(tmp_path):
+    source = tmp_path / "sensitive"
+    source.mkdir()
+    manifest_path = str(tmp_path / "manifest.csv")
+    for seed in range(6):
+        cv2.imwrite(str(source / f"doc{seed}.png"), _document(seed))
+    update_manifest(manifest_path, {"sensitive": str(source)}, workers=1)
+    deduplicate_manifest(manifest_path, workers=1)
+    before = {os.path.basename(row["path"]): row for row in read_manifest(manifest_path)}
+
+    # New re-compressed copies of every document: their own content hashes would scatter them
+    for seed in range(6):
+        cv2.imwrite(str(source / f"doc{seed}_copy.jpg"), _document(seed), [cv2.IMWRITE_JPEG_QUALITY, 60])
+    rows = update_manifest(manifest_path, {"sensitive": str(source)}, workers=1)
+    assert sum(not row.get("phash") for row in rows) == 6
+    deduplicate_manifest(manifest_path, workers=1)
+    after = {os.path.basename(row["path"]): row for row in read_manifest(manifest_path)}
+
+    for seed in range(6):
+        original, copy = after[f"doc{seed}.png"], after[f"doc{seed}_copy.jpg"]
+        assert original["split"] == before[f"doc{seed}.png"]["split"] == copy["split"]
+        assert (original["keep"], copy["keep"]) == ("1", "0")  # the PNG is the larger file
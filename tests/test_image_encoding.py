@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from image_encoding import encode_image, negotiate_format, resolve_quality
+
+
+@pytest.fixture
+def image():
+    img = np.full((60, 80, 3), 255, np.uint8)
+    cv2.rectangle(img, (10, 10), (50, 40), (0, 0, 255), -1)
+    return img
+
+
+def test_explicit_format_wins_over_accept():
+    assert negotiate_format("JPG", [("image/webp", 1.0)]) == "jpeg"
+
+
+def test_best_listed_image_type_is_chosen():
+    accept = [("text/html", 1.0), ("image/webp", 0.9), ("image/jpeg", 0.5), ("image/png", 0.1)]
+    assert negotiate_format(None, accept) == "webp"
+
+
+def test_wildcards_and_refused_types_keep_the_default():
+    assert negotiate_format(None, [("*/*", 1.0), ("image/*", 1.0)]) == "png"
+    assert negotiate_format(None, [("image/webp", 0)]) == "png"
+    assert negotiate_format() == "png"
+
+
+def test_werkzeug_accept_header_is_understood():
+    datastructures = pytest.importorskip("werkzeug.datastructures")
+    http = pytest.importorskip("werkzeug.http")
+    accept = http.parse_accept_header("image/avif,image/webp;q=0.8,*/*;q=0.5", datastructures.MIMEAccept)
+    assert negotiate_format(None, accept) == "webp"
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported output format 'gif'"):
+        negotiate_format("gif")
+
+
+@pytest.mark.parametrize("fmt, quality, expected", [
+    ("png", None, 3), ("jpeg", None, 90), ("webp", 101, 101), ("jpg", "75", 75),
+])
+def test_quality_defaults_and_accepted_values(fmt, quality, expected):
+    assert resolve_quality(fmt, quality) == expected
+
+
+@pytest.mark.parametrize("fmt, quality", [("png", 10), ("jpeg", 0), ("jpeg", 101), ("webp", 102)])
+def test_quality_out_of_range_is_rejected(fmt, quality):
+    with pytest.raises(ValueError, match="Quality for"):
+        resolve_quality(fmt, quality)
+
+
+def test_png_round_trip_is_lossless(image):
+    data, mime = encode_image(image)
+    assert mime == "image/png" and data.startswith(b"\x89PNG")
+    assert np.array_equal(cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR), image)
+
+
+def test_lossy_formats_follow_quality(image):
+    noisy = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    low, mime = encode_image(noisy, "jpeg", 20)
+    high, _ = encode_image(noisy, "jpeg", 95)
+    assert mime == "image/jpeg" and low[:2] == b"\xff\xd8"
+    assert len(low) < len(high)
+
+    data, mime = encode_image(image, "webp")
+    assert mime == "image/webp" and data[8:12] == b"WEBP"
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from layout import GridIndex, boxes_from_ocr, find_labelled_values
+from layout import _match_label
+
+
+def _line(x0, y0, x1, y1, text, conf=0.9):
+    return [[[x0, y0], [x1, y0], [x1, y1], [x0, y1]], (text, conf)]
+
+
+def test_english_and_regional_labels():
+    assert _match_label("DOB: 01/01/1990") == ("dob", "01/01/1990")
+    assert _match_label("जन्म तिथि/DOB: 01/01/1990") == ("dob", "01/01/1990")
+    assert _match_label("पिता का नाम/Father's Name : RAMESH") == ("father", "RAMESH")
+    assert _match_label("DOB / जन्म तिथि : 01/01/1990") == ("dob", "01/01/1990")
+    assert _match_label("Government of India") == (None, "")
+
+
+def test_long_non_ascii_line_is_rejected_quickly():
+    # Used to backtrack exponentially in the length of the regional-script run
+    start = time.perf_counter()
+    assert _match_label("भारत" * 50) == (None, "")
+    assert _match_label("भारत सरकार " * 200 + "x") == (None, "")
+    assert time.perf_counter() - start < 0.5
+
+
+def test_inline_value():
+    matches = find_labelled_values([_line(0, 0, 300, 30, "DOB: 01/01/1990")])
+    assert [(m.field, m.text) for m in matches] == [("dob", "01/01/1990")]
+    x0, _ = matches[0].points[0]
+    assert x0 > 0  # the value's part of the box, not the label
+
+
+def test_value_to_the_right_and_below():
+    lines = [
+        _line(0, 0, 80, 30, "Name"),
+        _line(100, 0, 300, 30, "JANANI H"),
+        _line(0, 50, 120, 80, "Address"),
+        _line(0, 90, 300, 120, "12 Main Road"),
+        _line(0, 130, 300, 160, "Chennai 600001"),
+    ]
+    matches = find_labelled_values(lines)
+    assert ("name", "JANANI H") in [(m.field, m.text) for m in matches]
+    assert [m.text for m in matches if m.field == "address"] == ["12 Main Road", "Chennai 600001"]
+
+
+def test_fields_filter_and_min_confidence():
+    lines = [_line(0, 0, 300, 30, "DOB: 01/01/1990"), _line(0, 50, 300, 80, "Name: JANANI", conf=0.2)]
+    assert [m.field for m in find_labelled_values(lines, fields=["name"])] == ["name"]
+    assert find_labelled_values(lines, min_conf=0.5, fields=["name"]) == []
+
+
+def test_grid_index_query():
+    index = GridIndex(boxes_from_ocr([_line(0, 0, 50, 20, "a"), _line(500, 500, 550, 520, "b")]))
+    assert index.query(40, 10, 60, 30) == [0]
+    assert index.query(100, 100, 200, 200) == []
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("torch")
+Image = pytest.importorskip("PIL.Image")
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Model"))
+import manifest
+from manifest import (ManifestDataset, link_split_folders, manifest_fingerprint, manifest_samples, read_manifest,
+                      split_for_hash, update_manifest, write_manifest)
+
+
+def _image(path, color):
+    Image.new("RGB", (8, 8), color).save(path)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    dirs = {"sensitive": tmp_path / "sensitive", "non_sensitive": tmp_path / "non_sensitive"}
+    for directory in dirs.values():
+        directory.mkdir()
+    _image(dirs["sensitive"] / "card.png", (255, 0, 0))
+    _image(dirs["sensitive"] / "copy.png", (255, 0, 0))
+    _image(dirs["non_sensitive"] / "letter.png", (0, 0, 255))
+    (dirs["non_sensitive"] / "notes.txt").write_text("not an image")
+    return {label: str(directory) for label, directory in dirs.items()}
+
+
+def test_split_is_a_fixed_function_of_the_hash():
+    assert split_for_hash("00000000" + "f" * 56) == "train"
+    assert split_for_hash("b3333333" + "0" * 56) == "train"   # just under 0.70
+    assert split_for_hash("b3400000" + "0" * 56) == "val"
+    assert split_for_hash("d9a00000" + "0" * 56) == "test"    # above 0.85
+    assert split_for_hash("ffffffff" + "0" * 56) == "test"
+
+
+def test_splits_follow_the_configured_proportions():
+    hashes = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(20000)]
+    counts = {split: 0 for split in ("train", "val", "test")}
+    for value in hashes:
+        counts[split_for_hash(value)] += 1
+    assert counts["train"] / 20000 == pytest.approx(0.70, abs=0.015)
+    assert counts["val"] / 20000 == pytest.approx(0.15, abs=0.015)
+
+
+def test_first_update_hashes_every_image(tmp_path, sources):
+    path = str(tmp_path / "manifest.csv")
+    rows = update_manifest(path, sources, workers=2)
+
+    assert sorted(os.path.basename(row["path"]) for row in rows) == ["card.png", "copy.png", "letter.png"]
+    by_name = {os.path.basename(row["path"]): row for row in read_manifest(path)}
+    assert by_name["card.png"]["sha256"] == by_name["copy.png"]["sha256"]
+    assert by_name["card.png"]["split"] == by_name["copy.png"]["split"]  # byte-identical copies stay together
+    assert by_name["letter.png"]["label"] == "non_sensitive"
+
+
+def test_update_only_rehashes_new_or_changed_files(tmp_path, sources, monkeypatch):
+    path = str(tmp_path / "manifest.csv")
+    update_manifest(path, sources)
+    before = {row["path"]: row for row in read_manifest(path)}
+
+    card = os.path.join(sources["sensitive"], "card.png")
+    _image(card, (0, 255, 0))
+    os.utime(card, ns=(1, 1))  # a different mtime even on coarse file systems
+    os.remove(os.path.join(sources["sensitive"], "copy.png"))
+    _image(os.path.join(sources["non_sensitive"], "new.png"), (9, 9, 9))
+    hashed = []
+    monkeypatch.setattr(manifest, "file_sha256", lambda p: hashed.append(os.path.basename(p)) or "0" * 64)
+
+    after = {row["path"]: row for row in update_manifest(path, sources)}
+
+    assert sorted(hashed) == ["card.png", "new.png"]
+    assert not any(p.endswith("copy.png") for p in after)
+    letter = os.path.join(sources["non_sensitive"], "letter.png")
+    assert after[os.path.abspath(letter)] == before[os.path.abspath(letter)]
+
+
+def test_relabelled_image_is_rehashed(tmp_path, sources):
+    path = str(tmp_path / "manifest.csv")
+    update_manifest(path, sources)
+    rows = update_manifest(path, {"non_sensitive": sources["sensitive"]})
+    assert {row["label"] for row in rows} == {"non_sensitive"}
+
+
+def _rows():
+    return [
+        {"path": "/a.png", "label": "sensitive", "split": "train", "sha256": "a" * 64, "keep": "1"},
+        {"path": "/b.png", "label": "sensitive", "split": "train", "sha256": "b" * 64, "keep": "0"},
+        {"path": "/c.png", "label": "non_sensitive", "split": "val", "sha256": "c" * 64, "keep": ""},
+        {"path": "/d.png", "label": "non_sensitive", "split": "test", "sha256": "d" * 64, "keep": "1"},
+    ]
+
+
+def test_samples_skip_dropped_duplicates(tmp_path):
+    path = str(tmp_path / "manifest.csv")
+    write_manifest(path, _rows())
+    assert manifest_samples(path, "train") == [("/a.png", 1)]
+    assert manifest_samples(path, "val") == [("/c.png", 0)]  # not deduplicated yet: kept
+
+
+def test_fingerprint_tracks_what_training_sees(tmp_path):
+    path = str(tmp_path / "manifest.csv")
+    write_manifest(path, _rows())
+    original = manifest_fingerprint(path)
+
+    def fingerprint_after(change):
+        rows = _rows()
+        change(rows)
+        write_manifest(path, rows)
+        return manifest_fingerprint(path)
+
+    assert fingerprint_after(lambda rows: None) == original
+    assert fingerprint_after(lambda rows: rows[3].update(sha256="e" * 64)) == original  # test split only
+    assert fingerprint_after(lambda rows: rows[1].update(sha256="e" * 64)) == original  # dropped duplicate
+    assert fingerprint_after(lambda rows: rows[0].update(keep="0")) != original
+    assert fingerprint_after(lambda rows: rows[2].update(split="train")) != original
+    assert fingerprint_after(lambda rows: rows[0].update(label="non_sensitive")) != original
+
+
+def test_split_folders_are_hardlinked(tmp_path, sources):
+    path = str(tmp_path / "manifest.csv")
+    rows = update_manifest(path, sources)
+    rows[0]["keep"] = "0"
+    write_manifest(path, rows)
+
+    link_split_folders(path, str(tmp_path / "Final_Data"))
+
+    linked = [os.path.join(root, f) for root, _, files in os.walk(tmp_path / "Final_Data") for f in files]
+    assert len(linked) == 2
+    for row in read_manifest(path):
+        name = f"{row['sha256'][:8]}_{os.path.basename(row['path'])}"
+        target = tmp_path / "Final_Data" / row["split"] / row["label"] / name
+        assert os.path.exists(target) is (row["keep"] != "0")
+        if row["keep"] != "0":
+            assert os.path.samefile(target, row["path"])
+
+
+def test_dataset_reads_one_split(tmp_path, sources):
+    path = str(tmp_path / "manifest.csv")
+    rows = update_manifest(path, sources)
+    for row in rows:
+        row["split"] = "val"
+    write_manifest(path, rows)
+
+    dataset = ManifestDataset(path, "val")
+    assert len(dataset) == 3
+    image, label = dataset[0]
+    assert image.size == (8, 8) and label in (0, 1)
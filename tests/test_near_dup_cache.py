@@ -0,0 +1,91 @@
+import os
+import random
+import sys
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from near_dup_cache import MultiIndexHashTable, NearDuplicateCache
+
+NUMBER_BOX = [(100, 330), (520, 330), (520, 380), (100, 380)]
+
+
+def card(number: str) -> np.ndarray:
+    """Synthetic ID card: fixed layout (header, photo, labels), variable number."""
+    img = np.full((480, 760, 3), 235, np.uint8)
+    cv2.rectangle(img, (0, 0), (760, 70), (40, 90, 160), -1)
+    cv2.putText(img, "GOVERNMENT OF INDIA", (150, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3)
+    cv2.rectangle(img, (40, 110), (220, 300), (120, 120, 120), -1)
+    cv2.putText(img, "Name: JANANI", (260, 160), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (20, 20, 20), 2)
+    cv2.putText(img, "DOB: 01/01/1990", (260, 220), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (20, 20, 20), 2)
+    cv2.putText(img, number, (105, 370), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 0, 0), 3)
+    return img
+
+
+def rescan(img: np.ndarray) -> np.ndarray:
+    """Re-compressed, slightly noisy and resized copy."""
+    ok, jpeg = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 70])
+    out = cv2.imdecode(jpeg, cv2.IMREAD_COLOR).astype(np.int16)
+    out += np.random.default_rng(0).integers(-4, 5, out.shape, dtype=np.int16)
+    out = np.clip(out, 0, 255).astype(np.uint8)
+    return cv2.resize(out, (912, 576), interpolation=cv2.INTER_LINEAR)
+
+
+def test_rescan_hits_with_scaled_regions():
+    cache = NearDuplicateCache()
+    cache.store(card("2345 6789 0123"), [NUMBER_BOX], [("aadhaar", 0.95)])
+
+    hit = cache.lookup_labelled(rescan(card("2345 6789 0123")))
+    assert hit is not None
+    (polygon, label), = hit
+    assert label == ("aadhaar", 0.95)
+    assert polygon[0] == pytest.approx((120, 396))
+
+
+def test_same_layout_different_number_misses():
+    cache = NearDuplicateCache()
+    cache.store(card("2345 6789 0123"), [NUMBER_BOX], [("aadhaar", 0.95)])
+    assert cache.lookup(card("9876 5432 1098")) is None
+
+
+def test_shifted_rescan_hits():
+    cache = NearDuplicateCache()
+    cache.store(card("2345 6789 0123"), [NUMBER_BOX])
+    img = rescan(card("2345 6789 0123"))
+    shifted = cv2.warpAffine(img, np.float32([[1, 0, 2], [0, 1, 2]]), (img.shape[1], img.shape[0]),
+                             borderValue=(235, 235, 235))
+    assert cache.lookup(shifted) is not None
+
+
+def test_empty_results_are_not_stored():
+    cache = NearDuplicateCache()
+    cache.store(card("2345 6789 0123"), [])
+    assert cache.lookup(card("2345 6789 0123")) is None
+
+
+def test_eviction_keeps_max_entries():
+    cache = NearDuplicateCache(max_entries=2)
+    for number in ("1111 2222 3333", "4444 5555 6666", "7777 8888 9999"):
+        cache.store(card(number), [NUMBER_BOX])
+    assert len(cache.index) == 2
+    assert cache.lookup(card("1111 2222 3333")) is None
+    assert cache.lookup(card("7777 8888 9999")) is not None
+
+
+def test_multi_index_search_matches_brute_force():
+    rng = random.Random(0)
+    values = [rng.getrandbits(64) for _ in range(2000)]
+    # Near neighbours of the first values, up to 5 bits away
+    values += [v ^ sum(1 << b for b in rng.sample(range(64), rng.randint(0, 5))) for v in values[:200]]
+    table = MultiIndexHashTable(max_distance=4)
+    for key, value in enumerate(values):
+        table.add(key, value)
+    table.remove(0)
+
+    for query in values[:50]:
+        expected = sorted(((v ^ query).bit_count(), k) for k, v in enumerate(values)
+                          if k != 0 and (v ^ query).bit_count() <= 4)
+        assert table.search(query) == expected
@@ -0,0 +1,65 @@
+"""
+ONNX Runtime OCR backend vs PaddleOCR: both must find the same PII regions on
+the sample documents. Skipped unless paddleocr, onnxruntime and the exported
+models (ONNX_OCR_MODEL_DIR) are available.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "App"))
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("paddleocr")
+pytest.importorskip("onnxruntime")
+from ocr_backends import ONNX_MODEL_DIR, OnnxBackend, PaddleBackend
+from pii_regions import find_sensitive_regions
+
+FIXTURE_DIR = os.path.join(ROOT, "Sample_dataset", "Sensitive")
+LAYOUT_FIELDS = ("name", "father", "dob", "address")  # ml_core's defaults
+MATCH_IOU = 0.5
+
+if not all(os.path.exists(os.path.join(ONNX_MODEL_DIR, f)) for f in ("det.onnx", "rec.onnx", "rec_dict.txt")):
+    pytest.skip(f"ONNX OCR models not found in {ONNX_MODEL_DIR}", allow_module_level=True)
+
+
+def _fixtures():
+    if not os.path.isdir(FIXTURE_DIR):
+        return []
+    return [f for f in sorted(os.listdir(FIXTURE_DIR)) if f.lower().endswith((".jpg", ".jpeg", ".png"))]
+
+
+def _bounds(points):
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _iou(a, b) -> float:
+    iw = min(a[2], b[2]) - max(a[0], b[0])
+    ih = min(a[3], b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter)
+
+
+@pytest.fixture(scope="module")
+def backends():
+    return PaddleBackend(), OnnxBackend()
+
+
+@pytest.mark.parametrize("name", _fixtures() or [pytest.param(None, marks=pytest.mark.skip("no fixture images"))])
+def test_onnx_backend_finds_the_same_pii_regions(backends, name):
+    img = cv2.imread(os.path.join(FIXTURE_DIR, name))
+    paddle, onnx = backends
+    expected = find_sensitive_regions(paddle.ocr(img), layout_fields=LAYOUT_FIELDS)
+    found = find_sensitive_regions(onnx.ocr(img), layout_fields=LAYOUT_FIELDS)
+
+    # Same PII read (type and keyed text hash) ...
+    assert sorted((r.pii_type, r.text_hash) for r in found) == sorted((r.pii_type, r.text_hash) for r in expected)
+    # ... at the same place
+    for region in expected:
+        same = [r for r in found if (r.pii_type, r.text_hash) == (region.pii_type, region.text_hash)]
+        assert max(_iou(_bounds(region.points), _bounds(r.points)) for r in same) >= MATCH_IOU, region.pii_type
@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from ocr_tiling import merge_tile_lines, tile_grid
+
+
+def _box(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+
+def test_line_split_by_a_vertical_seam_is_merged():
+    tiles = tile_grid(100, 1800, 1000, 200)
+    assert [tile[:3] for tile in tiles] == [(0, 0, 1000), (800, 0, 1800)]
+    # "Aadhaar 2345 6789 0123" spanning x 600-1300; the strip 800-1000 is read by both tiles
+    tile_lines = [
+        [[_box(600, 40, 1000, 70), ("Aadhaar 2345 67", 0.97)]],
+        [[_box(0, 41, 500, 71), ("2345 6789 0123", 0.93)]],
+    ]
+    lines = merge_tile_lines(tile_lines, tiles, (100, 1800), 200)
+
+    assert len(lines) == 1
+    points, (text, conf) = lines[0]
+    assert text == "Aadhaar 2345 6789 0123"
+    assert conf == 0.93
+    assert points[0] == [600.0, 40.0] and points[2] == [1300.0, 71.0]
+
+
+def test_unrelated_lines_at_a_seam_stay_apart():
+    tiles = tile_grid(300, 1800, 1000, 200)
+    tile_lines = [
+        [[_box(600, 40, 1000, 70), ("Name JANANI", 0.9)]],
+        [[_box(0, 200, 500, 230), ("Address 12 Main Road", 0.9)]],
+    ]
+    texts = sorted(line[1][0] for line in merge_tile_lines(tile_lines, tiles, (300, 1800), 200))
+    assert texts == ["Address 12 Main Road", "Name JANANI"]
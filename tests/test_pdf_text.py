@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pdf2image")
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+import pdf_text
+from pdf_text import extract_image_boxes, extract_text_lines, image_regions
+
+# A typed form (points, 612x792 page) with a pasted ID card scan below the text
+BBOX_LAYOUT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml"><body><doc><page width="612" height="792">
+<flow><block>
+<line xMin="72" yMin="72" xMax="300" yMax="86">
+  <word xMin="72" yMin="72" xMax="140" yMax="86">Application</word>
+  <word xMin="144" yMin="72" xMax="200" yMax="86">form</word>
+</line>
+<line xMin="72" yMin="100" xMax="320" yMax="114">
+  <word xMin="72" yMin="100" xMax="130" yMax="114">Applicant:</word>
+  <word xMin="134" yMin="100" xMax="200" yMax="114">Ravi</word>
+  <word xMin="204" yMin="100" xMax="260" yMax="114">Kumar</word>
+</line>
+</block></flow>
+</page></doc></body></html>"""
+
+PDF2XML = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE pdf2xml SYSTEM "pdf2xml.dtd">
+<pdf2xml producer="poppler" version="22.02.0">
+<page number="1" position="absolute" top="0" left="0" height="792" width="612">
+{images}
+</page>
+</pdf2xml>"""
+
+CARD = '<image top="200" left="72" width="324" height="204" src="page-1_1.png"/>'
+BULLET = '<image top="100" left="60" width="6" height="6" src="page-1_2.png"/>'
+
+
+@pytest.fixture
+def poppler(monkeypatch):
+    """Fakes pdftotext / pdftohtml; `tools` maps the tool name to its output (None: it fails)."""
+    tools = {"pdftotext": BBOX_LAYOUT, "pdftohtml": PDF2XML.format(images=CARD)}
+
+    def run(args, **kwargs):
+        output = tools[os.path.basename(args[0])]
+        if output is None:
+            raise subprocess.CalledProcessError(1, args)
+        if args[0].endswith("pdftohtml"):
+            # pdftohtml writes <prefix>.xml next to the extracted images
+            with open(args[-1] + ".xml", "w", encoding="utf-8") as f:
+                f.write(output)
+            return subprocess.CompletedProcess(args, 0, b"", b"")
+        return subprocess.CompletedProcess(args, 0, output, b"")
+
+    monkeypatch.setattr(pdf_text.subprocess, "run", run)
+    return tools
+
+
+def test_text_lines_are_scaled_to_the_page_pixels(poppler):
+    lines = extract_text_lines("form.pdf", 1, dpi=144)
+
+    assert [text for _, (text, _) in lines] == ["Application form", "Applicant: Ravi Kumar"]
+    points, (_, conf) = lines[1]
+    assert points == [[144.0, 200.0], [640.0, 200.0], [640.0, 228.0], [144.0, 228.0]]
+    assert conf == 1.0
+
+
+def test_page_with_little_text_is_image_only(poppler):
+    poppler["pdftotext"] = BBOX_LAYOUT.replace(b"Application", b"").replace(b"Applicant:", b"")
+    assert extract_text_lines("scan.pdf", 1) is None
+
+
+def test_missing_tool_means_no_text_layer(poppler):
+    poppler["pdftotext"] = None
+    assert extract_text_lines("form.pdf", 1) is None
+
+
+def test_mixed_page_keeps_its_embedded_image_for_the_image_path(poppler):
+    lines = extract_text_lines("form.pdf", 1, dpi=144)
+
+    assert lines is not None
+    assert image_regions("form.pdf", 1, lines, dpi=144) == [(144, 400, 792, 808)]
+
+
+def test_tiny_images_are_ignored(poppler):
+    poppler["pdftohtml"] = PDF2XML.format(images=BULLET)
+    assert extract_image_boxes("form.pdf", 1) == []
+
+
+def test_page_without_images_is_text_only(poppler):
+    poppler["pdftohtml"] = PDF2XML.format(images="")
+    lines = extract_text_lines("form.pdf", 1)
+    assert image_regions("form.pdf", 1, lines) == []
+
+
+def test_image_covered_by_its_text_layer_is_not_rescanned(poppler):
+    # A scanned page with an OCR'd text layer: the page image sits under the text
+    poppler["pdftohtml"] = PDF2XML.format(
+        images='<image top="70" left="70" width="252" height="46" src="page-1_1.png"/>')
+    lines = extract_text_lines("scan.pdf", 1)
+    assert image_regions("scan.pdf", 1, lines) == []
+
+
+def test_images_that_cannot_be_listed_send_the_page_to_the_image_path(poppler):
+    poppler["pdftohtml"] = None
+    lines = extract_text_lines("form.pdf", 1)
+    assert image_regions("form.pdf", 1, lines) is None
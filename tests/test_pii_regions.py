@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from pii_regions import PIIRegion, find_sensitive_regions, hash_text
+
+BOX = [[10, 20], [210, 20], [210, 50], [10, 50]]
+
+
+def test_rule_match_becomes_region():
+    lines = [[BOX, ("Aadhaar 2345 6789 0123", 0.95)]]
+    regions = find_sensitive_regions(lines, min_confidence=0.4)
+
+    assert regions == [PIIRegion("aadhaar", hash_text("2345 6789 0123"), 0.95, BOX)]
+    assert regions[0].to_dict()["type"] == "aadhaar"
+
+
+def test_low_confidence_lines_are_skipped():
+    lines = [[BOX, ("PAN ABCDE1234F", 0.2)]]
+    assert find_sensitive_regions(lines, min_confidence=0.4) == []
@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from pii_rules import DEFAULT_RULES, PIIRule, PIIRuleEngine, date_check, default_engine, verhoeff_check
+
+
+def with_check_digit(digits: str) -> str:
+    """Appends the Verhoeff check digit to `digits`."""
+    return next(digits + str(d) for d in range(10) if verhoeff_check(digits + str(d)))
+
+
+AADHAAR = with_check_digit("2345 6789 012")
+VID = with_check_digit("9123 4567 8901 234")
+BAD_AADHAAR = AADHAAR[:-1] + str((int(AADHAAR[-1]) + 1) % 10)
+
+
+def scan(text, strict=True):
+    return [(m.rule, m.text) for m in default_engine.scan(text, strict=strict)]
+
+
+def test_verhoeff():
+    assert verhoeff_check("2363")  # textbook example: 236 -> check digit 3
+    assert not verhoeff_check("2364")
+    assert verhoeff_check(AADHAAR) and not verhoeff_check(BAD_AADHAAR)
+    assert not verhoeff_check("")
+
+
+def test_date_check():
+    assert date_check("29/02/2000")
+    assert not date_check("45/13/2020")
+    assert not date_check("01/01/1800")
+
+
+def test_every_default_rule_is_covered():
+    assert {rule.name for rule in DEFAULT_RULES} == {rule for rule, _, _ in POSITIVE}
+
+
+POSITIVE = [
+    ("vid", f"VID: {VID}", VID),
+    ("aadhaar", f"Aadhaar No. {AADHAAR}", AADHAAR),
+    ("aadhaar", AADHAAR.replace(" ", ""), AADHAAR.replace(" ", "")),
+    ("phone", "Mobile: 98765 43210", "98765 43210"),
+    ("phone", "ph +91-9876543210", "+91-9876543210"),
+    ("dob", "DOB: 01/01/1990", "01/01/1990"),
+    ("email", "mail a.b_c@example.co.in now", "a.b_c@example.co.in"),
+    ("pan", "PAN ABCDE1234F", "ABCDE1234F"),
+    ("pan", "pan abcde 1234 f", "abcde 1234 f"),
+    ("ifsc", "IFSC: SBIN0001234", "SBIN0001234"),
+    ("voter_id", "EPIC ABC1234567", "ABC1234567"),
+    ("passport", "Passport K1234567", "K1234567"),
+]
+
+
+@pytest.mark.parametrize("rule, text, value", POSITIVE)
+def test_rule_matches(rule, text, value):
+    assert scan(text) == [(rule, value)]
+
+
+@pytest.mark.parametrize("text", [
+    "Mobile: 12345 67890",       # phone numbers start with 6-9
+    "mail a@b",                  # no TLD
+    "PAN ABCD1234F",             # one letter short
+    "ABCDE1234FG",               # longer token: not a PAN
+    "IFSC SBIN1001234",          # fifth character must be 0
+    "EPIC AB1234567",
+    "Passport K123456",
+    "Government of India",
+])
+def test_rule_rejects(text):
+    assert scan(text) == []
+
+
+def test_strict_drops_failed_validation():
+    assert scan(f"Aadhaar {BAD_AADHAAR}") == []
+    assert scan("DOB 45/13/2020") == []
+
+    loose = default_engine.scan(f"Aadhaar {BAD_AADHAAR}", strict=False)
+    assert [(m.rule, m.text, m.validated) for m in loose] == [("aadhaar", BAD_AADHAAR, False)]
+    assert default_engine.scan(f"Aadhaar {AADHAAR}", strict=False)[0].validated
+
+
+def test_longest_match_wins_and_tokens_are_respected():
+    # The first 12 digits of a VID are not an Aadhaar number
+    assert scan(VID) == [("vid", VID)]
+    assert scan(f"{AADHAAR}5") == []
+    assert scan(f"x{AADHAAR}") == []
+
+
+def test_matches_do_not_overlap_and_keep_offsets():
+    text = f"PAN ABCDE1234F, UID {AADHAAR}, DOB 01/01/1990 a@b.in"
+    matches = default_engine.scan(text)
+    assert [m.rule for m in matches] == ["pan", "aadhaar", "dob", "email"]
+    assert all(text[m.start:m.end] == m.text for m in matches)
+    assert all(a.end <= b.start for a, b in zip(matches, matches[1:]))
+
+
+def test_non_ascii_text_around_matches():
+    assert scan("नाम: जानकी PAN: ABCDE1234F") == [("pan", "ABCDE1234F")]
+
+
+def test_long_lines_scan_in_linear_time():
+    start = time.perf_counter()
+    assert scan("a." * 8000) == []  # every token starts an email candidate running to the end
+    assert len(scan("x@y.com " * 2000)) == 2000
+    assert time.perf_counter() - start < 1.0
+
+
+def test_custom_rules():
+    engine = PIIRuleEngine([PIIRule("pin", r"\d{6}"), PIIRule("code", r"[A-Z]{2}\d{2}", lambda v: v.isupper())])
+    assert [(m.rule, m.text) for m in engine.scan("PIN 600001, code AB12 ab12")] == [("pin", "600001"), ("code", "AB12")]
+
+    with pytest.raises(ValueError):
+        PIIRuleEngine([])
+    with pytest.raises(ValueError):
+        PIIRuleEngine([PIIRule("lookahead", r"\d(?=x)")])
@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("cv2")
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App"))
+from rec_batching import RecognitionBatcher
+
+
+class FakeRecognizer:
+    """recognize_fn stand-in: reads a crop as its own text, records every batch."""
+
+    def __init__(self, drop_last=False):
+        self.batches = []
+        self.drop_last = drop_last
+
+    def __call__(self, crops):
+        self.batches.append(list(crops))
+        results = [(f"line {crop}", 0.9) for crop in crops]
+        return results[:-1] if self.drop_last else results
+
+
+def _concurrently(batcher, requests):
+    """Runs batcher.recognize(crops) for each request on its own thread; returns results or exceptions."""
+    outcomes = [None] * len(requests)
+
+    def call(i):
+        try:
+            outcomes[i] = batcher.recognize(requests[i])
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return outcomes
+
+
+def test_results_keep_each_callers_order():
+    recognizer = FakeRecognizer()
+    batcher = RecognitionBatcher(recognizer, batch_size=4, max_wait_ms=20)
+    requests = [[f"{r}.{i}" for i in range(r + 1)] for r in range(6)]
+
+    outcomes = _concurrently(batcher, requests)
+
+    assert outcomes == [[(f"line {crop}", 0.9) for crop in crops] for crops in requests]
+    assert all(len(batch) <= 4 for batch in recognizer.batches)
+    assert sorted(crop for batch in recognizer.batches for crop in batch) == sorted(c for r in requests for c in r)
+
+
+def test_empty_request_does_not_touch_the_model():
+    recognizer = FakeRecognizer()
+    assert RecognitionBatcher(recognizer, batch_size=4).recognize([]) == []
+    assert recognizer.batches == []
+
+
+def test_result_count_mismatch_fails_every_request_in_the_batch():
+    # A long wait: the batch is flushed only once both requests' crops fill it
+    batcher = RecognitionBatcher(FakeRecognizer(drop_last=True), batch_size=4, max_wait_ms=5000)
+
+    outcomes = _concurrently(batcher, [["a", "b"], ["c", "d"]])
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes), outcomes
+    assert "3 results for 4 crops" in str(outcomes[0])
+
+
+def test_model_error_is_raised_to_the_callers():
+    def broken(crops):
+        raise ValueError("rec model failed")
+
+    with pytest.raises(ValueError, match="rec model failed"):
+        RecognitionBatcher(broken, batch_size=4, max_wait_ms=5).recognize(["a"])
+
+
+def test_partial_batch_is_flushed_after_max_wait():
+    recognizer = FakeRecognizer()
+    batcher = RecognitionBatcher(recognizer, batch_size=64, max_wait_ms=50)
+
+    start = time.monotonic()
+    results = batcher.recognize(["a", "b", "c"])
+    elapsed = time.monotonic() - start
+
+    assert results == [("line a", 0.9), ("line b", 0.9), ("line c", 0.9)]
+    assert recognizer.batches == [["a", "b", "c"]]
+    assert 0.04 <= elapsed < 2.0
+
+
+def test_batcher_keeps_serving_after_a_failed_batch():
+    recognizer = FakeRecognizer(drop_last=True)
+    batcher = RecognitionBatcher(recognizer, batch_size=2, max_wait_ms=5)
+    with pytest.raises(RuntimeError):
+        batcher.recognize(["a", "b"])
+
+    recognizer.drop_last = False
+    assert batcher.recognize(["c"]) == [("line c", 0.9)]
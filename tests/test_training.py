@@ -0,0 +1,137 @@
+import os
+import sys
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Model"))
+from model import train_epoch
+from training_utils import EarlyStopping, load_checkpoint, save_checkpoint
+
+
+# --- EarlyStopping ---
+
+def test_loss_must_decrease_by_more_than_min_delta():
+    stopping = EarlyStopping("loss", patience=2, min_delta=0.01)
+    assert stopping.step({"loss": 0.50})
+    assert stopping.step({"loss": 0.45})
+    assert not stopping.step({"loss": 0.445})  # within min_delta
+    assert not stopping.should_stop
+    assert not stopping.step({"loss": 0.46})
+    assert stopping.should_stop
+    assert stopping.best == 0.45
+
+
+def test_improvement_resets_patience():
+    stopping = EarlyStopping("loss", patience=2)
+    for loss, improved in [(0.5, True), (0.6, False), (0.4, True), (0.41, False)]:
+        assert stopping.step({"loss": loss}) is improved
+    assert stopping.bad_epochs == 1 and not stopping.should_stop
+
+
+def test_f1_must_increase():
+    stopping = EarlyStopping("f1", patience=1)
+    assert stopping.mode == "max"
+    assert stopping.step({"f1": 0.7, "loss": 0.9})
+    assert not stopping.step({"f1": 0.6, "loss": 0.1})
+    assert stopping.should_stop
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError):
+        EarlyStopping("acc")
+
+
+# --- Checkpoints ---
+
+def _training_state(seed):
+    torch.manual_seed(seed)
+    model = torch.nn.Linear(4, 1)
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+    stopping = EarlyStopping("loss", patience=3)
+    scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, mode=stopping.mode, factor=0.5, patience=0)
+    return model, optimizer, scheduler, stopping
+
+
+def _train_step(model, optimizer):
+    model(torch.ones(2, 4)).sum().backward()
+    optimizer.step()
+    optimizer.zero_grad()
+
+
+def test_checkpoint_resumes_the_full_training_state(tmp_path):
+    path = str(tmp_path / "checkpoint.pth")
+    model, optimizer, scheduler, stopping = _training_state(seed=0)
+    _train_step(model, optimizer)
+    stopping.step({"loss": 0.5})
+    stopping.step({"loss": 0.6})
+    scheduler.step(0.5)
+    scheduler.step(0.6)  # plateau: LR halved
+    save_checkpoint(path, model, optimizer, scheduler, stopping, epoch=3, config={"data": "abc"})
+    expected_draw = torch.rand(3)
+
+    resumed = _training_state(seed=1)
+    start_epoch = load_checkpoint(path, *resumed, config={"data": "abc"})
+
+    model2, optimizer2, _, stopping2 = resumed
+    assert start_epoch == 4
+    assert torch.equal(model2.weight, model.weight) and torch.equal(model2.bias, model.bias)
+    assert optimizer2.param_groups[0]["lr"] == pytest.approx(5e-4)
+    assert optimizer2.state_dict()["state"][0]["step"] == optimizer.state_dict()["state"][0]["step"]
+    assert stopping2.state_dict() == {"best": 0.5, "bad_epochs": 1}
+    assert torch.equal(torch.rand(3), expected_draw)  # RNG restored
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_checkpoint_of_another_run_is_ignored(tmp_path):
+    path = str(tmp_path / "checkpoint.pth")
+    model, optimizer, scheduler, stopping = _training_state(seed=0)
+    save_checkpoint(path, model, optimizer, scheduler, stopping, epoch=3, config={"data": "abc"})
+
+    fresh = _training_state(seed=1)
+    assert load_checkpoint(path, *fresh, config={"data": "new images"}) == 0
+    assert not torch.equal(fresh[0].weight, model.weight)
+
+
+def test_missing_checkpoint_starts_from_scratch(tmp_path):
+    assert load_checkpoint(str(tmp_path / "none.pth"), *_training_state(seed=0)) == 0
+
+
+# --- Gradient accumulation ---
+
+class RecordingOptimizer:
+    """Records the gradient at every step and leaves the weights alone."""
+
+    def __init__(self, model):
+        self.model = model
+        self.steps = []
+
+    def zero_grad(self):
+        self.model.zero_grad()
+
+    def step(self):
+        self.steps.append(self.model.weight.grad.clone())
+
+
+def test_every_accumulation_window_averages_its_own_batches():
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(torch.nn.Linear(3, 1), torch.nn.Sigmoid())
+    criterion = torch.nn.BCELoss()
+    batches = [(torch.randn(4, 3), torch.randint(0, 2, (4,))) for _ in range(5)]
+
+    def grad(batch):
+        model.zero_grad()
+        images, labels = batch
+        criterion(model(images), labels.float().unsqueeze(1)).backward()
+        return model[0].weight.grad.clone()
+
+    grads = [grad(batch) for batch in batches]
+    optimizer = RecordingOptimizer(model[0])
+    train_epoch(model, batches, criterion, optimizer, torch.device("cpu"), accum_steps=2, progress=False)
+
+    # Windows [0, 1], [2, 3], [4]: the last one is not halved
+    expected = [(grads[0] + grads[1]) / 2, (grads[2] + grads[3]) / 2, grads[4]]
+    assert len(optimizer.steps) == 3
+    for step, want in zip(optimizer.steps, expected):
+        assert torch.allclose(step, want, atol=1e-6)